@@ -1,69 +1,245 @@
 """Veri Analiz ve Temizleme Endpoint'leri"""
 
-from fastapi import APIRouter, HTTPException, status
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response, status
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Literal, Tuple
+import glob
 import os
+import threading
+import time
+import uuid
 from pathlib import Path
+import anyio
+import asyncio
+from cachetools import LRUCache
 
 from app.services.data_profiler import DataProfiler
 from app.services.data_cleaner import DataCleaner
+from app.api.responses import ORJSONResponse, etag_matches
+from app.api.dependencies import (
+    UPLOAD_DIR, resolve_upload_path, upload_file, upload_csv_file
+)
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 
-# Yükleme dizini
-UPLOAD_DIR = Path(os.getenv("UPLOAD_DIR", "./uploads"))
+# sendfile'ın verimsiz olduğu ağ dosya sistemlerinde (NFS, S3 mount) indirmeler parça parça okunur
+STREAM_DOWNLOADS = os.getenv("STREAM_DOWNLOADS", "false").lower() == "true"
+DOWNLOAD_CHUNK_SIZE = 1 << 20  # 1 MB
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+
+# DataProfiler cache (aynı dosya için CSV tekrar parse edilmez)
+PROFILER_CACHE_SIZE = int(os.getenv("PROFILER_CACHE_SIZE", "16"))
+_profiler_cache = LRUCache(maxsize=PROFILER_CACHE_SIZE)
+_profiler_cache_lock = threading.Lock()
+
+
+def _get_profiler(file_path: Path, file_stat: os.stat_result) -> DataProfiler:
+    """
+    Dosya için DataProfiler döndür (önbellekten veya yeni oluşturarak)
+
+    Anahtar (yol, mtime, boyut) olduğundan dosya değişince cache kendiliğinden geçersiz olur.
+
+    Args:
+        file_path: CSV dosyasının yolu
+        file_stat: Dosyanın os.stat sonucu
+
+    Returns:
+        DataProfiler instance
+    """
+    key = (str(file_path), file_stat.st_mtime_ns, file_stat.st_size)
+
+    with _profiler_cache_lock:
+        profiler = _profiler_cache.get(key)
+
+    if profiler is None:
+        # Parse kilit dışında (thread'lerden çağrılır)
+        profiler = DataProfiler(str(file_path))
+        with _profiler_cache_lock:
+            _profiler_cache[key] = profiler
+
+    return profiler
+
+
+def _run_cleaning(file_path: Path, request: "CleaningRequest") -> Tuple[DataCleaner, dict]:
+    """
+    İstenen temizleme adımlarını uygula
+
+    Args:
+        file_path: CSV dosyasının yolu
+        request: Temizleme parametreleri
+
+    Returns:
+        (DataCleaner, temizleme özeti)
+    """
+    cleaner = DataCleaner(str(file_path))
+
+    # Eksik değerleri işle
+    if request.missing_strategy:
+        cleaner.handle_missing_values(strategy=request.missing_strategy)
+
+    # Outlier'ları kaldır
+    if request.remove_outliers:
+        cleaner.remove_outliers(
+            method=request.outlier_method,
+            threshold=request.outlier_threshold
+        )
+
+    # Normalizasyon
+    if request.normalize:
+        cleaner.normalize_columns(method=request.normalize_method)
+
+    # Kategorik encoding
+    if request.encode_categorical:
+        cleaner.encode_categorical(method=request.encoding_method)
+
+    # Özet bilgileri al
+    return cleaner, cleaner.get_cleaning_summary()
+
+
+def _analyze_column(profiler: DataProfiler, column: str) -> dict:
+    """Tek bir sütunun tip, null ve istatistik analizini çıkar"""
+    col_type = profiler.get_column_type(column)
+    null_count = int(profiler.df[column].isnull().sum())
+
+    analysis = {
+        "column": column,
+        "type": col_type,
+        "null_count": null_count,
+        "null_percentage": round(null_count / len(profiler.df) * 100, 2)
+    }
+
+    if col_type in ["integer", "float"]:
+        analysis.update(profiler.analyze_numeric_column(column))
+    elif col_type in ["categorical", "text", "boolean"]:
+        analysis.update(profiler.analyze_categorical_column(column))
+
+    return analysis
+
+
+# Arka planda yazılan /clean çıktıları için geçici dosyalar (.<ad>.<pid>.<uuid>.tmp) yanıt
+# dönmeden oluşturulur; var oldukları sürece indirme 425 döner. Durum dosya sisteminde
+# tutulduğundan tüm uvicorn worker'ları aynı sonucu görür. Çöken bir yazmadan kalan
+# geçici dosya bu süreden sonra bekleyen yazma sayılmaz.
+PENDING_WRITE_TIMEOUT = int(os.getenv("PENDING_WRITE_TIMEOUT", "600"))
+
+
+def _reserve_write(output_path: Path) -> Path:
+    """
+    Hedef dosya için bu isteğe özel geçici dosyayı oluştur (bekleyen yazma işareti)
+
+    Args:
+        output_path: Hedef dosya yolu
+
+    Returns:
+        Geçici dosya yolu
+    """
+    tmp_path = output_path.with_name(
+        f".{output_path.name}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+    )
+    tmp_path.touch()
+    return tmp_path
+
+
+def _is_write_pending(output_path: Path) -> bool:
+    """Hedef dosya için süresi dolmamış bir geçici dosya var mı"""
+    now = time.time()
+    for tmp_path in output_path.parent.glob(f".{glob.escape(output_path.name)}.*.tmp"):
+        try:
+            if now - tmp_path.stat().st_mtime < PENDING_WRITE_TIMEOUT:
+                return True
+        except FileNotFoundError:
+            continue
+    return False
+
+
+def _write_cleaned_data(
+    cleaner: DataCleaner,
+    output_path: Path,
+    tmp_path: Path,
+    output_format: str = "csv"
+) -> None:
+    """
+    Temizlenmiş veriyi isteğe özel geçici dosyaya yazıp atomik olarak yerine taşı
+
+    Yarım yazılmış bir dosya hiçbir zaman indirilemez; aynı dosya için eşzamanlı
+    istekler birbirinin geçici dosyasına yazmaz.
+
+    Args:
+        cleaner: Temizleme işlemlerini tamamlamış DataCleaner
+        output_path: Hedef dosya yolu
+        tmp_path: _reserve_write ile oluşturulan geçici dosya
+        output_format: Çıktı formatı (csv, parquet)
+    """
+    try:
+        cleaner.save_cleaned_data(str(tmp_path), format=output_format)
+        os.replace(tmp_path, output_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+async def _iter_file(file_path: Path):
+    """Dosyayı DOWNLOAD_CHUNK_SIZE'lık parçalar halinde asenkron oku"""
+    async with await anyio.open_file(file_path, "rb") as f:
+        while chunk := await f.read(DOWNLOAD_CHUNK_SIZE):
+            yield chunk
 
 
 class CleaningRequest(BaseModel):
     """Veri temizleme isteği modeli"""
     filename: str
-    missing_strategy: Optional[str] = "auto"
+    missing_strategy: Optional[
+        Literal["auto", "drop", "mean", "median", "mode", "ffill", "bfill"]
+    ] = "auto"
     remove_outliers: Optional[bool] = False
-    outlier_method: Optional[str] = "iqr"
+    outlier_method: Literal["iqr", "zscore"] = "iqr"
     outlier_threshold: Optional[float] = 1.5
     normalize: Optional[bool] = False
-    normalize_method: Optional[str] = "minmax"
+    normalize_method: Literal["minmax", "zscore"] = "minmax"
     encode_categorical: Optional[bool] = False
-    encoding_method: Optional[str] = "label"
+    encoding_method: Literal["label", "onehot"] = "label"
+    format: Literal["csv", "parquet"] = "csv"
 
 
 @router.get("/analyze/{filename}", status_code=status.HTTP_200_OK)
-async def analyze_file(filename: str):
+async def analyze_file(
+    filename: str,
+    request: Request,
+    upload: Tuple[Path, os.stat_result] = Depends(upload_csv_file)
+):
     """
     Dosya için detaylı veri profiling
 
+    Dosya değişmediyse (If-None-Match eşleşirse) profil yeniden hesaplanmadan 304 döner.
+
     Args:
         filename: Analiz edilecek dosya adı
+        request: Gelen istek (ETag kontrolü için)
 
     Returns:
         Detaylı veri profili
     """
-    file_path = UPLOAD_DIR / filename
+    file_path, file_stat = upload
 
-    if not file_path.exists():
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Dosya bulunamadı: {filename}"
-        )
+    etag = f'"{file_stat.st_mtime_ns}-{file_stat.st_size}"'
+    cache_headers = {"ETag": etag, "Cache-Control": "private, max-age=5"}
 
-    if not file_path.suffix == ".csv":
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Sadece CSV dosyaları analiz edilebilir"
-        )
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers)
 
     try:
-        profiler = DataProfiler(str(file_path))
-        profile = profiler.get_full_profile()
+        # Parse ve profil CPU yoğun; event loop'u bloklamamak için thread'de
+        profile = await asyncio.to_thread(
+            lambda: _get_profiler(file_path, file_stat).get_full_profile()
+        )
 
-        return JSONResponse(
+        return ORJSONResponse(
             content={
                 "message": "Veri analizi başarıyla tamamlandı",
                 "filename": filename,
                 "profile": profile
-            }
+            },
+            headers=cache_headers
         )
 
     except Exception as e:
@@ -74,61 +250,43 @@ async def analyze_file(filename: str):
 
 
 @router.post("/clean", status_code=status.HTTP_200_OK)
-async def clean_data(request: CleaningRequest):
+async def clean_data(request: CleaningRequest, background_tasks: BackgroundTasks):
     """
     Veriyi temizle ve ön işle
 
+    Temizlenmiş CSV yanıt gönderildikten sonra arka planda yazılır; yazma bitene kadar
+    indirme linki 425 döner.
+
     Args:
         request: Temizleme parametreleri
+        background_tasks: Arka plan görevleri
 
     Returns:
         Temizlenmiş veri özeti ve indirme linki
     """
-    file_path = UPLOAD_DIR / request.filename
-
-    if not file_path.exists():
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Dosya bulunamadı: {request.filename}"
-        )
+    file_path, _ = resolve_upload_path(request.filename)
 
     try:
-        cleaner = DataCleaner(str(file_path))
-
-        # Eksik değerleri işle
-        if request.missing_strategy:
-            cleaner.handle_missing_values(strategy=request.missing_strategy)
-
-        # Outlier'ları kaldır
-        if request.remove_outliers:
-            cleaner.remove_outliers(
-                method=request.outlier_method,
-                threshold=request.outlier_threshold
-            )
+        cleaner, summary = await asyncio.to_thread(_run_cleaning, file_path, request)
 
-        # Normalizasyon
-        if request.normalize:
-            cleaner.normalize_columns(method=request.normalize_method)
-
-        # Kategorik encoding
-        if request.encode_categorical:
-            cleaner.encode_categorical(method=request.encoding_method)
-
-        # Temizlenmiş veriyi kaydet
+        # Temizlenmiş veriyi arka planda kaydet (sync görev Starlette threadpool'unda çalışır)
         cleaned_filename = f"cleaned_{request.filename}"
+        if request.format == "parquet":
+            cleaned_filename = f"cleaned_{Path(request.filename).stem}.parquet"
         cleaned_path = UPLOAD_DIR / cleaned_filename
-        cleaner.save_cleaned_data(str(cleaned_path))
-
-        # Özet bilgileri al
-        summary = cleaner.get_cleaning_summary()
+        tmp_path = await asyncio.to_thread(_reserve_write, cleaned_path)
+        background_tasks.add_task(
+            _write_cleaned_data, cleaner, cleaned_path, tmp_path, request.format
+        )
 
-        return JSONResponse(
+        return ORJSONResponse(
             content={
                 "message": "Veri temizleme başarıyla tamamlandı",
                 "original_file": request.filename,
                 "cleaned_file": cleaned_filename,
                 "summary": summary,
-                "download_url": f"/api/v1/download/{cleaned_filename}"
+                "download_url": f"/api/v1/download/{cleaned_filename}",
+                "file_status": "pending"
             }
         )
 
@@ -148,25 +306,44 @@ async def download_file(filename: str):
         filename: İndirilecek dosya adı
 
     Returns:
-        CSV dosyası
+        CSV veya Parquet dosyası
     """
-    file_path = UPLOAD_DIR / filename
-
-    if not file_path.exists():
+    # /clean çıktısı henüz yazılıyorsa istemci biraz sonra tekrar denemeli
+    if await asyncio.to_thread(_is_write_pending, UPLOAD_DIR / Path(filename).name):
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Dosya bulunamadı: {filename}"
+            status_code=status.HTTP_425_TOO_EARLY,
+            detail=f"Dosya hazırlanıyor, lütfen tekrar deneyin: {filename}",
+            headers={"Retry-After": "1"}
         )
 
+    file_path, file_stat = resolve_upload_path(filename)
+    media_type = PARQUET_MEDIA_TYPE if filename.endswith(".parquet") else "text/csv"
+
+    if STREAM_DOWNLOADS:
+        return StreamingResponse(
+            _iter_file(file_path),
+            media_type=media_type,
+            headers={
+                "Content-Disposition": f'attachment; filename="{filename}"',
+                "Content-Length": str(file_stat.st_size)
+            }
+        )
+
+    # stat_result verildiğinde Starlette tekrar stat yapmaz; gövde sendfile ile gönderilir
     return FileResponse(
         path=str(file_path),
-        media_type="text/csv",
-        filename=filename
+        media_type=media_type,
+        filename=filename,
+        stat_result=file_stat
     )
 
 
 @router.get("/column-analysis/{filename}/{column}", status_code=status.HTTP_200_OK)
-async def analyze_column(filename: str, column: str):
+async def analyze_column(
+    filename: str,
+    column: str,
+    upload: Tuple[Path, os.stat_result] = Depends(upload_file)
+):
     """
     Tek bir sütun için detaylı analiz
 
@@ -177,16 +354,10 @@ async def analyze_column(filename: str, column: str):
     Returns:
         Sütun analizi
     """
-    file_path = UPLOAD_DIR / filename
-
-    if not file_path.exists():
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Dosya bulunamadı: {filename}"
-        )
+    file_path, file_stat = upload
 
     try:
-        profiler = DataProfiler(str(file_path))
+        profiler = await asyncio.to_thread(_get_profiler, file_path, file_stat)
 
         if column not in profiler.df.columns:
             raise HTTPException(
@@ -194,22 +365,9 @@ async def analyze_column(filename: str, column: str):
                 detail=f"Sütun bulunamadı: {column}"
             )
 
-        column_types = profiler.get_column_types()
-        col_type = column_types[column]
-
-        analysis = {
-            "column": column,
-            "type": col_type,
-            "null_count": int(profiler.df[column].isnull().sum()),
-            "null_percentage": round(profiler.df[column].isnull().sum() / len(profiler.df) * 100, 2)
-        }
-
-        if col_type in ["integer", "float"]:
-            analysis.update(profiler.analyze_numeric_column(column))
-        elif col_type in ["categorical", "text", "boolean"]:
-            analysis.update(profiler.analyze_categorical_column(column))
+        analysis = await asyncio.to_thread(_analyze_column, profiler, column)
 
-        return JSONResponse(
+        return ORJSONResponse(
             content={
                 "message": "Sütun analizi başarıyla tamamlandı",
                 "filename": filename,
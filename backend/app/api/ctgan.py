@@ -1,24 +1,140 @@
 """CTGAN Model Eğitimi ve Sentetik Veri Üretimi Endpoint'leri"""
 
-from fastapi import APIRouter, HTTPException, status, BackgroundTasks
-from fastapi.responses import JSONResponse, FileResponse
-from pydantic import BaseModel, Field
-from typing import Optional
+from fastapi import APIRouter, HTTPException, Request, Response, status, BackgroundTasks
+from fastapi.responses import FileResponse
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Optional, Tuple
+import asyncio
 import os
+import shutil
+import uuid
+import zlib
 from pathlib import Path
 import pandas as pd
+import orjson
+from cachetools import LRUCache
 
 from app.services.ctgan_trainer import CTGANTrainer
+from app.services.model_registry import ModelRegistry
+from app.api.responses import ORJSONResponse, etag_matches
+from app.api.dependencies import UPLOAD_DIR, resolve_upload_path
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 
 # Dizinler
-UPLOAD_DIR = Path(os.getenv("UPLOAD_DIR", "./uploads"))
 MODEL_DIR = Path("./models")
 MODEL_DIR.mkdir(parents=True, exist_ok=True)
 
-# Global model cache (production'da Redis kullanılmalı)
-model_cache = {}
+# Model manifest'i (liste/bilgi/silme için dizin taraması yerine indeksli sorgu)
+model_registry = ModelRegistry(MODEL_DIR)
+
+# Bellekte tutulacak maksimum model sayısı (worker başına)
+MODEL_CACHE_SIZE = int(os.getenv("MODEL_CACHE_SIZE", "4"))
+
+# Model cache (LRU): en az kullanılan model atılır, RSS sınırlı kalır
+model_cache = LRUCache(maxsize=MODEL_CACHE_SIZE)
+
+
+def _train_and_save(file_path: Path, model_id: str, request: "TrainRequest") -> tuple:
+    """
+    Modeli eğit, kaydet ve manifest'e ekle
+
+    Args:
+        file_path: Eğitim verisinin yolu
+        model_id: Model ID
+        request: Eğitim parametreleri
+
+    Returns:
+        (trainer, eğitim istatistikleri, kayıt bilgisi)
+    """
+    trainer = CTGANTrainer(str(file_path))
+
+    training_stats = trainer.train_model(
+        epochs=request.epochs,
+        batch_size=request.batch_size,
+        generator_dim=request.generator_dim,
+        discriminator_dim=request.discriminator_dim,
+        verbose=False,
+        pac=request.pac
+    )
+
+    model_path = MODEL_DIR / model_id
+    save_info = trainer.save_model(str(model_path))
+    model_registry.upsert(model_id, str(model_path), trainer.training_stats)
+
+    return trainer, training_stats, save_info
+
+
+def _write_synthetic_csv(
+    trainer: CTGANTrainer,
+    output_path: Path,
+    num_rows: int,
+    batch_size: Optional[int],
+    keep: bool
+) -> Tuple[List[str], int, Optional[pd.DataFrame]]:
+    """
+    Sentetik veriyi parça parça üretip isteğe özel geçici CSV'ye ekle, sonunda atomik olarak
+    yerine taşı (indirme yarım dosya görmez; aynı istekler birbirinin parçalarına karışmaz)
+
+    Args:
+        trainer: Modeli yüklenmiş trainer
+        output_path: Hedef CSV yolu
+        num_rows: Üretilecek satır sayısı
+        batch_size: Batch boyutu
+        keep: Parçalar değerlendirme için birleştirilip döndürülsün mü
+
+    Returns:
+        (sütun adları, üretilen satır sayısı, tüm veri veya None)
+    """
+    columns, rows, kept = [], 0, []
+    tmp_path = output_path.with_name(f".{output_path.name}.{os.getpid()}.{uuid.uuid4().hex}.tmp")
+
+    try:
+        with open(tmp_path, "w", newline="") as sink:
+            for i, chunk in enumerate(trainer.generate_synthetic_data_stream(num_rows, batch_size=batch_size)):
+                chunk.to_csv(sink, index=False, header=i == 0)
+                columns = chunk.columns.tolist()
+                rows += len(chunk)
+                if keep:
+                    kept.append(chunk)
+        os.replace(tmp_path, output_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+    synthetic_data = pd.concat(kept, ignore_index=True) if kept else None
+    return columns, rows, synthetic_data
+
+
+def _delete_model_files(model_id: str, model_path: str) -> None:
+    """
+    Model dizinini sil, ardından manifest kaydını kaldır
+
+    Dizin silinemezse hata yükseltilir ve kayıt korunur; aksi halde sync_from_disk
+    kalan dizini bir sonraki başlangıçta modeli geri getirirdi.
+
+    Args:
+        model_id: Model ID
+        model_path: Model dizin yolu
+    """
+    try:
+        shutil.rmtree(model_path)
+    except FileNotFoundError:
+        # Dizin zaten yok; yalnızca kayıt temizlenir
+        pass
+    model_registry.delete(model_id)
+
+
+def _read_json(path: Path) -> Optional[dict]:
+    """JSON dosyasını oku, dosya yoksa None döndür"""
+    try:
+        return orjson.loads(path.read_bytes())
+    except FileNotFoundError:
+        return None
+
+
+async def _load_json(path: Path) -> Optional[dict]:
+    """JSON dosyasını event loop'u bloklamadan thread'de oku"""
+    return await asyncio.to_thread(_read_json, path)
 
 
 class TrainRequest(BaseModel):
@@ -28,6 +144,14 @@ class TrainRequest(BaseModel):
     batch_size: int = Field(default=500, ge=100, le=2000, description="Batch boyutu")
     generator_dim: tuple[int, int] = Field(default=(256, 256), description="Generator boyutları")
     discriminator_dim: tuple[int, int] = Field(default=(256, 256), description="Discriminator boyutları")
+    pac: int = Field(default=10, ge=1, le=20, description="Discriminator packing (batch_size'ın böleni olmalı)")
+
+    @model_validator(mode="after")
+    def check_batch_size_divisible_by_pac(self) -> "TrainRequest":
+        """batch_size pac'ın katı değilse istek 422 ile reddedilir (trainer'a ulaşmaz)"""
+        if self.batch_size % self.pac != 0:
+            raise ValueError(f"batch_size ({self.batch_size}) pac'ın ({self.pac}) katı olmalı")
+        return self
 
 
 class GenerateRequest(BaseModel):
@@ -50,38 +174,21 @@ async def train_model(request: TrainRequest, background_tasks: BackgroundTasks):
     Returns:
         Eğitim başlatma bilgileri
     """
-    file_path = UPLOAD_DIR / request.filename
-
-    if not file_path.exists():
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Dosya bulunamadı: {request.filename}"
-        )
+    file_path, _ = resolve_upload_path(request.filename)
 
     # Model ID oluştur (dosya adı + timestamp)
     model_id = f"{Path(request.filename).stem}_model"
 
     try:
-        # Trainer oluştur
-        trainer = CTGANTrainer(str(file_path))
-
-        # Modeli eğit
-        training_stats = trainer.train_model(
-            epochs=request.epochs,
-            batch_size=request.batch_size,
-            generator_dim=request.generator_dim,
-            discriminator_dim=request.discriminator_dim,
-            verbose=False
+        # Eğitim ve kayıt CPU/GPU yoğun; event loop'u bloklamamak için thread'de
+        trainer, training_stats, save_info = await asyncio.to_thread(
+            _train_and_save, file_path, model_id, request
         )
 
-        # Modeli kaydet
-        model_path = MODEL_DIR / model_id
-        save_info = trainer.save_model(str(model_path))
-
         # Cache'e ekle
         model_cache[model_id] = trainer
 
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=status.HTTP_200_OK,
             content={
                 "message": "Model başarıyla eğitildi",
@@ -120,8 +227,7 @@ async def generate_synthetic_data(request: GenerateRequest):
             )
 
         try:
-            trainer = CTGANTrainer(str(UPLOAD_DIR / "dummy.csv"))  # Dummy path
-            trainer.load_model(str(model_path))
+            trainer = await asyncio.to_thread(CTGANTrainer.from_saved, str(model_path))
             model_cache[request.model_id] = trainer
         except Exception as e:
             raise HTTPException(
@@ -132,37 +238,37 @@ async def generate_synthetic_data(request: GenerateRequest):
     trainer = model_cache[request.model_id]
 
     try:
-        # Sentetik veri üret
-        synthetic_data = trainer.generate_synthetic_data(
-            num_rows=request.num_rows,
-            batch_size=request.batch_size
-        )
-
         # Dosya adı
         output_filename = f"synthetic_{request.model_id}_{request.num_rows}rows.csv"
         output_path = UPLOAD_DIR / output_filename
 
-        # Kaydet
-        synthetic_data.to_csv(output_path, index=False)
+        # Değerlendirme yapılabilecekse (eğitim verisi bellekteyse) parçalar birleştirilir
+        can_evaluate = request.evaluate and getattr(trainer, 'df', None) is not None
+
+        # Parça parça üret ve diske ekle (event loop'u bloklamamak için thread'de)
+        column_names, rows_generated, synthetic_data = await asyncio.to_thread(
+            _write_synthetic_csv,
+            trainer, output_path, request.num_rows, request.batch_size, can_evaluate
+        )
 
         response_data = {
             "message": "Sentetik veri başarıyla üretildi",
             "filename": output_filename,
-            "rows_generated": len(synthetic_data),
-            "columns": len(synthetic_data.columns),
-            "column_names": synthetic_data.columns.tolist(),
+            "rows_generated": rows_generated,
+            "columns": len(column_names),
+            "column_names": column_names,
             "download_url": f"/api/v1/download/{output_filename}"
         }
 
         # Kalite değerlendirmesi
-        if request.evaluate and hasattr(trainer, 'df') and trainer.df is not None:
+        if can_evaluate:
             try:
-                evaluation = trainer.evaluate_synthetic_data(synthetic_data)
+                evaluation = await asyncio.to_thread(trainer.evaluate_synthetic_data, synthetic_data)
                 response_data["evaluation"] = evaluation
             except Exception as e:
                 response_data["evaluation_error"] = str(e)
 
-        return JSONResponse(content=response_data)
+        return ORJSONResponse(content=response_data)
 
     except Exception as e:
         raise HTTPException(
@@ -172,38 +278,40 @@ async def generate_synthetic_data(request: GenerateRequest):
 
 
 @router.get("/models", status_code=status.HTTP_200_OK)
-async def list_models():
+async def list_models(request: Request):
     """
     Kaydedilmiş modelleri listele
 
+    Manifest ve bellekteki model seti değişmediyse 304 döner.
+
+    Args:
+        request: Gelen istek (ETag kontrolü için)
+
     Returns:
         Model listesi
     """
     try:
-        models = []
+        # is_cached alanı da yanıtın parçası olduğundan cache içeriği ETag'e katılır
+        cached_ids = ",".join(sorted(model_cache.keys()))
+        manifest_version = await asyncio.to_thread(model_registry.version)
+        etag = f'"{manifest_version}-{zlib.crc32(cached_ids.encode()):x}"'
+        cache_headers = {"ETag": etag, "Cache-Control": "private, max-age=5"}
 
-        for model_dir in MODEL_DIR.iterdir():
-            if model_dir.is_dir():
-                stats_file = model_dir / "training_stats.json"
+        if etag_matches(request, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers)
 
-                model_info = {
-                    "model_id": model_dir.name,
-                    "model_path": str(model_dir),
-                    "is_cached": model_dir.name in model_cache
-                }
+        # Manifest zaten trained_at'e göre sıralı döner
+        models = await asyncio.to_thread(model_registry.list_models)
 
-                if stats_file.exists():
-                    import json
-                    with open(stats_file, 'r') as f:
-                        model_info["training_stats"] = json.load(f)
+        for model_info in models:
+            model_info["is_cached"] = model_info["model_id"] in model_cache
 
-                models.append(model_info)
-
-        return JSONResponse(
+        return ORJSONResponse(
             content={
                 "total_models": len(models),
-                "models": sorted(models, key=lambda x: x.get("training_stats", {}).get("trained_at", ""), reverse=True)
-            }
+                "models": models
+            },
+            headers=cache_headers
         )
 
     except Exception as e:
@@ -224,35 +332,22 @@ async def get_model_info(model_id: str):
     Returns:
         Model bilgileri
     """
-    model_path = MODEL_DIR / model_id
+    info = await asyncio.to_thread(model_registry.get, model_id)
 
-    if not model_path.exists():
+    if info is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Model bulunamadı: {model_id}"
         )
 
     try:
-        import json
+        info["is_cached"] = model_id in model_cache
 
-        stats_file = model_path / "training_stats.json"
-        metadata_file = model_path / "metadata.json"
+        metadata = await _load_json(Path(info["model_path"]) / "metadata.json")
+        if metadata is not None:
+            info["metadata"] = metadata
 
-        info = {
-            "model_id": model_id,
-            "model_path": str(model_path),
-            "is_cached": model_id in model_cache
-        }
-
-        if stats_file.exists():
-            with open(stats_file, 'r') as f:
-                info["training_stats"] = json.load(f)
-
-        if metadata_file.exists():
-            with open(metadata_file, 'r') as f:
-                info["metadata"] = json.load(f)
-
-        return JSONResponse(content=info)
+        return ORJSONResponse(content=info)
 
     except Exception as e:
         raise HTTPException(
@@ -272,24 +367,22 @@ async def delete_model(model_id: str):
     Returns:
         Silme bilgileri
     """
-    model_path = MODEL_DIR / model_id
+    entry = await asyncio.to_thread(model_registry.get, model_id)
 
-    if not model_path.exists():
+    if entry is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Model bulunamadı: {model_id}"
         )
 
     try:
-        # Cache'den kaldır
-        if model_id in model_cache:
-            del model_cache[model_id]
+        # Dizini ve manifest kaydını sil (bloklayan dosya sistemi işi thread'de)
+        await asyncio.to_thread(_delete_model_files, model_id, entry["model_path"])
 
-        # Dizini sil
-        import shutil
-        shutil.rmtree(model_path)
+        # Cache'den kaldır
+        model_cache.pop(model_id, None)
 
-        return JSONResponse(
+        return ORJSONResponse(
             content={
                 "message": f"Model başarıyla silindi: {model_id}",
                 "model_id": model_id
@@ -0,0 +1,109 @@
+"""Endpoint'ler Arasında Paylaşılan Bağımlılıklar"""
+
+import os
+import stat
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+
+
+@lru_cache(maxsize=1)
+def get_upload_dir() -> Path:
+    """
+    Yükleme dizininin mutlak yolunu döndür
+
+    Import anında bir kez çözülür; süreç sonradan chdir yapsa da göreli yol kaymaz.
+
+    Returns:
+        Mutlak yükleme dizini
+    """
+    return Path(os.getenv("UPLOAD_DIR", "./uploads")).resolve()
+
+
+# Yükleme dizini
+UPLOAD_DIR = get_upload_dir()
+_UPLOAD_DIR_STR = str(UPLOAD_DIR)
+
+
+def upload_real_path(filename: str) -> str:
+    """
+    Dosya adını yükleme dizini içindeki gerçek yola çevir (dosya sistemine dokunmaz)
+
+    Celery görevleri de HTTP katmanı dışında aynı kontrolü kullanır.
+
+    Args:
+        filename: İstemciden gelen dosya adı
+
+    Returns:
+        Çözümlenmiş mutlak yol
+
+    Raises:
+        ValueError: Yol yükleme dizini dışındaysa (../, mutlak yol, symlink)
+    """
+    # str üzerinde join/realpath: Path nesnesi kurmaktan ve Path.resolve'dan ucuz
+    real_path = os.path.realpath(os.path.join(_UPLOAD_DIR_STR, filename))
+
+    # Path traversal koruması (../ ile upload dizini dışına çıkılamaz)
+    if not real_path.startswith(_UPLOAD_DIR_STR + os.sep):
+        raise ValueError(f"Geçersiz dosya adı: {filename}")
+
+    return real_path
+
+
+def resolve_upload_path(
+    filename: str,
+    suffix: Optional[str] = None
+) -> Tuple[Path, os.stat_result]:
+    """
+    Yükleme dizinindeki dosyanın güvenli yolunu ve stat bilgisini döndür
+
+    Args:
+        filename: İstemciden gelen dosya adı
+        suffix: Beklenen uzantı (örn. ".csv"), None ise kontrol edilmez
+
+    Returns:
+        (çözümlenmiş dosya yolu, os.stat sonucu)
+
+    Raises:
+        HTTPException: Yol yükleme dizini dışındaysa veya uzantı uymuyorsa 400,
+            dosya yoksa 404
+    """
+    try:
+        real_path = upload_real_path(filename)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Geçersiz dosya adı"
+        )
+
+    # Tek stat çağrısı: varlık kontrolü + sonraki adımlar için boyut/mtime bilgisi
+    try:
+        file_stat = os.stat(real_path)
+    except FileNotFoundError:
+        file_stat = None
+
+    if file_stat is None or not stat.S_ISREG(file_stat.st_mode):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Dosya bulunamadı: {filename}"
+        )
+
+    if suffix is not None and not real_path.endswith(suffix):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Sadece {suffix} dosyaları destekleniyor"
+        )
+
+    return Path(real_path), file_stat
+
+
+def upload_file(filename: str) -> Tuple[Path, os.stat_result]:
+    """Path parametresindeki dosya adını doğrulayan bağımlılık"""
+    return resolve_upload_path(filename)
+
+
+def upload_csv_file(filename: str) -> Tuple[Path, os.stat_result]:
+    """Path parametresindeki CSV dosya adını doğrulayan bağımlılık"""
+    return resolve_upload_path(filename, suffix=".csv")
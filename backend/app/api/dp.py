@@ -8,9 +8,15 @@ from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any, Literal, Tuple
 import pandas as pd
 import os
+import asyncio
 from datetime import datetime
+from pathlib import Path
 
 from app.services.differential_privacy import DifferentialPrivacy
+from app.services.data_io import (
+    load_csv, write_csv, write_parquet, downcast_floats, write_sidecar, read_sidecar, SIDECAR_SUFFIX,
+    evict_cached
+)
 
 router = APIRouter()
 
@@ -22,6 +28,43 @@ DP_DIR = os.path.join(UPLOAD_DIR, "differential_privacy")
 os.makedirs(DP_DIR, exist_ok=True)
 
 
+def _scan_dp_files() -> List[Dict[str, Any]]:
+    """DP dizinindeki CSV dosyalarını tara (bloklayan dosya sistemi çağrıları)"""
+    files = []
+    with os.scandir(DP_DIR) as entries:
+        for entry in entries:
+            filename = entry.name
+            if not filename.endswith(('.csv', '.parquet')):
+                continue
+
+            # Dosya başına tek stat (boyut + oluşturma zamanı)
+            file_stat = entry.stat()
+
+            # DP parametreleri yazım anında kaydedilen metadata dosyasından okunur
+            metadata = read_sidecar(entry.path)
+            if metadata is not None:
+                epsilon = metadata.get("epsilon")
+            else:
+                # Metadata öncesi dosyalar: epsilon'u filename'den çıkar
+                epsilon = "N/A"
+                if "_dp_eps" in filename:
+                    try:
+                        epsilon = filename.split("_dp_eps")[1].split("_")[0]
+                    except:
+                        pass
+
+            files.append({
+                "filename": filename,
+                "path": f"differential_privacy/{filename}",
+                "size_mb": round(file_stat.st_size / (1024 * 1024), 2),
+                "epsilon": epsilon,
+                "metadata": metadata,
+                "created_at": datetime.fromtimestamp(file_stat.st_ctime).isoformat()
+            })
+
+    return files
+
+
 class ApplyDPRequest(BaseModel):
     """DP uygulama isteği"""
     filename: str
@@ -30,6 +73,7 @@ class ApplyDPRequest(BaseModel):
     mechanism: Literal["laplace", "gaussian"] = Field(default="laplace", description="Noise mechanism")
     columns: Optional[List[str]] = Field(default=None, description="Sütunlar (None=tüm numeric)")
     bounds: Optional[Dict[str, Tuple[float, float]]] = Field(default=None, description="Sütun bounds")
+    format: Literal["csv", "parquet"] = Field(default="csv", description="Çıktı formatı (parquet: dahili kullanım)")
 
 
 class KAnonymityRequest(BaseModel):
@@ -63,13 +107,14 @@ async def apply_differential_privacy(request: ApplyDPRequest):
             raise HTTPException(status_code=404, detail="Dosya bulunamadı")
 
         # CSV'yi oku
-        df = pd.read_csv(file_path)
+        df = await asyncio.to_thread(load_csv, file_path)
 
         # DP instance oluştur
         dp = DifferentialPrivacy(epsilon=request.epsilon, delta=request.delta)
 
         # DP uygula
-        df_dp, dp_report = dp.apply_noise_to_dataframe(
+        df_dp, dp_report = await asyncio.to_thread(
+            dp.apply_noise_to_dataframe,
             df,
             mechanism=request.mechanism,
             columns=request.columns,
@@ -79,13 +124,30 @@ async def apply_differential_privacy(request: ApplyDPRequest):
         # DP uygulanmış dosyayı kaydet
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         base_filename = os.path.splitext(request.filename)[0]
-        dp_filename = f"{base_filename}_dp_eps{request.epsilon}_{timestamp}.csv"
+        dp_filename = f"{base_filename}_dp_eps{request.epsilon}_{timestamp}.{request.format}"
         dp_path = os.path.join(DP_DIR, dp_filename)
 
-        df_dp.to_csv(dp_path, index=False)
+        # Gürültülü sütunlarda float64 hassasiyeti anlamsız
+        await asyncio.to_thread(downcast_floats, df_dp, dp_report["columns_processed"])
+
+        if request.format == "parquet":
+            file_size = await asyncio.to_thread(write_parquet, df_dp, dp_path)
+        else:
+            file_size = await asyncio.to_thread(write_csv, df_dp, dp_path)
 
-        # Dosya boyutu
-        file_size_mb = round(os.path.getsize(dp_path) / (1024 * 1024), 2)
+        # DP parametrelerini dosyanın yanına kaydet
+        await asyncio.to_thread(write_sidecar, dp_path, {
+            "original_file": request.filename,
+            "epsilon": request.epsilon,
+            "delta": request.delta,
+            "mechanism": request.mechanism,
+            "columns": dp_report["columns_processed"],
+            "format": request.format,
+            "created_at": datetime.now().isoformat()
+        })
+
+        # Dosya boyutu (yazıcının döndürdüğü bayt sayısı)
+        file_size_mb = round(file_size / (1024 * 1024), 2)
 
         return {
             "status": "success",
@@ -124,7 +186,7 @@ async def check_k_anonymity(request: KAnonymityRequest):
             raise HTTPException(status_code=404, detail="Dosya bulunamadı")
 
         # CSV'yi oku
-        df = pd.read_csv(file_path)
+        df = await asyncio.to_thread(load_csv, file_path)
 
         # Quasi-identifier'ları kontrol et
         missing_columns = [col for col in request.quasi_identifiers if col not in df.columns]
@@ -138,7 +200,8 @@ async def check_k_anonymity(request: KAnonymityRequest):
         dp = DifferentialPrivacy()
 
         # K-anonymity kontrolü
-        k_anonymity_report = dp.k_anonymity_check(
+        k_anonymity_report = await asyncio.to_thread(
+            dp.k_anonymity_check,
             df,
             quasi_identifiers=request.quasi_identifiers,
             k=request.k
@@ -218,29 +281,7 @@ async def list_dp_files():
         if not os.path.exists(DP_DIR):
             return {"files": []}
 
-        files = []
-        for filename in os.listdir(DP_DIR):
-            if filename.endswith('.csv'):
-                file_path = os.path.join(DP_DIR, filename)
-                file_size = os.path.getsize(file_path)
-
-                # Epsilon değerini filename'den çıkar
-                epsilon_str = "N/A"
-                if "_dp_eps" in filename:
-                    try:
-                        epsilon_str = filename.split("_dp_eps")[1].split("_")[0]
-                    except:
-                        pass
-
-                files.append({
-                    "filename": filename,
-                    "path": f"differential_privacy/{filename}",
-                    "size_mb": round(file_size / (1024 * 1024), 2),
-                    "epsilon": epsilon_str,
-                    "created_at": datetime.fromtimestamp(
-                        os.path.getctime(file_path)
-                    ).isoformat()
-                })
+        files = await asyncio.to_thread(_scan_dp_files)
 
         # Tarihe göre sırala (en yeni en üstte)
         files.sort(key=lambda x: x["created_at"], reverse=True)
@@ -271,7 +312,10 @@ async def delete_dp_file(filename: str):
         if not os.path.exists(file_path):
             raise HTTPException(status_code=404, detail="Dosya bulunamadı")
 
-        os.remove(file_path)
+        await asyncio.to_thread(os.remove, file_path)
+        await asyncio.to_thread(Path(f"{file_path}{SIDECAR_SUFFIX}").unlink, missing_ok=True)
+        # Dosyaya ait parse/rapor cache'leri de silinir
+        await asyncio.to_thread(evict_cached, file_path)
 
         return {
             "status": "success",
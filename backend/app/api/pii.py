@@ -8,9 +8,11 @@ from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 import pandas as pd
 import os
+import asyncio
 from datetime import datetime
 
 from app.services.pii_detector import PIIDetector
+from app.services.data_io import load_csv, write_csv, read_cached_report, write_cached_report, evict_cached
 
 router = APIRouter()
 
@@ -22,6 +24,43 @@ ANONYMIZED_DIR = os.path.join(UPLOAD_DIR, "anonymized")
 os.makedirs(ANONYMIZED_DIR, exist_ok=True)
 
 
+def _scan_anonymized_files() -> List[Dict[str, Any]]:
+    """Anonimleştirilmiş dosyaları tara (bloklayan dosya sistemi çağrıları)"""
+    files = []
+    with os.scandir(ANONYMIZED_DIR) as entries:
+        for entry in entries:
+            if not entry.name.endswith('.csv'):
+                continue
+
+            # Dosya başına tek stat (boyut + oluşturma zamanı)
+            file_stat = entry.stat()
+
+            files.append({
+                "filename": entry.name,
+                "path": f"anonymized/{entry.name}",
+                "size_mb": round(file_stat.st_size / (1024 * 1024), 2),
+                "created_at": datetime.fromtimestamp(file_stat.st_ctime).isoformat()
+            })
+
+    return files
+
+
+def _detect_pii(df: pd.DataFrame, file_path: str, preview_only: bool) -> tuple:
+    """PII tespiti ve önizleme (model yükleme + CPU yoğun iş, thread'de çalışır)"""
+    detector = PIIDetector(locale="tr_TR")
+
+    # PII tespit et; rapor /anonymize'da yeniden tespit yapılmasın diye cache'lenir
+    pii_report = detector.detect_pii_in_dataframe(df)
+    write_cached_report(file_path, "pii", pii_report)
+
+    # Önizleme oluştur
+    preview = None
+    if preview_only:
+        preview = detector.get_anonymization_preview(df, num_samples=5, pii_report=pii_report)
+
+    return pii_report, preview
+
+
 class PIIDetectionRequest(BaseModel):
     """PII tespit isteği"""
     filename: str
@@ -34,6 +73,7 @@ class PIIAnonymizationRequest(BaseModel):
     columns: Optional[List[str]] = Field(default=None, description="Anonimleştirilecek sütunlar")
     consistent: bool = Field(default=True, description="Tutarlı replacement")
     locale: str = Field(default="tr_TR", description="Faker locale")
+    return_file: bool = Field(default=True, description="Anonimleştirilmiş dosya yazılsın mı (False: yalnızca rapor)")
 
 
 @router.post("/detect-pii")
@@ -54,18 +94,10 @@ async def detect_pii(request: PIIDetectionRequest):
             raise HTTPException(status_code=404, detail="Dosya bulunamadı")
 
         # CSV'yi oku
-        df = pd.read_csv(file_path)
-
-        # PII detector oluştur
-        detector = PIIDetector(locale="tr_TR")
+        df = await asyncio.to_thread(load_csv, file_path)
 
-        # PII tespit et
-        pii_report = detector.detect_pii_in_dataframe(df)
-
-        # Önizleme oluştur
-        preview = None
-        if request.preview_only:
-            preview = detector.get_anonymization_preview(df, num_samples=5)
+        # PII tespit et ve önizleme oluştur
+        pii_report, preview = await asyncio.to_thread(_detect_pii, df, file_path, request.preview_only)
 
         return {
             "status": "success",
@@ -98,36 +130,27 @@ async def anonymize_data(request: PIIAnonymizationRequest):
             raise HTTPException(status_code=404, detail="Dosya bulunamadı")
 
         # CSV'yi oku
-        df = pd.read_csv(file_path)
+        df = await asyncio.to_thread(load_csv, file_path)
 
         # PII detector oluştur
-        detector = PIIDetector(locale=request.locale)
+        detector = await asyncio.to_thread(PIIDetector, locale=request.locale)
+
+        # /detect-pii raporu varsa yeniden kullanılır (None ise hesaplanır)
+        pii_report = await asyncio.to_thread(read_cached_report, file_path, "pii")
 
         # Anonimleştir
-        df_anonymized, report = detector.anonymize_dataframe(
+        df_anonymized, report = await asyncio.to_thread(
+            detector.anonymize_dataframe,
             df,
             columns=request.columns,
-            consistent=request.consistent
+            consistent=request.consistent,
+            pii_report=pii_report
         )
 
-        # Anonimleştirilmiş dosyayı kaydet
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        base_filename = os.path.splitext(request.filename)[0]
-        anonymized_filename = f"{base_filename}_anonymized_{timestamp}.csv"
-        anonymized_path = os.path.join(ANONYMIZED_DIR, anonymized_filename)
-
-        df_anonymized.to_csv(anonymized_path, index=False)
-
-        # Dosya boyutu
-        file_size_mb = round(os.path.getsize(anonymized_path) / (1024 * 1024), 2)
-
-        return {
+        result = {
             "status": "success",
             "message": "Veri başarıyla anonimleştirildi",
             "original_file": request.filename,
-            "anonymized_file": anonymized_filename,
-            "anonymized_path": f"anonymized/{anonymized_filename}",
-            "file_size_mb": file_size_mb,
             "anonymization_report": report,
             "data_info": {
                 "total_rows": len(df_anonymized),
@@ -136,6 +159,26 @@ async def anonymize_data(request: PIIAnonymizationRequest):
             }
         }
 
+        # Yalnızca rapor istendiyse dosya serileştirilip yazılmaz
+        if not request.return_file:
+            return result
+
+        # Anonimleştirilmiş dosyayı kaydet
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        base_filename = os.path.splitext(request.filename)[0]
+        anonymized_filename = f"{base_filename}_anonymized_{timestamp}.csv"
+        anonymized_path = os.path.join(ANONYMIZED_DIR, anonymized_filename)
+
+        # Dosya boyutu (yazıcının döndürdüğü bayt sayısı)
+        file_size = await asyncio.to_thread(write_csv, df_anonymized, anonymized_path)
+
+        result.update({
+            "anonymized_file": anonymized_filename,
+            "anonymized_path": f"anonymized/{anonymized_filename}",
+            "file_size_mb": round(file_size / (1024 * 1024), 2)
+        })
+        return result
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Anonimleştirme başarısız: {str(e)}")
 
@@ -152,20 +195,7 @@ async def list_anonymized_files():
         if not os.path.exists(ANONYMIZED_DIR):
             return {"files": []}
 
-        files = []
-        for filename in os.listdir(ANONYMIZED_DIR):
-            if filename.endswith('.csv'):
-                file_path = os.path.join(ANONYMIZED_DIR, filename)
-                file_size = os.path.getsize(file_path)
-
-                files.append({
-                    "filename": filename,
-                    "path": f"anonymized/{filename}",
-                    "size_mb": round(file_size / (1024 * 1024), 2),
-                    "created_at": datetime.fromtimestamp(
-                        os.path.getctime(file_path)
-                    ).isoformat()
-                })
+        files = await asyncio.to_thread(_scan_anonymized_files)
 
         # Tarihe göre sırala (en yeni en üstte)
         files.sort(key=lambda x: x["created_at"], reverse=True)
@@ -196,7 +226,9 @@ async def delete_anonymized_file(filename: str):
         if not os.path.exists(file_path):
             raise HTTPException(status_code=404, detail="Dosya bulunamadı")
 
-        os.remove(file_path)
+        await asyncio.to_thread(os.remove, file_path)
+        # Dosyaya ait parse/rapor cache'leri de silinir
+        await asyncio.to_thread(evict_cached, file_path)
 
         return {
             "status": "success",
@@ -219,8 +251,8 @@ async def analyze_text(text: str):
         Tespit edilen PII'lar
     """
     try:
-        detector = PIIDetector(locale="tr_TR")
-        pii_list = detector.detect_pii_in_text(text, language="tr")
+        detector = await asyncio.to_thread(PIIDetector, locale="tr_TR")
+        pii_list = await asyncio.to_thread(detector.detect_pii_in_text, text, language="tr")
 
         return {
             "status": "success",
@@ -0,0 +1,75 @@
+"""Ortak Response Sınıfları ve Yardımcıları"""
+
+from typing import Any, Tuple
+
+import orjson
+from fastapi import Request
+from fastapi.responses import ORJSONResponse as _ORJSONResponse
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class ORJSONResponse(_ORJSONResponse):
+    """
+    orjson tabanlı JSON response
+
+    Stdlib json ile uyumlu kalmak için int/bool sözlük anahtarlarına (value_counts
+    çıktıları) ve numpy skalerlerine izin verir; NaN/Inf değerleri null olarak yazılır.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    İstemcinin If-None-Match başlığı verilen ETag ile eşleşiyor mu
+
+    Args:
+        request: Gelen istek
+        etag: Kaynağın güncel ETag değeri (tırnaklı)
+
+    Returns:
+        Eşleşiyorsa True (304 döndürülebilir)
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+class SelectiveGZipMiddleware:
+    """
+    Dosya indirme yolları dışındaki yanıtları gzip ile sıkıştıran middleware
+
+    İndirmeler (CSV, zstd sıkıştırılmış Parquet) FileResponse/StreamingResponse ile
+    gönderilir; bunları yeniden sıkıştırmak CPU harcar ve Content-Length başlığını düşürür.
+
+    Args:
+        app: Sarılan ASGI uygulaması
+        exclude_prefixes: Sıkıştırılmayacak yol önekleri
+        minimum_size: Bu boyutun altındaki yanıtlar sıkıştırılmaz
+        compresslevel: gzip seviyesi
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        exclude_prefixes: Tuple[str, ...] = (),
+        minimum_size: int = 500,
+        compresslevel: int = 9
+    ) -> None:
+        self.app = app
+        self.gzip_app = GZipMiddleware(app, minimum_size=minimum_size, compresslevel=compresslevel)
+        self.exclude_prefixes = tuple(exclude_prefixes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and not scope["path"].startswith(self.exclude_prefixes):
+            await self.gzip_app(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
@@ -0,0 +1,193 @@
+"""
+Asenkron Görev API Endpoints
+Faz 4.1: Ağır işlemleri Celery processing kuyruğuna gönderme ve durum sorgulama
+"""
+
+from fastapi import APIRouter, HTTPException, status
+from celery.result import AsyncResult
+from kombu.exceptions import OperationalError
+import asyncio
+
+from app.celery_config import celery_app
+from app.api.dp import ApplyDPRequest
+from app.api.dependencies import resolve_upload_path
+from app.api.pii import PIIAnonymizationRequest
+from app.api.validation import SimilarityRequest, UtilityRequest, _find_file_pair
+from app.tasks.processing_tasks import (
+    apply_dp_async,
+    anonymize_data_async,
+    similarity_report_async,
+    utility_score_async,
+)
+
+router = APIRouter()
+
+
+async def _enqueue(task, **kwargs) -> dict:
+    """
+    Görevi kuyruğa ekle
+
+    Args:
+        task: Celery task
+        **kwargs: Task argümanları
+
+    Returns:
+        task_id ve durum bilgisi
+
+    Raises:
+        HTTPException: Broker'a ulaşılamazsa 503
+    """
+    try:
+        # Broker'a yazma bloklayan I/O
+        result = await asyncio.to_thread(task.delay, **kwargs)
+    except OperationalError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Görev kuyruğuna ulaşılamadı: {str(e)}"
+        )
+
+    return {
+        "task_id": result.id,
+        "status": "queued"
+    }
+
+
+async def _require_upload(filename: str) -> None:
+    """Dosya adı yükleme dizini dışını gösteriyorsa 400, dosya yoksa 404 döndür"""
+    await asyncio.to_thread(resolve_upload_path, filename)
+
+
+async def _require_pair(original_file: str, synthetic_file: str) -> tuple:
+    """Orijinal ve sentetik dosyaların yollarını bul, yoksa 404 döndür"""
+    orig_path, synth_path = await asyncio.to_thread(_find_file_pair, original_file, synthetic_file)
+
+    if not orig_path:
+        raise HTTPException(status_code=404, detail=f"Orijinal dosya bulunamadı: {original_file}")
+
+    if not synth_path:
+        raise HTTPException(status_code=404, detail=f"Sentetik dosya bulunamadı: {synthetic_file}")
+
+    return orig_path, synth_path
+
+
+@router.post("/tasks/apply-dp", status_code=status.HTTP_202_ACCEPTED)
+async def enqueue_apply_dp(request: ApplyDPRequest):
+    """
+    Differential privacy uygulamasını kuyruğa ekle
+
+    Args:
+        request: DP uygulama isteği
+
+    Returns:
+        task_id (sonuç GET /tasks/{task_id} ile alınır)
+    """
+    await _require_upload(request.filename)
+
+    return await _enqueue(
+        apply_dp_async,
+        filename=request.filename,
+        epsilon=request.epsilon,
+        delta=request.delta,
+        mechanism=request.mechanism,
+        columns=request.columns,
+        bounds=request.bounds,
+        output_format=request.format
+    )
+
+
+@router.post("/tasks/anonymize", status_code=status.HTTP_202_ACCEPTED)
+async def enqueue_anonymize(request: PIIAnonymizationRequest):
+    """
+    PII anonimleştirmesini kuyruğa ekle
+
+    Args:
+        request: Anonimleştirme isteği
+
+    Returns:
+        task_id (sonuç GET /tasks/{task_id} ile alınır)
+    """
+    await _require_upload(request.filename)
+
+    return await _enqueue(
+        anonymize_data_async,
+        filename=request.filename,
+        columns=request.columns,
+        consistent=request.consistent,
+        locale=request.locale,
+        return_file=request.return_file
+    )
+
+
+@router.post("/tasks/similarity-report", status_code=status.HTTP_202_ACCEPTED)
+async def enqueue_similarity_report(request: SimilarityRequest):
+    """
+    Similarity raporunu kuyruğa ekle
+
+    Args:
+        request: Similarity report isteği
+
+    Returns:
+        task_id (sonuç GET /tasks/{task_id} ile alınır)
+    """
+    orig_path, synth_path = await _require_pair(request.original_file, request.synthetic_file)
+
+    return await _enqueue(
+        similarity_report_async,
+        orig_path=orig_path,
+        synth_path=synth_path,
+        include_matrices=request.include_matrices
+    )
+
+
+@router.post("/tasks/utility-score", status_code=status.HTTP_202_ACCEPTED)
+async def enqueue_utility_score(request: UtilityRequest):
+    """
+    Utility score hesaplamasını kuyruğa ekle
+
+    Args:
+        request: Utility score isteği
+
+    Returns:
+        task_id (sonuç GET /tasks/{task_id} ile alınır)
+    """
+    orig_path, synth_path = await _require_pair(request.original_file, request.synthetic_file)
+
+    return await _enqueue(
+        utility_score_async,
+        orig_path=orig_path,
+        synth_path=synth_path,
+        target_column=request.target_column,
+        task_type=request.task_type
+    )
+
+
+@router.get("/tasks/{task_id}")
+async def get_task_status(task_id: str):
+    """
+    Görev durumunu sorgula
+
+    Args:
+        task_id: Kuyruğa eklenirken dönen görev ID'si
+
+    Returns:
+        Görev durumu; tamamlandıysa sonuç, başarısızsa hata mesajı
+    """
+    result = AsyncResult(task_id, app=celery_app)
+
+    # Sonuç backend'i okumak bloklayan I/O
+    state, info = await asyncio.to_thread(lambda: (result.state, result.info))
+
+    response = {
+        "task_id": task_id,
+        "status": state.lower()
+    }
+
+    if state == "SUCCESS":
+        response["result"] = info
+    elif state == "FAILURE":
+        response["error"] = str(info)
+    elif isinstance(info, dict):
+        # PROGRESS: task'ın update_state ile bildirdiği adım
+        response["progress"] = info.get("status")
+
+    return response
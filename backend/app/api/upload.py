@@ -1,23 +1,134 @@
 """CSV Dosya Yükleme Endpoint"""
 
-from fastapi import APIRouter, UploadFile, File, HTTPException, status
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, UploadFile, File, HTTPException, status, Depends
 import pandas as pd
 import os
 from pathlib import Path
-import shutil
 from datetime import datetime
+import anyio
+import asyncio
+import csv
+from typing import Tuple, List, Dict, Any
 
-router = APIRouter()
+from app.api.dependencies import UPLOAD_DIR, upload_csv_file
+from app.api.responses import ORJSONResponse
+from app.services.data_io import read_csv_table, write_csv_table, pandas_dtype_names, evict_cached
+
+router = APIRouter(default_response_class=ORJSONResponse)
 
 # Yükleme dizini
-UPLOAD_DIR = Path(os.getenv("UPLOAD_DIR", "./uploads"))
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
 # Maksimum dosya boyutu (MB cinsinden)
 MAX_FILE_SIZE_MB = int(os.getenv("MAX_UPLOAD_SIZE", "100"))
 MAX_FILE_SIZE_BYTES = MAX_FILE_SIZE_MB * 1024 * 1024
 
+# Diske yazarken kullanılan parça boyutu
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MB
+
+# İçerik doğrulaması için dosya başından okunan örnek boyutu
+SNIFF_SAMPLE_SIZE = 64 * 1024  # 64 KB
+
+# Örnekteki yazdırılabilir karakterlerin asgari oranı (altı ikili dosya sayılır)
+MIN_PRINTABLE_RATIO = 0.95
+
+
+def _sniff_delimiter(sample: bytes) -> str:
+    """
+    Dosyanın başından CSV olup olmadığını kontrol et ve ayırıcıyı tespit et
+
+    Parser'a büyük bir ikili dosya verilmeden önce ucuz bir ön kontrol yapılır.
+
+    Args:
+        sample: Dosyanın ilk baytları
+
+    Returns:
+        Ayırıcı karakter (tespit edilemezse tek sütunlu CSV kabul edilir: ",")
+
+    Raises:
+        HTTPException: İçerik metin/CSV değilse
+    """
+    text = sample.decode("utf-8", errors="replace")
+    # Örnek satır ortasında kesilmiş olabilir; son eksik satırı at
+    if len(sample) >= SNIFF_SAMPLE_SIZE and "\n" in text:
+        text = text[:text.rindex("\n")]
+
+    printable = sum(ch.isprintable() or ch in "\r\n\t" for ch in text)
+    if "\x00" in text or (text and printable / len(text) < MIN_PRINTABLE_RATIO):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Dosya içeriği geçerli bir CSV değil"
+        )
+
+    try:
+        return csv.Sniffer().sniff(text, delimiters=",;\t|").delimiter
+    except csv.Error:
+        return ","
+
+
+def _summarize_csv(file_path: Path, delimiter: str = ",") -> Dict[str, Any]:
+    """
+    Yüklenen CSV'nin özet bilgilerini Arrow tablosundan çıkar
+
+    pandas'a çevrilmez: null sayıları Arrow'un hazır sayaçlarından, örnek satırlar
+    ilk 5 satırlık dilimden okunur. Ayırıcı virgül değilse dosya virgül ayırıcılı
+    olarak yeniden yazılır; diğer servisler (load_df, DataProfiler, DataCleaner,
+    CTGANTrainer) dosyayı her zaman "," ile okur.
+
+    Args:
+        file_path: CSV dosya yolu
+        delimiter: Ayırıcı karakter
+
+    Returns:
+        file_size_bytes, data_info, column_types ve sample_data alanları
+    """
+    table = read_csv_table(file_path, delimiter=delimiter)
+
+    if delimiter == ",":
+        file_size = file_path.stat().st_size
+    else:
+        # Yarım yazılmış dosya okunmasın diye önce geçici dosyaya yaz
+        tmp_path = file_path.with_name(f".{file_path.name}.{os.getpid()}.tmp")
+        try:
+            file_size = write_csv_table(table, tmp_path)
+            os.replace(tmp_path, file_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    return {
+        "file_size_bytes": file_size,
+        "data_info": {
+            "total_rows": table.num_rows,
+            "total_columns": table.num_columns,
+            "column_names": table.column_names,
+            "memory_usage_mb": round(table.nbytes / (1024 * 1024), 2),
+            "missing_values": {
+                name: column.null_count for name, column in zip(table.column_names, table.columns)
+            },
+        },
+        "column_types": pandas_dtype_names(table),
+        "sample_data": table.slice(0, 5).to_pylist()
+    }
+
+
+def _scan_uploads() -> List[Dict[str, Any]]:
+    """Yükleme dizinindeki CSV dosyalarını tek scandir geçişiyle tara"""
+    files = []
+    with os.scandir(UPLOAD_DIR) as entries:
+        for entry in entries:
+            if not entry.name.endswith(".csv") or not entry.is_file():
+                continue
+
+            file_stat = entry.stat()
+            files.append({
+                "filename": entry.name,
+                "size_mb": round(file_stat.st_size / (1024 * 1024), 2),
+                "created_at": datetime.fromtimestamp(file_stat.st_ctime).isoformat(),
+                "modified_at": datetime.fromtimestamp(file_stat.st_mtime).isoformat(),
+            })
+
+    return files
+
 
 @router.post("/upload/csv", status_code=status.HTTP_201_CREATED)
 async def upload_csv(file: UploadFile = File(...)):
@@ -41,16 +152,6 @@ async def upload_csv(file: UploadFile = File(...)):
             detail="Sadece CSV dosyaları kabul edilir"
         )
 
-    # Dosya boyutu kontrolü
-    contents = await file.read()
-    file_size = len(contents)
-
-    if file_size > MAX_FILE_SIZE_BYTES:
-        raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail=f"Dosya boyutu {MAX_FILE_SIZE_MB}MB'ı aşamaz"
-        )
-
     # Benzersiz dosya adı oluştur
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     original_filename = Path(file.filename).stem
@@ -59,13 +160,26 @@ async def upload_csv(file: UploadFile = File(...)):
     file_path = UPLOAD_DIR / unique_filename
 
     try:
-        # Dosyayı kaydet
-        await file.seek(0)  # Dosya okuma pozisyonunu başa al
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-
-        # Pandas ile dosyayı oku ve analiz et
-        df = pd.read_csv(file_path)
+        # Dosyayı parça parça kaydet: içerik bellekte tutulmaz, boyut limiti yazarken kontrol edilir
+        file_size = 0
+        delimiter = None
+        async with await anyio.open_file(file_path, "wb") as buffer:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                if delimiter is None:
+                    # İlk parçadan içerik kontrolü: geçersiz dosya diske yazılmadan reddedilir
+                    delimiter = _sniff_delimiter(chunk[:SNIFF_SAMPLE_SIZE])
+                file_size += len(chunk)
+                if file_size > MAX_FILE_SIZE_BYTES:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"Dosya boyutu {MAX_FILE_SIZE_MB}MB'ı aşamaz"
+                    )
+                await buffer.write(chunk)
+
+        # Dosyayı oku ve analiz et
+        summary = await asyncio.to_thread(_summarize_csv, file_path, delimiter or ",")
+        # Ayırıcı normalize edildiyse saklanan dosyanın boyutu
+        file_size = summary.pop("file_size_bytes")
 
         # Temel istatistikler
         stats = {
@@ -75,18 +189,10 @@ async def upload_csv(file: UploadFile = File(...)):
             "file_size_mb": round(file_size / (1024 * 1024), 2),
             "upload_path": str(file_path),
             "timestamp": timestamp,
-            "data_info": {
-                "total_rows": len(df),
-                "total_columns": len(df.columns),
-                "column_names": df.columns.tolist(),
-                "memory_usage_mb": round(df.memory_usage(deep=True).sum() / (1024 * 1024), 2),
-                "missing_values": df.isnull().sum().to_dict(),
-            },
-            "column_types": df.dtypes.astype(str).to_dict(),
-            "sample_data": df.head(5).to_dict(orient="records")
+            **summary
         }
 
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=status.HTTP_201_CREATED,
             content={
                 "message": "Dosya başarıyla yüklendi ve analiz edildi",
@@ -94,6 +200,11 @@ async def upload_csv(file: UploadFile = File(...)):
             }
         )
 
+    except HTTPException:
+        # Yarım yazılmış dosyayı sil
+        file_path.unlink(missing_ok=True)
+        raise
+
     except pd.errors.EmptyDataError:
         # Dosyayı sil
         if file_path.exists():
@@ -134,17 +245,9 @@ async def list_uploads():
         Liste of uploaded files with metadata
     """
     try:
-        files = []
-        for file_path in UPLOAD_DIR.glob("*.csv"):
-            file_stat = file_path.stat()
-            files.append({
-                "filename": file_path.name,
-                "size_mb": round(file_stat.st_size / (1024 * 1024), 2),
-                "created_at": datetime.fromtimestamp(file_stat.st_ctime).isoformat(),
-                "modified_at": datetime.fromtimestamp(file_stat.st_mtime).isoformat(),
-            })
+        files = await asyncio.to_thread(_scan_uploads)
 
-        return JSONResponse(
+        return ORJSONResponse(
             content={
                 "total_files": len(files),
                 "files": sorted(files, key=lambda x: x["created_at"], reverse=True)
@@ -159,7 +262,10 @@ async def list_uploads():
 
 
 @router.delete("/uploads/{filename}", status_code=status.HTTP_200_OK)
-async def delete_upload(filename: str):
+async def delete_upload(
+    filename: str,
+    upload: Tuple[Path, os.stat_result] = Depends(upload_csv_file)
+):
     """
     Yüklenmiş CSV dosyasını sil
 
@@ -172,23 +278,13 @@ async def delete_upload(filename: str):
     Raises:
         HTTPException: Dosya bulunamadı veya silinemedi
     """
-    file_path = UPLOAD_DIR / filename
-
-    if not file_path.exists():
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Dosya bulunamadı"
-        )
-
-    if not file_path.suffix == ".csv":
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Sadece CSV dosyaları silinebilir"
-        )
+    file_path, _ = upload
 
     try:
         file_path.unlink()
-        return JSONResponse(
+        # Dosyaya ait parse/rapor cache'leri de silinir
+        await asyncio.to_thread(evict_cached, file_path)
+        return ORJSONResponse(
             content={
                 "message": f"{filename} başarıyla silindi"
             }
@@ -5,12 +5,14 @@ Faz 3: Similarity Report ve Utility Score API
 
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
-from typing import Optional, Literal
+from typing import Optional, Literal, Tuple
 import pandas as pd
 import os
+import asyncio
 
 from app.services.similarity_report import SimilarityReport
 from app.services.utility_score import UtilityScore
+from app.services.data_io import load_table
 
 router = APIRouter()
 
@@ -18,10 +20,77 @@ router = APIRouter()
 UPLOAD_DIR = "uploads"
 
 
+async def _read_pair(orig_path: str, synth_path: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Orijinal ve sentetik dosyaları (CSV/Parquet) thread'lerde eşzamanlı oku"""
+    df_original, df_synthetic = await asyncio.gather(
+        asyncio.to_thread(load_table, orig_path),
+        asyncio.to_thread(load_table, synth_path)
+    )
+    return df_original, df_synthetic
+
+
+# Dosyaların bulunabileceği dizinler (uploads'a göre, aranma sırasıyla)
+SEARCH_SUBDIRS = ("", "outputs", "differential_privacy", "anonymized")
+
+
+def _locate(filename: str) -> Optional[str]:
+    """
+    Dosyayı bilinen dizinlerde ara
+
+    Args:
+        filename: Dosya adı (alt dizin içeremez)
+
+    Returns:
+        Bulunan ilk dosya yolu (yoksa None)
+    """
+    # Ağaç taranmıyor; "../" gibi yollar da kabul edilmez
+    if not filename or os.path.basename(filename) != filename:
+        return None
+
+    for subdir in SEARCH_SUBDIRS:
+        path = os.path.join(UPLOAD_DIR, subdir, filename)
+        if os.path.isfile(path):
+            return path
+
+    return None
+
+
+def _find_file_pair(original_file: str, synthetic_file: str) -> Tuple[Optional[str], Optional[str]]:
+    """Orijinal ve sentetik dosyaların yollarını bul (bloklayan stat çağrıları)"""
+    return _locate(original_file), _locate(synthetic_file)
+
+
+def _scan_synthetic_files() -> list:
+    """CTGAN, DP ve anonymized çıktı dizinlerini tara"""
+    synthetic_files = []
+
+    for subdir, file_type in (
+        ("outputs", "ctgan"),
+        ("differential_privacy", "differential_privacy"),
+        ("anonymized", "anonymized"),
+    ):
+        try:
+            entries = os.scandir(os.path.join(UPLOAD_DIR, subdir))
+        except FileNotFoundError:
+            continue
+
+        with entries:
+            for entry in entries:
+                if entry.name.endswith(('.csv', '.parquet')):
+                    synthetic_files.append({
+                        "filename": entry.name,
+                        "type": file_type,
+                        "path": f"{subdir}/{entry.name}"
+                    })
+
+    return synthetic_files
+
+
 class SimilarityRequest(BaseModel):
     """Similarity report isteği"""
     original_file: str
     synthetic_file: str
+    include_matrices: bool = Field(default=False, description="Korelasyon matrislerini rapora ekle")
 
 
 class ColumnComparisonRequest(BaseModel):
@@ -52,16 +121,9 @@ async def generate_similarity_report(request: SimilarityRequest):
     """
     try:
         # Dosyaları bul
-        orig_path = None
-        synth_path = None
-
-        # Uploads ve alt dizinlerde ara
-        for root, dirs, files in os.walk(UPLOAD_DIR):
-            for file in files:
-                if file == request.original_file:
-                    orig_path = os.path.join(root, file)
-                if file == request.synthetic_file:
-                    synth_path = os.path.join(root, file)
+        orig_path, synth_path = await asyncio.to_thread(
+            _find_file_pair, request.original_file, request.synthetic_file
+        )
 
         if not orig_path:
             raise HTTPException(status_code=404, detail=f"Orijinal dosya bulunamadı: {request.original_file}")
@@ -69,13 +131,17 @@ async def generate_similarity_report(request: SimilarityRequest):
         if not synth_path:
             raise HTTPException(status_code=404, detail=f"Sentetik dosya bulunamadı: {request.synthetic_file}")
 
-        # CSV'leri oku
-        df_original = pd.read_csv(orig_path)
-        df_synthetic = pd.read_csv(synth_path)
+        # Dosyaları oku
+        df_original, df_synthetic = await _read_pair(orig_path, synth_path)
 
         # Similarity report oluştur
         similarity_service = SimilarityReport()
-        report = similarity_service.generate_full_report(df_original, df_synthetic)
+        report = await asyncio.to_thread(
+            similarity_service.generate_full_report,
+            df_original,
+            df_synthetic,
+            include_matrices=request.include_matrices
+        )
 
         return {
             "status": "success",
@@ -101,26 +167,20 @@ async def compare_column(request: ColumnComparisonRequest):
     """
     try:
         # Dosyaları bul
-        orig_path = None
-        synth_path = None
-
-        for root, dirs, files in os.walk(UPLOAD_DIR):
-            for file in files:
-                if file == request.original_file:
-                    orig_path = os.path.join(root, file)
-                if file == request.synthetic_file:
-                    synth_path = os.path.join(root, file)
+        orig_path, synth_path = await asyncio.to_thread(
+            _find_file_pair, request.original_file, request.synthetic_file
+        )
 
         if not orig_path or not synth_path:
             raise HTTPException(status_code=404, detail="Dosyalar bulunamadı")
 
-        # CSV'leri oku
-        df_original = pd.read_csv(orig_path)
-        df_synthetic = pd.read_csv(synth_path)
+        # Dosyaları oku
+        df_original, df_synthetic = await _read_pair(orig_path, synth_path)
 
         # Sütun karşılaştırması
         similarity_service = SimilarityReport()
-        comparison = similarity_service.generate_column_comparison(
+        comparison = await asyncio.to_thread(
+            similarity_service.generate_column_comparison,
             df_original,
             df_synthetic,
             request.column
@@ -148,15 +208,9 @@ async def calculate_utility_score(request: UtilityRequest):
     """
     try:
         # Dosyaları bul
-        orig_path = None
-        synth_path = None
-
-        for root, dirs, files in os.walk(UPLOAD_DIR):
-            for file in files:
-                if file == request.original_file:
-                    orig_path = os.path.join(root, file)
-                if file == request.synthetic_file:
-                    synth_path = os.path.join(root, file)
+        orig_path, synth_path = await asyncio.to_thread(
+            _find_file_pair, request.original_file, request.synthetic_file
+        )
 
         if not orig_path:
             raise HTTPException(status_code=404, detail=f"Orijinal dosya bulunamadı: {request.original_file}")
@@ -164,13 +218,13 @@ async def calculate_utility_score(request: UtilityRequest):
         if not synth_path:
             raise HTTPException(status_code=404, detail=f"Sentetik dosya bulunamadı: {request.synthetic_file}")
 
-        # CSV'leri oku
-        df_original = pd.read_csv(orig_path)
-        df_synthetic = pd.read_csv(synth_path)
+        # Dosyaları oku
+        df_original, df_synthetic = await _read_pair(orig_path, synth_path)
 
         # Utility score hesapla
         utility_service = UtilityScore()
-        report = utility_service.assess_utility(
+        report = await asyncio.to_thread(
+            utility_service.assess_utility,
             df_original,
             df_synthetic,
             target_column=request.target_column,
@@ -198,40 +252,7 @@ async def list_synthetic_files():
         Sentetik dosya listesi
     """
     try:
-        synthetic_files = []
-
-        # CTGAN outputs
-        ctgan_dir = os.path.join(UPLOAD_DIR, "outputs")
-        if os.path.exists(ctgan_dir):
-            for filename in os.listdir(ctgan_dir):
-                if filename.endswith('.csv'):
-                    synthetic_files.append({
-                        "filename": filename,
-                        "type": "ctgan",
-                        "path": f"outputs/{filename}"
-                    })
-
-        # DP outputs
-        dp_dir = os.path.join(UPLOAD_DIR, "differential_privacy")
-        if os.path.exists(dp_dir):
-            for filename in os.listdir(dp_dir):
-                if filename.endswith('.csv'):
-                    synthetic_files.append({
-                        "filename": filename,
-                        "type": "differential_privacy",
-                        "path": f"differential_privacy/{filename}"
-                    })
-
-        # Anonymized outputs
-        anon_dir = os.path.join(UPLOAD_DIR, "anonymized")
-        if os.path.exists(anon_dir):
-            for filename in os.listdir(anon_dir):
-                if filename.endswith('.csv'):
-                    synthetic_files.append({
-                        "filename": filename,
-                        "type": "anonymized",
-                        "path": f"anonymized/{filename}"
-                    })
+        synthetic_files = await asyncio.to_thread(_scan_synthetic_files)
 
         return {
             "status": "success",
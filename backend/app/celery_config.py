@@ -22,21 +22,29 @@ celery_app = Celery(
 
 # Celery Configuration
 celery_app.conf.update(
-    task_serializer='json',
-    accept_content=['json'],
-    result_serializer='json',
+    # msgpack: C tabanlı encoder, JSON'dan küçük payload; eski JSON mesajlar da kabul edilir
+    task_serializer='msgpack',
+    accept_content=['msgpack', 'json'],
+    result_serializer='msgpack',
+    result_accept_content=['msgpack', 'json'],
     timezone='Europe/Istanbul',
     enable_utc=True,
     task_track_started=True,
     task_time_limit=3600,  # 1 hour max
     task_soft_time_limit=3000,  # 50 minutes soft limit
+    # Uzun ve süresi değişken görevler: worker yalnızca çalıştırdığı görevi rezerve eder,
+    # görev bitince onaylanır (worker çökerse görev kuyruğa geri döner)
     worker_prefetch_multiplier=1,
+    task_acks_late=True,
+    # Onaylanmamış görevin Redis'te yeniden dağıtılma süresi; task_time_limit'ten uzun
+    # olmalı, yoksa hâlâ çalışan görev ikinci bir worker'a verilir
+    broker_transport_options={'visibility_timeout': 7200},
     worker_max_tasks_per_child=50,
     result_expires=3600,  # Results expire after 1 hour
     broker_connection_retry_on_startup=True,
 )
 
-# Task routes
+# Task routes (ctgan: GPU'ya sabitlenmiş solo worker, processing: prefork CPU worker'ları)
 celery_app.conf.task_routes = {
     'app.tasks.ctgan_tasks.*': {'queue': 'ctgan'},
     'app.tasks.processing_tasks.*': {'queue': 'processing'},
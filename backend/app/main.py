@@ -2,21 +2,33 @@
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+import asyncio
 import os
+import sys
 from dotenv import load_dotenv
 
 # Ortam değişkenlerini yükle
 load_dotenv()
 
 # API router'ları import et
-from app.api import upload, analysis, ctgan, pii, dp, validation
+from app.api import upload, analysis, ctgan, pii, dp, validation, tasks
+from app.api.responses import ORJSONResponse, SelectiveGZipMiddleware
+
+# Uygulama bilgileri (import sırasında bir kez okunur)
+APP_NAME = os.getenv("APP_NAME", "MissingLink")
+APP_VERSION = os.getenv("APP_VERSION", "1.0.0")
+
+# Başlangıçta CUDA context'i oluşturulsun mu (ilk /train isteği bu maliyeti ödemez).
+# Varsayılan kapalı: her uvicorn worker'ı kendi context'ini (yüzlerce MB GPU belleği)
+# CTGAN worker'ının da kullandığı GPU'da açar; yalnızca tek worker'lı kurulumlarda açın.
+CUDA_WARMUP = os.getenv("CUDA_WARMUP", "false").lower() == "true"
 
 # FastAPI uygulaması oluştur
 app = FastAPI(
-    title=os.getenv("APP_NAME", "MissingLink"),
-    version=os.getenv("APP_VERSION", "1.0.0"),
+    title=APP_NAME,
+    version=APP_VERSION,
     description="Deep Learning tabanlı sentetik veri üretim motoru",
+    default_response_class=ORJSONResponse,
     docs_url="/docs",
     redoc_url="/redoc"
 )
@@ -32,6 +44,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Yanıt sıkıştırma (1 KB üzeri JSON raporları gzip ile gönderilir; dosya indirmeleri
+# olduğu gibi, Content-Length ile gönderilir)
+app.add_middleware(
+    SelectiveGZipMiddleware,
+    exclude_prefixes=("/api/v1/download/",),
+    minimum_size=1024,
+    compresslevel=5
+)
+
 # API router'larını ekle
 app.include_router(upload.router, prefix="/api/v1", tags=["Upload"])
 app.include_router(analysis.router, prefix="/api/v1", tags=["Analysis"])
@@ -39,18 +60,40 @@ app.include_router(ctgan.router, prefix="/api/v1", tags=["CTGAN"])
 app.include_router(pii.router, prefix="/api/v1", tags=["PII"])
 app.include_router(dp.router, prefix="/api/v1", tags=["Differential Privacy"])
 app.include_router(validation.router, prefix="/api/v1", tags=["Validation"])
+app.include_router(tasks.router, prefix="/api/v1", tags=["Tasks"])
+
+def _warmup_cuda() -> None:
+    """CUDA context'ini ve cuBLAS'ı küçük bir tensör işlemiyle başlat"""
+    import torch
+
+    if torch.cuda.is_available():
+        torch.zeros(1, device="cuda").sum().item()
+
+
+@app.on_event("startup")
+async def warmup():
+    """
+    Ağır başlatma maliyetlerini ilk istekten önce öde
+
+    torch/SDV import'ları ctgan router'ı üzerinden zaten yüklenmiş olur; CUDA context'i ise
+    ilk GPU işleminde birkaç saniyede oluşur. Sunucu bu adım bitince istek kabul etmeye başlar.
+    """
+    # Model manifest'i diskle bir kez eşitlenir (import sırasında değil)
+    await asyncio.to_thread(ctgan.model_registry.sync_from_disk)
+
+    if CUDA_WARMUP:
+        await asyncio.to_thread(_warmup_cuda)
+
 
 # Health check endpoint
 @app.get("/health")
 async def health_check():
     """Sistem sağlık kontrolü"""
-    return JSONResponse(
-        content={
-            "status": "healthy",
-            "app": os.getenv("APP_NAME", "MissingLink"),
-            "version": os.getenv("APP_VERSION", "1.0.0")
-        }
-    )
+    return {
+        "status": "healthy",
+        "app": APP_NAME,
+        "version": APP_VERSION
+    }
 
 @app.get("/")
 async def root():
@@ -67,10 +110,16 @@ if __name__ == "__main__":
     host = os.getenv("HOST", "0.0.0.0")
     port = int(os.getenv("PORT", 8000))
     debug = os.getenv("DEBUG", "True").lower() == "true"
+    # reload modunda uvicorn tek process çalıştırır, WORKERS yok sayılır
+    workers = int(os.getenv("WORKERS", 1))
 
     uvicorn.run(
         "app.main:app",
         host=host,
         port=port,
-        reload=debug
+        reload=debug,
+        workers=workers,
+        # uvloop Windows'u desteklemiyor; orada asyncio döngüsü kullanılır
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools"
     )
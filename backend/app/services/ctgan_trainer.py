@@ -2,37 +2,90 @@
 
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional, Union
 from pathlib import Path
+import os
 import pickle
 import json
+import joblib
+import torch
 from datetime import datetime
 
 from sdv.single_table import CTGANSynthesizer
 from sdv.metadata import SingleTableMetadata
 
+from app.services.data_io import downcast_numeric, load_df
+
+
+# Model dosyaları (eski kayıtlar pickle ile yazılmış olabilir)
+MODEL_FILENAME = "ctgan_model.joblib"
+LEGACY_MODEL_FILENAME = "ctgan_model.pkl"
+
+# zlib seviye 3: ağırlık dosyalarını belirgin küçültür, yükleme süresini pek etkilemez
+MODEL_COMPRESSION = 3
+
+# GPU'da float32 matmul hassasiyeti: "high" TF32, "medium" bfloat16 tensor core kullanır
+# ("highest" tam FP32, eski davranış)
+MATMUL_PRECISION = os.getenv("CTGAN_MATMUL_PRECISION", "high")
+
+# dtype.kind -> SDV sdtype (bool dahil sayısal tipler numerical; geri kalanı categorical)
+KIND_TO_SDTYPE = {
+    "i": "numerical",
+    "u": "numerical",
+    "f": "numerical",
+    "c": "numerical",
+    "b": "numerical",
+    "M": "datetime",
+}
+
+# Eğitim verisindeki float64 sütunlar float32'ye çevrilsin mi (kayıplı, varsayılan kapalı)
+DOWNCAST_FLOATS = os.getenv("CTGAN_DOWNCAST_FLOATS", "false").lower() == "true"
+
+# Parça parça üretimde bir seferde örneklenen satır sayısı
+SYNTHETIC_CHUNK_ROWS = 50_000
+
 
 class CTGANTrainer:
     """CTGAN modelini eğiten ve sentetik veri üreten servis"""
 
-    def __init__(self, data):
+    def __init__(self, data=None, downcast_floats: bool = DOWNCAST_FLOATS):
         """
         Args:
-            data: Eğitim için kullanılacak CSV dosya yolu (str) veya DataFrame
+            data: Eğitim için kullanılacak CSV dosya yolu (str), DataFrame veya None
+                (kaydedilmiş modelden yükleme: veri okunmaz)
+            downcast_floats: float64 sütunlar float32'ye çevrilsin mi (kayıplı)
         """
-        if isinstance(data, (str, Path)):
+        if data is None:
+            self.file_path = None
+            self.df = None
+        elif isinstance(data, (str, Path)):
             self.file_path = Path(data)
-            self.df = pd.read_csv(data)
+            self.df = downcast_numeric(load_df(data), floats=downcast_floats)
         elif isinstance(data, pd.DataFrame):
             self.file_path = None
             self.df = data
         else:
-            raise ValueError("data parametresi str, Path veya DataFrame olmalı")
+            raise ValueError("data parametresi str, Path, DataFrame veya None olmalı")
 
         self.metadata = None
         self.synthesizer = None
         self.training_stats = {}
 
+    @classmethod
+    def from_saved(cls, model_path: str) -> "CTGANTrainer":
+        """
+        Kaydedilmiş modelden trainer oluştur (CSV okunmaz)
+
+        Args:
+            model_path: Model dizin yolu
+
+        Returns:
+            Modeli yüklenmiş CTGANTrainer
+        """
+        trainer = cls(None)
+        trainer.load_model(model_path)
+        return trainer
+
     def prepare_metadata(self) -> SingleTableMetadata:
         """
         Veri seti için metadata oluştur (PII detection kapalı)
@@ -40,19 +93,16 @@ class CTGANTrainer:
         Returns:
             SDV SingleTableMetadata objesi
         """
-        # Manuel metadata oluştur (PII detection olmadan)
-        metadata = SingleTableMetadata()
-
-        # Her kolonu manuel ekle - PII olarak işaretlenmeyecek
-        for column in self.df.columns:
-            if pd.api.types.is_numeric_dtype(self.df[column]):
-                metadata.add_column(column, sdtype='numerical')
-            elif pd.api.types.is_datetime64_any_dtype(self.df[column]):
-                metadata.add_column(column, sdtype='datetime')
-            elif pd.api.types.is_bool_dtype(self.df[column]):
-                metadata.add_column(column, sdtype='boolean')
-            else:
-                metadata.add_column(column, sdtype='categorical')
+        # Manuel metadata oluştur (PII detection olmadan): sdtype'lar dtype.kind'dan tek
+        # geçişte belirlenir, sütunlar tek dict ile yüklenir (add_column başına doğrulama yok)
+        columns = {
+            column: {"sdtype": KIND_TO_SDTYPE.get(dtype.kind, "categorical")}
+            for column, dtype in self.df.dtypes.items()
+        }
+        metadata = SingleTableMetadata.load_from_dict({
+            "METADATA_SPEC_VERSION": "SINGLE_TABLE_V1",
+            "columns": columns
+        })
 
         self.metadata = metadata
         return metadata
@@ -63,23 +113,38 @@ class CTGANTrainer:
         batch_size: int = 500,
         generator_dim: tuple = (256, 256),
         discriminator_dim: tuple = (256, 256),
-        verbose: bool = False
+        verbose: bool = False,
+        cuda: Union[bool, str] = True,
+        pac: int = 10
     ) -> Dict[str, Any]:
         """
         CTGAN modelini eğit
 
         Args:
             epochs: Eğitim epoch sayısı
-            batch_size: Batch boyutu
+            batch_size: Batch boyutu (pac'ın katı olmalı)
             generator_dim: Generator katman boyutları
             discriminator_dim: Discriminator katman boyutları
             verbose: Detaylı log
+            cuda: GPU kullanımı (True, False veya "cuda:0" gibi cihaz adı)
+            pac: Discriminator'a birlikte verilen örnek sayısı (packing)
 
         Returns:
             Eğitim istatistikleri
         """
+        # API'de TrainRequest zaten doğrular; doğrudan çağıranlar için koruma
+        if batch_size % pac != 0:
+            raise ValueError(f"batch_size ({batch_size}) pac'ın ({pac}) katı olmalı")
+
         start_time = datetime.now()
 
+        # GPU istenmiş ama yoksa CTGAN sessizce CPU'ya düşer; gerçek cihaz istatistiklere yazılır
+        device = "cpu"
+        if cuda and torch.cuda.is_available():
+            device = cuda if isinstance(cuda, str) else "cuda"
+            # Generator/discriminator MLP'leri matmul ağırlıklı; tensor core'lar devreye girer
+            torch.set_float32_matmul_precision(MATMUL_PRECISION)
+
         # Metadata hazırla
         if self.metadata is None:
             self.prepare_metadata()
@@ -91,7 +156,9 @@ class CTGANTrainer:
             batch_size=batch_size,
             generator_dim=generator_dim,
             discriminator_dim=discriminator_dim,
-            verbose=verbose
+            verbose=verbose,
+            cuda=cuda,
+            pac=pac
         )
 
         # Modeli eğit
@@ -110,6 +177,8 @@ class CTGANTrainer:
                 "batch_size": batch_size,
                 "generator_dim": list(generator_dim),
                 "discriminator_dim": list(discriminator_dim),
+                "pac": pac,
+                "device": device,
                 "training_samples": len(self.df),
                 "training_columns": len(self.df.columns),
                 "trained_at": end_time.isoformat(),
@@ -156,6 +225,36 @@ class CTGANTrainer:
         except Exception as e:
             raise ValueError(f"Sentetik veri üretimi başarısız: {str(e)}")
 
+    def generate_synthetic_data_stream(
+        self,
+        num_rows: int = 1000,
+        chunk_rows: int = SYNTHETIC_CHUNK_ROWS,
+        batch_size: Optional[int] = None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Sentetik veriyi parça parça üret
+
+        Bellekte en fazla bir parça tutulur; çağıran her parçayı diske yazıp bırakabilir.
+
+        Args:
+            num_rows: Üretilecek toplam satır sayısı
+            chunk_rows: Parça başına satır sayısı
+            batch_size: Batch boyutu (None ise otomatik)
+
+        Yields:
+            Sentetik veri parçaları
+        """
+        emitted = 0
+        while emitted < num_rows:
+            chunk = self.generate_synthetic_data(
+                num_rows=min(chunk_rows, num_rows - emitted),
+                batch_size=batch_size
+            )
+            if chunk.empty:
+                break
+            emitted += len(chunk)
+            yield chunk
+
     def save_model(self, model_path: str) -> Dict[str, Any]:
         """
         Eğitilmiş modeli kaydet
@@ -173,11 +272,16 @@ class CTGANTrainer:
         model_dir.mkdir(parents=True, exist_ok=True)
 
         # Model dosyası
-        model_file = model_dir / "ctgan_model.pkl"
+        model_file = model_dir / MODEL_FILENAME
+
+        # Modeli sıkıştırarak kaydet (protocol 5: tensör/ndarray buffer'ları kopyasız serileştirilir)
+        joblib.dump(
+            self.synthesizer, model_file,
+            compress=MODEL_COMPRESSION, protocol=pickle.HIGHEST_PROTOCOL
+        )
 
-        # Modeli kaydet
-        with open(model_file, 'wb') as f:
-            pickle.dump(self.synthesizer, f)
+        # Aynı dizinde eski pickle kaldıysa yüklemede onun seçilmemesi için sil
+        (model_dir / LEGACY_MODEL_FILENAME).unlink(missing_ok=True)
 
         # Metadata kaydet
         metadata_file = model_dir / "metadata.json"
@@ -217,14 +321,17 @@ class CTGANTrainer:
         if not model_dir.exists():
             raise FileNotFoundError(f"Model dizini bulunamadı: {model_path}")
 
-        # Model dosyası
-        model_file = model_dir / "ctgan_model.pkl"
-        if not model_file.exists():
-            raise FileNotFoundError(f"Model dosyası bulunamadı: {model_file}")
+        # Model dosyası (joblib yoksa eski pickle formatına düş)
+        model_file = model_dir / MODEL_FILENAME
+        if model_file.exists():
+            self.synthesizer = joblib.load(model_file)
+        else:
+            model_file = model_dir / LEGACY_MODEL_FILENAME
+            if not model_file.exists():
+                raise FileNotFoundError(f"Model dosyası bulunamadı: {model_file}")
 
-        # Modeli yükle
-        with open(model_file, 'rb') as f:
-            self.synthesizer = pickle.load(f)
+            with open(model_file, 'rb') as f:
+                self.synthesizer = pickle.load(f)
 
         # Metadata yükle
         metadata_file = model_dir / "metadata.json"
@@ -271,35 +378,42 @@ class CTGANTrainer:
             "data_quality": {}
         }
 
-        # Her sütun için istatistikleri karşılaştır
-        for col in self.df.columns:
-            if col not in synthetic_data.columns:
-                continue
+        common_columns = [col for col in self.df.columns if col in synthetic_data.columns]
+        numeric_columns = [col for col in common_columns if pd.api.types.is_numeric_dtype(self.df[col])]
 
+        # Sayısal sütunların ortalama/std'leri tek seferde
+        original_means = self.df[numeric_columns].mean()
+        synthetic_means = synthetic_data[numeric_columns].mean()
+        original_stds = self.df[numeric_columns].std()
+        synthetic_stds = synthetic_data[numeric_columns].std()
+
+        # Her sütun için istatistikleri karşılaştır
+        for col in common_columns:
             col_eval = {
                 "dtype_match": str(self.df[col].dtype) == str(synthetic_data[col].dtype)
             }
 
             # Sayısal sütunlar için
-            if pd.api.types.is_numeric_dtype(self.df[col]):
+            if col in original_means.index:
                 col_eval.update({
-                    "original_mean": float(self.df[col].mean()),
-                    "synthetic_mean": float(synthetic_data[col].mean()),
-                    "mean_difference": float(abs(self.df[col].mean() - synthetic_data[col].mean())),
-                    "original_std": float(self.df[col].std()),
-                    "synthetic_std": float(synthetic_data[col].std()),
+                    "original_mean": float(original_means[col]),
+                    "synthetic_mean": float(synthetic_means[col]),
+                    "mean_difference": float(abs(original_means[col] - synthetic_means[col])),
+                    "original_std": float(original_stds[col]),
+                    "synthetic_std": float(synthetic_stds[col]),
                 })
 
-            # Kategorik sütunlar için
+            # Kategorik sütunlar için (Python set yerine hash tabanlı Index işlemleri)
             else:
-                original_unique = set(self.df[col].unique())
-                synthetic_unique = set(synthetic_data[col].unique())
+                original_unique = pd.Index(self.df[col].unique())
+                synthetic_unique = pd.Index(synthetic_data[col].unique())
+                new_values = synthetic_unique.difference(original_unique, sort=False)
 
                 col_eval.update({
                     "original_unique": len(original_unique),
                     "synthetic_unique": len(synthetic_unique),
-                    "unique_overlap": len(original_unique & synthetic_unique),
-                    "new_values": list(synthetic_unique - original_unique)[:10]  # İlk 10
+                    "unique_overlap": len(original_unique.intersection(synthetic_unique, sort=False)),
+                    "new_values": new_values[:10].tolist()  # İlk 10
                 })
 
             evaluation["column_statistics"][col] = col_eval
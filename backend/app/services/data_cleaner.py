@@ -2,9 +2,29 @@
 
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
 
+from app.services.data_io import load_df, write_csv, write_parquet
+
+
+def _iqr_bounds(values: np.ndarray, threshold: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    IQR alt/üst sınırlarını sütun bazında hesapla
+
+    Q1 ve Q3 tek bir nanpercentile çağrısıyla (tek partition geçişi) bulunur.
+
+    Args:
+        values: float64 değerler, satır x sütun (NaN içerebilir)
+        threshold: IQR çarpanı
+
+    Returns:
+        (alt sınırlar, üst sınırlar)
+    """
+    q1, q3 = np.nanpercentile(values, [25, 75], axis=0)
+    iqr = q3 - q1
+    return q1 - threshold * iqr, q3 + threshold * iqr
+
 
 class DataCleaner:
     """CSV verilerini temizleyen ve ön işleyen servis"""
@@ -15,7 +35,7 @@ class DataCleaner:
             file_path: CSV dosyasının yolu
         """
         self.file_path = Path(file_path)
-        self.df = pd.read_csv(file_path)
+        self.df = load_df(file_path)
         self.original_shape = self.df.shape
         self.cleaning_log = []
 
@@ -34,71 +54,132 @@ class DataCleaner:
         Returns:
             Temizlenmiş DataFrame
         """
+        handlers = {
+            "auto": self._fill_auto,
+            "drop": self._drop_missing,
+            "mean": self._fill_mean,
+            "median": self._fill_median,
+            "mode": self._fill_mode,
+            "ffill": self._forward_fill,
+            "bfill": self._backward_fill,
+        }
+        if strategy not in handlers:
+            raise ValueError(f"Geçersiz eksik değer stratejisi: {strategy}")
+        handler = handlers[strategy]
+
         if columns is None:
             columns = self.df.columns.tolist()
 
-        for col in columns:
-            missing_count = self.df[col].isnull().sum()
-            if missing_count == 0:
-                continue
+        # Eksik sayıları tek geçişte; handler'lar tüm sütunları toplu işler
+        missing_counts = self.df[columns].isnull().sum()
+        missing_counts = missing_counts[missing_counts > 0]
+        if missing_counts.empty:
+            return self.df
 
-            if strategy == "drop":
-                before = len(self.df)
-                self.df = self.df.dropna(subset=[col])
-                self.cleaning_log.append({
-                    "column": col,
-                    "action": "drop_rows",
-                    "rows_removed": before - len(self.df)
-                })
+        entries = handler(missing_counts.index.tolist(), missing_counts)
 
-            elif strategy == "mean" or (strategy == "auto" and pd.api.types.is_numeric_dtype(self.df[col])):
-                mean_value = self.df[col].mean()
-                self.df[col].fillna(mean_value, inplace=True)
-                self.cleaning_log.append({
-                    "column": col,
-                    "action": "fill_mean",
-                    "fill_value": float(mean_value),
-                    "filled_count": missing_count
-                })
+        # Log sütun sırasıyla yazılır
+        self.cleaning_log.extend(entries[col] for col in missing_counts.index if col in entries)
 
-            elif strategy == "median":
-                median_value = self.df[col].median()
-                self.df[col].fillna(median_value, inplace=True)
-                self.cleaning_log.append({
-                    "column": col,
-                    "action": "fill_median",
-                    "fill_value": float(median_value),
-                    "filled_count": missing_count
-                })
+        return self.df
 
-            elif strategy == "mode" or (strategy == "auto" and not pd.api.types.is_numeric_dtype(self.df[col])):
-                mode_value = self.df[col].mode()
-                if len(mode_value) > 0:
-                    self.df[col].fillna(mode_value[0], inplace=True)
-                    self.cleaning_log.append({
-                        "column": col,
-                        "action": "fill_mode",
-                        "fill_value": str(mode_value[0]),
-                        "filled_count": missing_count
-                    })
+    def _fill_auto(self, cols: List[str], missing_counts: pd.Series) -> Dict[str, Dict[str, Any]]:
+        """Sayısal sütunları ortalama, diğerlerini mod ile doldur"""
+        numeric_cols = [col for col in cols if pd.api.types.is_numeric_dtype(self.df[col])]
+        other_cols = [col for col in cols if col not in set(numeric_cols)]
 
-            elif strategy == "ffill":
-                self.df[col].fillna(method='ffill', inplace=True)
-                self.cleaning_log.append({
-                    "column": col,
-                    "action": "forward_fill",
-                    "filled_count": missing_count
-                })
+        entries = {}
+        if numeric_cols:
+            entries.update(self._fill_mean(numeric_cols, missing_counts))
+        if other_cols:
+            entries.update(self._fill_mode(other_cols, missing_counts))
+        return entries
 
-            elif strategy == "bfill":
-                self.df[col].fillna(method='bfill', inplace=True)
-                self.cleaning_log.append({
-                    "column": col,
-                    "action": "backward_fill",
-                    "filled_count": missing_count
-                })
+    def _drop_missing(self, cols: List[str], missing_counts: pd.Series) -> Dict[str, Dict[str, Any]]:
+        # Sütun sırasıyla silinmiş gibi raporlanır: her satır ilk eksik sütununa yazılır
+        nulls = self.df[cols].isnull().to_numpy()
+        has_null = nulls.any(axis=1)
+        first_null = nulls.argmax(axis=1)[has_null]
+        removed = np.bincount(first_null, minlength=len(cols))
 
-        return self.df
+        self.df = self.df.loc[~has_null]
+
+        return {
+            col: {
+                "column": col,
+                "action": "drop_rows",
+                "rows_removed": int(count)
+            }
+            for col, count in zip(cols, removed)
+            if count > 0
+        }
+
+    def _fill_mean(self, cols: List[str], missing_counts: pd.Series) -> Dict[str, Dict[str, Any]]:
+        means = self.df[cols].mean()
+        self.df[cols] = self.df[cols].fillna(means)
+        return {
+            col: {
+                "column": col,
+                "action": "fill_mean",
+                "fill_value": float(means[col]),
+                "filled_count": int(missing_counts[col])
+            }
+            for col in cols
+        }
+
+    def _fill_median(self, cols: List[str], missing_counts: pd.Series) -> Dict[str, Dict[str, Any]]:
+        medians = self.df[cols].median()
+        self.df[cols] = self.df[cols].fillna(medians)
+        return {
+            col: {
+                "column": col,
+                "action": "fill_median",
+                "fill_value": float(medians[col]),
+                "filled_count": int(missing_counts[col])
+            }
+            for col in cols
+        }
+
+    def _fill_mode(self, cols: List[str], missing_counts: pd.Series) -> Dict[str, Dict[str, Any]]:
+        modes = self.df[cols].mode()
+        if modes.empty:
+            return {}
+
+        # Tamamen boş sütunların modu yok (NaN); bunlar doldurulmaz
+        mode_values = modes.iloc[0].dropna()
+        mode_cols = mode_values.index.tolist()
+        self.df[mode_cols] = self.df[mode_cols].fillna(mode_values)
+        return {
+            col: {
+                "column": col,
+                "action": "fill_mode",
+                "fill_value": str(mode_values[col]),
+                "filled_count": int(missing_counts[col])
+            }
+            for col in mode_cols
+        }
+
+    def _forward_fill(self, cols: List[str], missing_counts: pd.Series) -> Dict[str, Dict[str, Any]]:
+        self.df[cols] = self.df[cols].ffill()
+        return {
+            col: {
+                "column": col,
+                "action": "forward_fill",
+                "filled_count": int(missing_counts[col])
+            }
+            for col in cols
+        }
+
+    def _backward_fill(self, cols: List[str], missing_counts: pd.Series) -> Dict[str, Dict[str, Any]]:
+        self.df[cols] = self.df[cols].bfill()
+        return {
+            col: {
+                "column": col,
+                "action": "backward_fill",
+                "filled_count": int(missing_counts[col])
+            }
+            for col in cols
+        }
 
     def remove_outliers(
         self,
@@ -120,44 +201,41 @@ class DataCleaner:
         if columns is None:
             columns = self.df.select_dtypes(include=[np.number]).columns.tolist()
 
+        columns = [col for col in columns if pd.api.types.is_numeric_dtype(self.df[col])]
         initial_rows = len(self.df)
 
-        for col in columns:
-            if not pd.api.types.is_numeric_dtype(self.df[col]):
-                continue
+        if columns and method in ("iqr", "zscore"):
+            # Tüm sütunların sınırları aynı veri üzerinden; satırlar tek maskeyle silinir
+            values = self.df[columns].to_numpy(dtype=np.float64, na_value=np.nan)
 
             if method == "iqr":
-                Q1 = self.df[col].quantile(0.25)
-                Q3 = self.df[col].quantile(0.75)
-                IQR = Q3 - Q1
-                lower_bound = Q1 - threshold * IQR
-                upper_bound = Q3 + threshold * IQR
-
-                outliers_mask = (self.df[col] < lower_bound) | (self.df[col] > upper_bound)
-                outliers_count = outliers_mask.sum()
-
-                self.df = self.df[~outliers_mask]
-
-                if outliers_count > 0:
+                lower_bounds, upper_bounds = _iqr_bounds(values, threshold)
+                outliers_mask = (values < lower_bounds) | (values > upper_bounds)
+            else:
+                means = np.nanmean(values, axis=0)
+                stds = np.nanstd(values, axis=0, ddof=1)
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    outliers_mask = np.abs((values - means) / stds) > threshold
+
+            outliers_counts = outliers_mask.sum(axis=0)
+            self.df = self.df.loc[~outliers_mask.any(axis=1)]
+
+            for i, col in enumerate(columns):
+                if outliers_counts[i] == 0:
+                    continue
+
+                if method == "iqr":
                     self.cleaning_log.append({
                         "column": col,
                         "action": "remove_outliers_iqr",
-                        "outliers_removed": int(outliers_count),
-                        "bounds": {"lower": float(lower_bound), "upper": float(upper_bound)}
+                        "outliers_removed": int(outliers_counts[i]),
+                        "bounds": {"lower": float(lower_bounds[i]), "upper": float(upper_bounds[i])}
                     })
-
-            elif method == "zscore":
-                z_scores = np.abs((self.df[col] - self.df[col].mean()) / self.df[col].std())
-                outliers_mask = z_scores > threshold
-                outliers_count = outliers_mask.sum()
-
-                self.df = self.df[~outliers_mask]
-
-                if outliers_count > 0:
+                else:
                     self.cleaning_log.append({
                         "column": col,
                         "action": "remove_outliers_zscore",
-                        "outliers_removed": int(outliers_count),
+                        "outliers_removed": int(outliers_counts[i]),
                         "threshold": threshold
                     })
 
@@ -236,20 +314,21 @@ class DataCleaner:
 
         for col in columns:
             if method == "label":
-                categories = self.df[col].unique()
-                category_mapping = {cat: idx for idx, cat in enumerate(categories)}
-                self.df[col + '_encoded'] = self.df[col].map(category_mapping)
+                # factorize: görülme sırasına göre kodlar, tek C geçişinde
+                codes, categories = pd.factorize(self.df[col], use_na_sentinel=False)
+                self.df[col + '_encoded'] = codes.astype(np.int32)
 
                 self.cleaning_log.append({
                     "column": col,
                     "action": "label_encoding",
                     "new_column": col + '_encoded',
-                    "mapping": {str(k): int(v) for k, v in category_mapping.items()}
+                    "mapping": {str(cat): idx for idx, cat in enumerate(categories)}
                 })
 
             elif method == "onehot":
                 dummies = pd.get_dummies(self.df[col], prefix=col)
-                self.df = pd.concat([self.df, dummies], axis=1)
+                # copy=False: mevcut sütun blokları kopyalanmadan yeni DataFrame'e bağlanır
+                self.df = pd.concat([self.df, dummies], axis=1, copy=False)
 
                 self.cleaning_log.append({
                     "column": col,
@@ -275,15 +354,19 @@ class DataCleaner:
             "remaining_missing_values": int(self.df.isnull().sum().sum())
         }
 
-    def save_cleaned_data(self, output_path: str) -> str:
+    def save_cleaned_data(self, output_path: str, format: str = "csv") -> str:
         """
         Temizlenmiş veriyi kaydet
 
         Args:
             output_path: Çıktı dosyası yolu
+            format: Çıktı formatı (csv, parquet)
 
         Returns:
             Kaydedilen dosyanın yolu
         """
-        self.df.to_csv(output_path, index=False)
+        if format == "parquet":
+            write_parquet(self.df, output_path)
+        else:
+            write_csv(self.df, output_path)
         return output_path
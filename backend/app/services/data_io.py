@@ -0,0 +1,538 @@
+"""CSV Okuma/Yazma Yardımcıları"""
+
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+import orjson
+from cachetools import LRUCache
+
+# pyarrow CSV okuyucusunun thread'lere dağıttığı blok boyutu
+READ_BLOCK_SIZE = 8 << 20  # 8 MB
+
+# Dahili çıktılar için Parquet sıkıştırması
+PARQUET_COMPRESSION = "zstd"
+
+# Derin bellek ölçümünde string boyutlarının örneklendiği satır sayısı
+MEMORY_SAMPLE_ROWS = 10_000
+
+# Çıktı dosyalarının yanına yazılan metadata dosyasının uzantısı
+SIDECAR_SUFFIX = ".meta.json"
+
+# Parse edilmiş DataFrame cache'i (dosya değişince anahtar da değişir)
+DF_CACHE_SIZE = int(os.getenv("DF_CACHE_SIZE", "8"))
+_df_cache = LRUCache(maxsize=DF_CACHE_SIZE)
+_df_cache_lock = threading.Lock()
+
+# backend/ dizini: göreli yollar process'in çalışma dizinine göre değil buna göre çözülür
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+# Process'ler (API, Celery worker) arasında paylaşılan parse edilmiş CSV cache'i (Arrow IPC)
+DF_DISK_CACHE_DIR = (BACKEND_DIR / os.getenv("DF_DISK_CACHE_DIR", "cache")).resolve()
+DF_DISK_CACHE_COMPRESSION = "lz4"
+# Disk cache'inin üst sınırı; aşılınca en uzun süredir kullanılmayan dosyalar silinir
+DF_DISK_CACHE_MAX_MB = int(os.getenv("DF_DISK_CACHE_MAX_MB", "2048"))
+
+
+def _temporal_columns(file_path: Union[str, Path], read_options, parse_options) -> List[str]:
+    """
+    İlk blokta pyarrow'un tarih/zaman olarak çıkaracağı sütunları bul (yalnızca şema okunur)
+
+    Args:
+        file_path: CSV dosya yolu
+        read_options: pyarrow ReadOptions
+        parse_options: pyarrow ParseOptions
+
+    Returns:
+        Tarih/zaman tipli sütun adları
+    """
+    with pacsv.open_csv(
+        str(file_path),
+        read_options=read_options,
+        parse_options=parse_options,
+        convert_options=pacsv.ConvertOptions(strings_can_be_null=True)
+    ) as reader:
+        return [field.name for field in reader.schema if pa.types.is_temporal(field.type)]
+
+
+def read_csv_table(file_path: Union[str, Path], delimiter: str = ",") -> pa.Table:
+    """
+    CSV dosyasını pyarrow'un çok thread'li parser'ı ile Arrow tablosu olarak oku
+
+    Tarih/zaman gibi görünen sütunlar parse sırasında string olarak okunur; hücre metni
+    pd.read_csv'deki gibi aynen korunur. pyarrow'un reddettiği dosyalar (eksik alanlı
+    satırlar vb.) pd.read_csv ile okunur; eksik alanlar null olur.
+
+    Args:
+        file_path: CSV dosya yolu
+        delimiter: Ayırıcı karakter
+
+    Returns:
+        Arrow tablosu
+
+    Raises:
+        pd.errors.EmptyDataError: Dosya boşsa
+        pd.errors.ParserError: Dosya parse edilemezse
+    """
+    read_options = pacsv.ReadOptions(block_size=READ_BLOCK_SIZE)
+    parse_options = pacsv.ParseOptions(delimiter=delimiter)
+
+    try:
+        temporal_columns = _temporal_columns(file_path, read_options, parse_options)
+        # Dosya belleğe eşlenir: sayfa önbelleğindeki baytlar heap'e kopyalanmadan parse edilir
+        with pa.memory_map(str(file_path), "r") as source:
+            return pacsv.read_csv(
+                source,
+                read_options=read_options,
+                parse_options=parse_options,
+                convert_options=pacsv.ConvertOptions(
+                    column_types={name: pa.string() for name in temporal_columns},
+                    strings_can_be_null=True
+                )
+            )
+    except pa.ArrowInvalid as e:
+        # Çağıranlar pandas hata tiplerini yakalıyor
+        if "Empty CSV file" in str(e):
+            raise pd.errors.EmptyDataError(str(e)) from e
+
+    # Eksik alanlı satırlar, sonraki bloklarda tipi değişen sütunlar vb.: pandas parser'ı
+    # (eksik alanları NaN ile doldurur; gerçekten bozuk dosyada ParserError yükseltir)
+    df = pd.read_csv(file_path, sep=delimiter)
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def read_csv(file_path: Union[str, Path]) -> pd.DataFrame:
+    """
+    CSV dosyasını pyarrow'un çok thread'li parser'ı ile oku
+
+    Sonuç numpy tabanlı bir DataFrame'dir; servisler pd.read_csv ile aynı tipleri görür.
+
+    Args:
+        file_path: CSV dosya yolu
+
+    Returns:
+        DataFrame
+
+    Raises:
+        pd.errors.EmptyDataError: Dosya boşsa
+        pd.errors.ParserError: Dosya parse edilemezse
+    """
+    return read_csv_table(file_path).to_pandas(split_blocks=True, self_destruct=True)
+
+
+def pandas_dtype_names(table: pa.Table) -> Dict[str, str]:
+    """
+    Tablo to_pandas ile çevrilse sütunların alacağı dtype adlarını döndür (çevirmeden)
+
+    Null içeren tamsayı sütunları float64, null içeren bool sütunları object olur.
+
+    Args:
+        table: Arrow tablosu
+
+    Returns:
+        Sütun adı -> dtype adı
+    """
+    dtypes = {}
+    for field, column in zip(table.schema, table.columns):
+        dtype = np.dtype(field.type.to_pandas_dtype())
+        if column.null_count:
+            if dtype.kind in "iu":
+                dtype = np.dtype("float64")
+            elif dtype.kind == "b":
+                dtype = np.dtype(object)
+        dtypes[field.name] = str(dtype)
+    return dtypes
+
+
+def read_parquet(file_path: Union[str, Path]) -> pd.DataFrame:
+    """
+    Parquet dosyasını oku
+
+    Args:
+        file_path: Parquet dosya yolu
+
+    Returns:
+        DataFrame
+    """
+    return pq.read_table(file_path).to_pandas(split_blocks=True, self_destruct=True)
+
+
+def write_csv(df: pd.DataFrame, file_path: Union[str, Path]) -> int:
+    """
+    DataFrame'i pyarrow'un çok thread'li C++ yazıcısı ile CSV olarak yaz
+
+    Arrow'a çevrilemeyen (karışık tipli object) sütunlar varsa pandas yazıcısına düşer.
+    Arrow string değerleri tırnaklı, bool değerleri küçük harfle (true/false) yazar.
+
+    Args:
+        df: Yazılacak DataFrame
+        file_path: Hedef dosya yolu
+
+    Returns:
+        Yazılan bayt sayısı (dosya boyutu için ayrıca stat gerekmez)
+    """
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        with open(file_path, "wb") as sink:
+            df.to_csv(sink, index=False)
+            return sink.tell()
+
+    return write_csv_table(table, file_path)
+
+
+def write_csv_table(table: pa.Table, file_path: Union[str, Path]) -> int:
+    """
+    Arrow tablosunu virgül ayırıcılı CSV olarak yaz
+
+    Args:
+        table: Yazılacak Arrow tablosu
+        file_path: Hedef dosya yolu
+
+    Returns:
+        Yazılan bayt sayısı
+    """
+    with pa.OSFile(str(file_path), "wb") as sink:
+        pacsv.write_csv(table, sink, write_options=pacsv.WriteOptions(quoting_style="needed"))
+        return sink.tell()
+
+
+def write_parquet(df: pd.DataFrame, file_path: Union[str, Path]) -> int:
+    """
+    DataFrame'i zstd sıkıştırmalı Parquet olarak yaz
+
+    Args:
+        df: Yazılacak DataFrame
+        file_path: Hedef dosya yolu
+
+    Returns:
+        Yazılan bayt sayısı (dosya boyutu için ayrıca stat gerekmez)
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with pa.OSFile(str(file_path), "wb") as sink:
+        pq.write_table(table, sink, compression=PARQUET_COMPRESSION)
+        return sink.tell()
+
+
+def estimate_memory_mb(df: pd.DataFrame) -> float:
+    """
+    DataFrame'in bellek kullanımını (MB) tahmin et
+
+    memory_usage(deep=True) her Python string'ini tek tek ölçer; büyük tablolarda
+    string ek yükü örneklem üzerinden ölçülüp satır sayısına oranlanır.
+
+    Args:
+        df: DataFrame
+
+    Returns:
+        Yaklaşık bellek kullanımı (MB)
+    """
+    shallow = df.memory_usage(deep=False).sum()
+
+    if len(df) <= MEMORY_SAMPLE_ROWS:
+        total = df.memory_usage(deep=True).sum()
+    else:
+        sample = df.sample(n=MEMORY_SAMPLE_ROWS, random_state=0)
+        object_overhead = (
+            sample.memory_usage(deep=True, index=False).sum()
+            - sample.memory_usage(deep=False, index=False).sum()
+        )
+        total = shallow + object_overhead * (len(df) / MEMORY_SAMPLE_ROWS)
+
+    return round(float(total) / (1024 * 1024), 2)
+
+
+def downcast_floats(df: pd.DataFrame, columns: Iterable[str]) -> pd.DataFrame:
+    """
+    Verilen float64 sütunları yerinde float32'ye çevir
+
+    Dönüşüm kayıplıdır; yalnızca hassasiyeti zaten gürültüyle bozulmuş sütunlar için kullanılmalı.
+    CSV'de ~7 anlamlı basamak yazılır, dosya ve sonraki parse maliyeti küçülür.
+
+    Args:
+        df: DataFrame
+        columns: Dönüştürülecek sütunlar
+
+    Returns:
+        Aynı DataFrame
+    """
+    for column in columns:
+        if df[column].dtype == "float64":
+            df[column] = df[column].astype("float32")
+    return df
+
+
+def downcast_numeric(df: pd.DataFrame, floats: bool = False) -> pd.DataFrame:
+    """
+    Sayısal sütunları yerinde daha dar tiplere çevir
+
+    int64 sütunlar değer aralığına göre en küçük tamsayı tipine iner (kayıpsız).
+    float64 -> float32 kayıplı olduğundan yalnızca floats=True ise yapılır.
+
+    Args:
+        df: DataFrame
+        floats: float64 sütunlar da float32'ye çevrilsin mi
+
+    Returns:
+        Aynı DataFrame
+    """
+    for column in df.select_dtypes(include=["int64"]).columns:
+        df[column] = pd.to_numeric(df[column], downcast="integer")
+
+    if floats:
+        downcast_floats(df, df.select_dtypes(include=["float64"]).columns)
+
+    return df
+
+
+def write_sidecar(file_path: Union[str, Path], metadata: Dict[str, Any]) -> None:
+    """
+    Çıktı dosyasının metadata'sını yanına JSON olarak yaz (<dosya>.meta.json)
+
+    Args:
+        file_path: Çıktı dosya yolu
+        metadata: Yazılacak metadata
+    """
+    Path(f"{file_path}{SIDECAR_SUFFIX}").write_bytes(orjson.dumps(metadata))
+
+
+def read_sidecar(file_path: Union[str, Path]) -> Optional[Dict[str, Any]]:
+    """
+    Çıktı dosyasının metadata'sını oku
+
+    Args:
+        file_path: Çıktı dosya yolu
+
+    Returns:
+        Metadata (metadata dosyası yoksa None)
+    """
+    try:
+        return orjson.loads(Path(f"{file_path}{SIDECAR_SUFFIX}").read_bytes())
+    except FileNotFoundError:
+        return None
+
+
+def _path_digest(file_path: Union[str, Path]) -> str:
+    """Dosya yolunun cache adlarındaki özeti (dosyanın tüm sürümleri için aynı)"""
+    return hashlib.sha1(os.path.realpath(file_path).encode()).hexdigest()[:16]
+
+
+def _disk_cache_stem(file_path: Union[str, Path]) -> str:
+    """Dosyanın güncel hali için cache adı: <yol özeti>_<stat özeti>"""
+    real_path = os.path.realpath(file_path)
+    file_stat = os.stat(real_path)
+    path_digest = _path_digest(real_path)
+    stat_digest = hashlib.sha1(
+        f"{file_stat.st_ino}:{file_stat.st_mtime_ns}:{file_stat.st_size}".encode()
+    ).hexdigest()[:16]
+    return f"{path_digest}_{stat_digest}"
+
+
+def _disk_cache_path(file_path: Union[str, Path]) -> Path:
+    """Dosyanın güncel hali için cache yolu: <yol özeti>_<stat özeti>.arrow"""
+    return DF_DISK_CACHE_DIR / f"{_disk_cache_stem(file_path)}.arrow"
+
+
+def _trim_disk_cache() -> None:
+    """
+    Disk cache'i DF_DISK_CACHE_MAX_MB'ı aşıyorsa en eski (mtime) dosyalardan başlayarak sil
+
+    Cache okumaları dosyanın mtime'ını günceller; silme sırası en uzun süredir
+    kullanılmayandan başlar.
+    """
+    entries = []
+    for entry in os.scandir(DF_DISK_CACHE_DIR):
+        try:
+            file_stat = entry.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((file_stat.st_mtime, file_stat.st_size, entry.path))
+
+    excess = sum(size for _, size, _ in entries) - DF_DISK_CACHE_MAX_MB * 1024 * 1024
+    for _, size, path in sorted(entries):
+        if excess <= 0:
+            break
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        excess -= size
+
+
+def evict_cached(file_path: Union[str, Path]) -> None:
+    """
+    Dosyaya ait tüm cache kayıtlarını sil (bellek, Arrow IPC ve rapor cache'leri)
+
+    Dosya silinirken çağrılır; dosya artık var olmak zorunda değildir.
+
+    Args:
+        file_path: Cache'lenmiş dosya yolu
+    """
+    real_path = os.path.realpath(file_path)
+
+    with _df_cache_lock:
+        for key in [key for key in _df_cache if key[0] == real_path]:
+            del _df_cache[key]
+
+    for cached in DF_DISK_CACHE_DIR.glob(f"{_path_digest(real_path)}_*"):
+        cached.unlink(missing_ok=True)
+
+
+def write_cached_report(file_path: Union[str, Path], name: str, report: Dict[str, Any]) -> None:
+    """
+    Dosyadan hesaplanan raporu process'ler arası cache'e yaz (<stem>.<name>.json)
+
+    Anahtar load_df ile aynıdır (yol, inode, mtime, boyut); dosya değişince rapor geçersizleşir.
+
+    Args:
+        file_path: Raporun hesaplandığı dosya yolu
+        name: Rapor adı (ör. "pii")
+        report: JSON'a serileştirilebilir rapor (numpy tipleri dahil)
+    """
+    try:
+        stem = _disk_cache_stem(file_path)
+        DF_DISK_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        path_digest = stem.split("_", 1)[0]
+        for stale in DF_DISK_CACHE_DIR.glob(f"{path_digest}_*.{name}.json"):
+            stale.unlink(missing_ok=True)
+        _trim_disk_cache()
+
+        cache_path = DF_DISK_CACHE_DIR / f"{stem}.{name}.json"
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(orjson.dumps(
+            report, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        ))
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        # Cache yazılamazsa rapor bir sonraki kullanımda yeniden hesaplanır
+        pass
+
+
+def read_cached_report(file_path: Union[str, Path], name: str) -> Optional[Dict[str, Any]]:
+    """
+    Dosyanın güncel hali için cache'lenmiş raporu oku
+
+    Args:
+        file_path: Raporun hesaplandığı dosya yolu
+        name: Rapor adı (ör. "pii")
+
+    Returns:
+        Rapor (cache yoksa veya dosya değişmişse None)
+    """
+    try:
+        cache_path = DF_DISK_CACHE_DIR / f"{_disk_cache_stem(file_path)}.{name}.json"
+        return orjson.loads(cache_path.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+
+
+def load_df(file_path: Union[str, Path]) -> pd.DataFrame:
+    """
+    CSV dosyasını disk cache'inden veya parse ederek oku (Parquet dosyaları doğrudan okunur)
+
+    İlk okumada tablo lz4 sıkıştırmalı Arrow IPC dosyası olarak cache dizinine yazılır;
+    sonraki okumalar (başka process'lerden de) CSV parse etmeden bu dosyadan yapılır.
+    Anahtar (yol, inode, mtime, boyut) olduğundan dosya değişince yeniden parse edilir.
+    Her çağrı yeni bir DataFrame döndürür; yerinde değiştirmek güvenlidir.
+
+    Args:
+        file_path: CSV veya Parquet dosya yolu
+
+    Returns:
+        DataFrame
+
+    Raises:
+        pd.errors.EmptyDataError: Dosya boşsa
+        pd.errors.ParserError: Dosya parse edilemezse
+    """
+    if str(file_path).endswith(".parquet"):
+        # Parquet zaten kolonsal ve sıkıştırılmış; cache'e gerek yok
+        return read_parquet(file_path)
+
+    cache_path = _disk_cache_path(file_path)
+
+    try:
+        with pa.memory_map(str(cache_path), "r") as source:
+            table = pa.ipc.open_file(source).read_all()
+        # Kullanım zamanı: boyut sınırında en son kullanılan dosyalar korunur
+        os.utime(cache_path)
+        return table.to_pandas(split_blocks=True, self_destruct=True)
+    except (FileNotFoundError, pa.ArrowInvalid):
+        pass
+
+    table = read_csv_table(file_path)
+
+    try:
+        DF_DISK_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # Aynı dosyanın eski sürümlerine ait cache'leri temizle
+        path_digest = cache_path.name.split("_", 1)[0]
+        for stale in DF_DISK_CACHE_DIR.glob(f"{path_digest}_*.arrow"):
+            stale.unlink(missing_ok=True)
+        _trim_disk_cache()
+
+        # Yarım yazılmış dosya okunmasın diye önce geçici dosyaya yaz
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        options = pa.ipc.IpcWriteOptions(compression=DF_DISK_CACHE_COMPRESSION)
+        with pa.ipc.new_file(str(tmp_path), table.schema, options=options) as writer:
+            writer.write_table(table)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        # Cache yazılamazsa (salt okunur disk vb.) sadece parse edilmiş tablo döndürülür
+        pass
+
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def _load_cached(file_path: Union[str, Path], reader) -> pd.DataFrame:
+    file_stat = os.stat(file_path)
+    key = (os.path.realpath(file_path), file_stat.st_ino, file_stat.st_mtime_ns, file_stat.st_size)
+
+    with _df_cache_lock:
+        df = _df_cache.get(key)
+
+    if df is None:
+        # Parse kilit dışında: farklı dosyalar paralel okunabilir
+        df = reader(file_path)
+        with _df_cache_lock:
+            _df_cache[key] = df
+
+    return df.copy(deep=False)
+
+
+def load_csv(file_path: Union[str, Path]) -> pd.DataFrame:
+    """
+    CSV dosyasını önbellekten veya okuyarak döndür
+
+    Anahtar (yol, inode, mtime, boyut) olduğundan dosya değişince yeniden okunur.
+    Sığ kopya döndürülür; sütun ekleme/silme cache'teki DataFrame'i etkilemez,
+    ancak değerleri yerinde değiştirecek çağıranlar kendi kopyalarını almalıdır.
+
+    Args:
+        file_path: CSV dosya yolu
+
+    Returns:
+        DataFrame
+    """
+    return _load_cached(file_path, load_df)
+
+
+def load_table(file_path: Union[str, Path]) -> pd.DataFrame:
+    """
+    CSV veya Parquet dosyasını uzantısına göre (önbellekli) oku
+
+    Args:
+        file_path: .csv veya .parquet dosya yolu
+
+    Returns:
+        DataFrame
+    """
+    if str(file_path).endswith(".parquet"):
+        return _load_cached(file_path, read_parquet)
+    return _load_cached(file_path, load_df)
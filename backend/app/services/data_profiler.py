@@ -1,10 +1,29 @@
 """Veri Profiling ve İstatistiksel Analiz Servisi"""
 
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from pathlib import Path
 
+from app.services.data_io import downcast_numeric, estimate_memory_mb, load_table
+
+
+# Kategorik profillerde value_distribution'a yazılan en fazla değer sayısı
+VALUE_DISTRIBUTION_LIMIT = 1000
+
+# dtype.kind -> sütun tipi (listede olmayanlar unique oranına göre categorical/text)
+KIND_TO_TYPE = {
+    "i": "integer",
+    "u": "integer",
+    "f": "float",
+    "c": "float",
+    "M": "datetime",
+    "b": "boolean",
+}
+
 
 class DataProfiler:
     """CSV verilerini detaylı analiz eden servis"""
@@ -12,10 +31,38 @@ class DataProfiler:
     def __init__(self, file_path: str):
         """
         Args:
-            file_path: CSV dosyasının yolu
+            file_path: CSV veya Parquet dosyasının yolu
         """
         self.file_path = Path(file_path)
-        self.df = pd.read_csv(file_path)
+        # Diğer servislerle aynı okuyucu: process'ler arası Arrow disk cache'i ve bellek
+        # cache'i kullanılır; tarih sütunları string olarak gelir. Sığ kopya döndüğünden
+        # aşağıdaki sütun atamaları cache'teki DataFrame'i değiştirmez.
+        self.df = load_table(file_path)
+        # Tamsayılar kayıpsız daraltılır (istatistikler float64'te hesaplanmaya devam eder)
+        downcast_numeric(self.df)
+
+    def get_column_type(self, column: str) -> str:
+        """
+        Tek bir sütunun veri tipini belirle
+
+        Args:
+            column: Sütun adı
+
+        Returns:
+            Veri tipi (integer, float, datetime, boolean, categorical, text)
+        """
+        series = self.df[column]
+
+        # dtype.kind ile tek karakterlik dispatch (numpy ve extension dtype'lar için geçerli)
+        col_type = KIND_TO_TYPE.get(series.dtype.kind)
+        if col_type is not None:
+            return col_type
+
+        # Object tipini kontrol et
+        unique_ratio = series.nunique() / len(self.df)
+        if unique_ratio < 0.5:  # %50'den az unique değer varsa kategorik
+            return "categorical"
+        return "text"
 
     def get_column_types(self) -> Dict[str, str]:
         """
@@ -24,30 +71,17 @@ class DataProfiler:
         Returns:
             Sütun adı -> veri tipi mapping
         """
-        column_types = {}
+        # Sayısal/tarih/bool tipler dtype.kind'dan tek geçişte; kalanlar için nunique tek çağrıda
+        kinds = self.df.dtypes.map(lambda dtype: dtype.kind)
+        column_types = kinds.map(KIND_TO_TYPE)
 
-        for col in self.df.columns:
-            dtype = self.df[col].dtype
-
-            if pd.api.types.is_numeric_dtype(dtype):
-                # Sayısal sütun
-                if pd.api.types.is_integer_dtype(dtype):
-                    column_types[col] = "integer"
-                else:
-                    column_types[col] = "float"
-            elif pd.api.types.is_datetime64_any_dtype(dtype):
-                column_types[col] = "datetime"
-            elif pd.api.types.is_bool_dtype(dtype):
-                column_types[col] = "boolean"
-            else:
-                # Object tipini kontrol et
-                unique_ratio = self.df[col].nunique() / len(self.df)
-                if unique_ratio < 0.5:  # %50'den az unique değer varsa kategorik
-                    column_types[col] = "categorical"
-                else:
-                    column_types[col] = "text"
-
-        return column_types
+        other_columns = column_types.index[column_types.isna()]
+        if len(other_columns) > 0:
+            unique_ratio = self.df[other_columns].nunique() / len(self.df)
+            # %50'den az unique değer varsa kategorik
+            column_types[other_columns] = np.where(unique_ratio < 0.5, "categorical", "text")
+
+        return column_types.to_dict()
 
     def analyze_numeric_column(self, column: str) -> Dict[str, Any]:
         """
@@ -59,35 +93,58 @@ class DataProfiler:
         Returns:
             İstatistiksel metrikler
         """
-        data = self.df[column].dropna()
+        return self.analyze_numeric_columns([column])[column]
 
-        # Outlier tespiti (IQR metodu)
-        Q1 = data.quantile(0.25)
-        Q3 = data.quantile(0.75)
-        IQR = Q3 - Q1
-        lower_bound = Q1 - 1.5 * IQR
-        upper_bound = Q3 + 1.5 * IQR
-        outliers = data[(data < lower_bound) | (data > upper_bound)]
+    def analyze_numeric_columns(self, columns: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Sayısal sütunlar için istatistiksel analiz (tüm sütunlar tek describe geçişinde)
 
-        return {
-            "count": int(data.count()),
-            "mean": float(data.mean()),
-            "median": float(data.median()),
-            "std": float(data.std()),
-            "min": float(data.min()),
-            "max": float(data.max()),
-            "q1": float(Q1),
-            "q3": float(Q3),
-            "iqr": float(IQR),
-            "outlier_count": len(outliers),
-            "outlier_percentage": round(len(outliers) / len(data) * 100, 2),
-            "outlier_bounds": {
-                "lower": float(lower_bound),
-                "upper": float(upper_bound)
-            },
-            "skewness": float(data.skew()),
-            "kurtosis": float(data.kurtosis()),
-        }
+        Args:
+            columns: Sayısal sütun adları
+
+        Returns:
+            Sütun adı -> istatistiksel metrikler
+        """
+        if not columns:
+            return {}
+
+        num_df = self.df[columns]
+        desc = num_df.describe(percentiles=[.25, .5, .75]).T
+        skewness = num_df.skew()
+        kurtosis = num_df.kurtosis()
+
+        # Outlier tespiti (IQR metodu); NaN karşılaştırmaları False döner
+        iqr = desc["75%"] - desc["25%"]
+        lower_bounds = desc["25%"] - 1.5 * iqr
+        upper_bounds = desc["75%"] + 1.5 * iqr
+        outlier_counts = ((num_df < lower_bounds) | (num_df > upper_bounds)).sum()
+
+        stats = {}
+        for column in columns:
+            row = desc.loc[column]
+            count = int(row["count"])
+            outlier_count = int(outlier_counts[column])
+            stats[column] = {
+                "count": count,
+                "mean": float(row["mean"]),
+                "median": float(row["50%"]),
+                "std": float(row["std"]),
+                "min": float(row["min"]),
+                "max": float(row["max"]),
+                "q1": float(row["25%"]),
+                "q3": float(row["75%"]),
+                "iqr": float(iqr[column]),
+                "outlier_count": outlier_count,
+                "outlier_percentage": round(outlier_count / count * 100, 2) if count else 0.0,
+                "outlier_bounds": {
+                    "lower": float(lower_bounds[column]),
+                    "upper": float(upper_bounds[column])
+                },
+                "skewness": float(skewness[column]),
+                "kurtosis": float(kurtosis[column]),
+            }
+
+        return stats
 
     def analyze_categorical_column(self, column: str) -> Dict[str, Any]:
         """
@@ -101,26 +158,37 @@ class DataProfiler:
         """
         data = self.df[column].dropna()
         value_counts = data.value_counts()
+        mode = data.mode()
+
+        # Shannon entropisi tek numpy geçişinde (value_counts sıfır sayı içermez)
+        entropy = 0.0
+        if len(value_counts) > 0:
+            probabilities = value_counts.to_numpy(dtype=np.float64) / len(data)
+            entropy = float(-(probabilities * np.log2(probabilities)).sum())
+
+        # Yüksek kardinaliteli sütunlarda dağılım en sık değerlerle sınırlanır
+        distribution = value_counts.head(VALUE_DISTRIBUTION_LIMIT)
 
         return {
-            "count": int(data.count()),
-            "unique_count": int(data.nunique()),
-            "mode": str(data.mode().iloc[0]) if len(data.mode()) > 0 else None,
+            "count": int(len(data)),
+            "unique_count": int(len(value_counts)),
+            "mode": str(mode.iloc[0]) if len(mode) > 0 else None,
             "top_values": value_counts.head(10).to_dict(),
-            "value_distribution": {
-                str(k): int(v) for k, v in value_counts.items()
-            },
-            "entropy": float(-sum((value_counts / len(data)) * np.log2(value_counts / len(data))))
+            "value_distribution": dict(zip(distribution.index.astype(str), distribution.tolist())),
+            "entropy": entropy
         }
 
-    def analyze_missing_values(self) -> Dict[str, Any]:
+    def analyze_missing_values(self, null_counts: Optional[pd.Series] = None) -> Dict[str, Any]:
         """
         Eksik değerleri analiz et
 
+        Args:
+            null_counts: Önceden hesaplanmış sütun bazlı null sayıları (None ise hesaplanır)
+
         Returns:
             Eksik değer istatistikleri
         """
-        missing_data = self.df.isnull().sum()
+        missing_data = self.df.isnull().sum() if null_counts is None else null_counts
         total_rows = len(self.df)
 
         missing_info = {}
@@ -147,30 +215,33 @@ class DataProfiler:
             Kapsamlı veri profili
         """
         column_types = self.get_column_types()
-        missing_analysis = self.analyze_missing_values()
 
-        column_profiles = {}
-        for col in self.df.columns:
-            col_type = column_types[col]
-
-            base_info = {
-                "type": col_type,
-                "null_count": int(self.df[col].isnull().sum()),
-                "null_percentage": round(self.df[col].isnull().sum() / len(self.df) * 100, 2)
-            }
-
-            if col_type in ["integer", "float"]:
-                base_info.update(self.analyze_numeric_column(col))
-            elif col_type in ["categorical", "text", "boolean"]:
-                base_info.update(self.analyze_categorical_column(col))
-
-            column_profiles[col] = base_info
+        # Null sayıları tek taramada; eksik değer analizi ve sütun profilleri paylaşır
+        null_counts = self.df.isnull().sum()
+        missing_analysis = self.analyze_missing_values(null_counts)
+
+        # Sayısal sütun istatistikleri tek vektörel geçişte
+        numeric_stats = self.analyze_numeric_columns(
+            [col for col, col_type in column_types.items() if col_type in ["integer", "float"]]
+        )
+
+        # Kalan sütun analizleri thread'lere dağıtılır (pandas/numpy C işlemleri GIL'i bırakır)
+        columns = self.df.columns.tolist()
+        max_workers = min(len(columns), os.cpu_count() or 1) or 1
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            profiles = executor.map(
+                lambda col: self._profile_column(
+                    col, column_types[col], numeric_stats.get(col), int(null_counts[col])
+                ),
+                columns
+            )
+            column_profiles = dict(zip(columns, profiles))
 
         return {
             "dataset_info": {
                 "total_rows": len(self.df),
                 "total_columns": len(self.df.columns),
-                "memory_usage_mb": round(self.df.memory_usage(deep=True).sum() / (1024 * 1024), 2),
+                "memory_usage_mb": estimate_memory_mb(self.df),
                 "file_size_mb": round(self.file_path.stat().st_size / (1024 * 1024), 2)
             },
             "column_types": column_types,
@@ -179,6 +250,40 @@ class DataProfiler:
             "correlations": self._get_correlations() if any(column_types[col] in ["integer", "float"] for col in column_types) else {}
         }
 
+    def _profile_column(
+        self,
+        column: str,
+        col_type: str,
+        numeric_stats: Optional[Dict[str, Any]] = None,
+        null_count: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Tek bir sütunun profilini çıkar
+
+        Args:
+            column: Sütun adı
+            col_type: get_column_type ile belirlenmiş veri tipi
+            numeric_stats: analyze_numeric_columns ile önceden hesaplanmış metrikler
+            null_count: Önceden hesaplanmış null sayısı
+
+        Returns:
+            Sütun profili
+        """
+        if null_count is None:
+            null_count = int(self.df[column].isnull().sum())
+        profile = {
+            "type": col_type,
+            "null_count": null_count,
+            "null_percentage": round(null_count / len(self.df) * 100, 2)
+        }
+
+        if col_type in ["integer", "float"]:
+            profile.update(numeric_stats or self.analyze_numeric_column(column))
+        elif col_type in ["categorical", "text", "boolean"]:
+            profile.update(self.analyze_categorical_column(column))
+
+        return profile
+
     def _get_correlations(self) -> Dict[str, Any]:
         """
         Sayısal sütunlar arasındaki korelasyonları hesapla
@@ -193,25 +298,22 @@ class DataProfiler:
 
         corr_matrix = self.df[numeric_cols].corr()
 
-        # Yüksek korelasyonları bul (>0.7 veya <-0.7)
-        high_correlations = []
-        for i in range(len(numeric_cols)):
-            for j in range(i + 1, len(numeric_cols)):
-                corr_value = corr_matrix.iloc[i, j]
-                if abs(corr_value) > 0.7:
-                    high_correlations.append({
-                        "column1": numeric_cols[i],
-                        "column2": numeric_cols[j],
-                        "correlation": round(float(corr_value), 3)
-                    })
+        # Yüksek korelasyonları bul (>0.7 veya <-0.7): üst üçgen tek numpy maskesiyle
+        values = corr_matrix.to_numpy()
+        rows, cols = np.triu_indices_from(values, k=1)
+        upper = values[rows, cols]
+        mask = np.abs(upper) > 0.7
+
+        high_correlations = [
+            {
+                "column1": numeric_cols[i],
+                "column2": numeric_cols[j],
+                "correlation": round(float(corr_value), 3)
+            }
+            for i, j, corr_value in zip(rows[mask], cols[mask], upper[mask])
+        ]
 
         return {
-            "matrix": {
-                col: {
-                    other_col: round(float(corr_matrix.loc[col, other_col]), 3)
-                    for other_col in numeric_cols
-                }
-                for col in numeric_cols
-            },
+            "matrix": corr_matrix.round(3).to_dict(),
             "high_correlations": high_correlations
         }
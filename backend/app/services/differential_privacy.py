@@ -6,11 +6,42 @@ Veri üretimine Laplace veya Gaussian gürültüsü ekleyerek re-identification'
 Epsilon parametresi ile gizlilik bütçesi kontrolü sağlar.
 """
 
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
 import pandas as pd
+from pandas.api.types import is_bool_dtype, is_numeric_dtype
 import numpy as np
 from typing import Dict, List, Any, Optional, Tuple, Literal
-from diffprivlib.mechanisms import Laplace, Gaussian
-from diffprivlib.tools import mean, var, std, median
+from diffprivlib.tools import mean, var, median
+
+
+# Bu hücre sayısının üzerinde gürültü satır parçalarına bölünüp thread'lerde üretilir
+PARALLEL_NOISE_MIN_CELLS = 1_000_000
+
+# Gürültü ekleme + kırpma + toplam tek geçişte bu boyuttaki (CPU cache'ine sığan) bloklarla yapılır
+NOISE_BLOCK_CELLS = 1 << 16
+
+# Gizlilik seviyesi eşikleri: epsilon < eşik[i] ise seviye[i] (son seviye üst sınırsız)
+PRIVACY_LEVEL_THRESHOLDS = np.array([0.5, 1.0, 2.0, 5.0])
+PRIVACY_LEVEL_LABELS = ("very_high", "high", "medium", "low", "very_low")
+
+# privacy_levels tablosunun kapsadığı epsilon aralığı [min, max)
+PRIVACY_LEVEL_RANGE = (0.1, 10.0)
+
+
+@lru_cache(maxsize=1024)
+def _advanced_composition(epsilon: float, delta: float, num_queries: int) -> float:
+    """
+    Advanced composition bound: ε' = √(2k ln(1/δ)) * ε + k * ε * (e^ε - 1)
+
+    e^ε - 1 küçük ε'da hassasiyet kaybetmemesi için expm1 ile hesaplanır.
+    """
+    return float(
+        np.sqrt(2 * num_queries * -np.log(delta)) * epsilon +
+        num_queries * epsilon * np.expm1(epsilon)
+    )
 
 
 class DifferentialPrivacy:
@@ -25,6 +56,7 @@ class DifferentialPrivacy:
         self.epsilon = epsilon
         self.delta = delta
         self.privacy_budget_spent = 0.0
+        self.rng = np.random.default_rng()
 
         # Gizlilik seviyesi açıklamaları
         self.privacy_levels = {
@@ -37,17 +69,18 @@ class DifferentialPrivacy:
 
     def get_privacy_level(self) -> str:
         """Mevcut epsilon değerine göre gizlilik seviyesini döndür"""
-        for level, (min_eps, max_eps, _) in self.privacy_levels.items():
-            if min_eps <= self.epsilon < max_eps:
-                return level
-        return "custom"
+        min_eps, max_eps = PRIVACY_LEVEL_RANGE
+        if not min_eps <= self.epsilon < max_eps:
+            return "custom"
+        return self._get_privacy_level_for_epsilon(self.epsilon)
 
     def apply_noise_to_dataframe(
         self,
         df: pd.DataFrame,
         mechanism: Literal["laplace", "gaussian"] = "laplace",
         columns: Optional[List[str]] = None,
-        bounds: Optional[Dict[str, Tuple[float, float]]] = None
+        bounds: Optional[Dict[str, Tuple[float, float]]] = None,
+        dtype: type = np.float32
     ) -> Tuple[pd.DataFrame, Dict[str, Any]]:
         """
         DataFrame'e differential privacy gürültüsü ekle
@@ -57,11 +90,15 @@ class DifferentialPrivacy:
             mechanism: Gürültü mekanizması ("laplace" veya "gaussian")
             columns: İşlenecek sütunlar (None ise tüm numeric sütunlar)
             bounds: Her sütun için min-max değerleri
+            dtype: Gürültünün üretildiği float tipi; gürültü ölçeği bu tipin çözünürlüğüne
+                yakınsa float64'e dönülür
 
         Returns:
             (DP uygulanmış DataFrame, DP raporu)
         """
-        df_dp = df.copy()
+        # Sığ kopya: yalnızca gürültü eklenen sütunlar yeni dizilerle değiştirilir,
+        # dokunulmayan sütunlar orijinal DataFrame ile bilerek paylaşılır
+        df_dp = df.copy(deep=False)
 
         if columns is None:
             # Sadece numeric sütunları seç
@@ -82,78 +119,186 @@ class DifferentialPrivacy:
 
         epsilon_per_column = self.epsilon / len(columns) if columns else self.epsilon
 
-        for column in columns:
-            if column not in df.columns:
-                continue
+        # İşlenecek sütunlar: numeric olmayanlar ve DataFrame'de bulunmayanlar atlanır
+        noisy_columns = [
+            column for column in columns
+            if column in df.columns and is_numeric_dtype(df[column].dtype) and not is_bool_dtype(df[column].dtype)
+        ]
 
-            # Numeric olmayan sütunları atla
-            if df[column].dtype not in [np.int64, np.float64, np.int32, np.float32]:
-                continue
+        # Bounds verilmeyen sütunların min/max'ı tek agg geçişinde
+        unbounded = [column for column in noisy_columns if column not in bounds]
+        observed = df[unbounded].agg(["min", "max"]) if unbounded else None
 
-            # Bounds belirle
+        lowers = []
+        uppers = []
+        for column in noisy_columns:
             if column in bounds:
                 lower, upper = bounds[column]
             else:
-                lower, upper = df[column].min(), df[column].max()
-
-            # Gürültü ekle
-            noisy_values = self._add_noise_to_column(
-                df[column].values,
+                lower, upper = observed.at["min", column], observed.at["max", column]
+
+            lowers.append(lower)
+            uppers.append(upper)
+
+        if noisy_columns:
+            lowers_arr = np.asarray(lowers, dtype=np.float64)
+            uppers_arr = np.asarray(uppers, dtype=np.float64)
+
+            # Dar float tipi yalnızca gürültü, kırpılmış değerlerin yuvarlama hatasından
+            # belirgin şekilde büyükse kullanılır (bellek trafiği yarıya iner)
+            scale = self._noise_scale(mechanism, epsilon_per_column, uppers_arr - lowers_arr)
+            magnitude = np.maximum(np.abs(lowers_arr), np.abs(uppers_arr))
+            if not np.all(scale > magnitude * np.finfo(dtype).eps * 10):
+                dtype = np.float64
+
+            # Tüm sütunlara tek seferde gürültü ekle (satır başına Python çağrısı yok)
+            original = df[noisy_columns].to_numpy(dtype=dtype)
+            # Ortalamalar gürültü geçişinde biriktirilir (ek sütun taraması yok)
+            noisy, original_means, noisy_means = self._add_noise_to_columns(
+                original,
                 mechanism=mechanism,
                 epsilon=epsilon_per_column,
-                lower=lower,
-                upper=upper
+                lower=lowers_arr,
+                upper=uppers_arr
             )
 
-            df_dp[column] = noisy_values
+            df_dp[noisy_columns] = noisy
 
             # İstatistikler
-            original_mean = df[column].mean()
-            noisy_mean = noisy_values.mean()
-            noise_magnitude = abs(noisy_mean - original_mean)
-
-            dp_report["columns_processed"].append(column)
-            dp_report["noise_statistics"][column] = {
-                "original_mean": float(original_mean),
-                "noisy_mean": float(noisy_mean),
-                "noise_magnitude": float(noise_magnitude),
-                "relative_error": float(noise_magnitude / abs(original_mean)) if original_mean != 0 else 0,
-                "epsilon_used": epsilon_per_column,
-                "bounds": [float(lower), float(upper)]
-            }
+            noise_magnitudes = np.abs(noisy_means - original_means)
+            relative_errors = np.divide(
+                noise_magnitudes,
+                np.abs(original_means),
+                out=np.zeros_like(noise_magnitudes),
+                where=original_means != 0
+            )
+
+            for i, column in enumerate(noisy_columns):
+                dp_report["columns_processed"].append(column)
+                dp_report["noise_statistics"][column] = {
+                    "original_mean": float(original_means[i]),
+                    "noisy_mean": float(noisy_means[i]),
+                    "noise_magnitude": float(noise_magnitudes[i]),
+                    "relative_error": float(relative_errors[i]),
+                    "epsilon_used": epsilon_per_column,
+                    "bounds": [float(lowers[i]), float(uppers[i])]
+                }
 
         dp_report["privacy_budget_spent"] = self.epsilon
         self.privacy_budget_spent += self.epsilon
 
         return df_dp, dp_report
 
-    def _add_noise_to_column(
-        self,
-        values: np.ndarray,
-        mechanism: str,
-        epsilon: float,
-        lower: float,
-        upper: float
-    ) -> np.ndarray:
-        """Bir sütuna gürültü ekle"""
-        sensitivity = upper - lower
+    def _noise_scale(self, mechanism: str, epsilon: float, sensitivity: np.ndarray) -> np.ndarray:
+        """
+        Sütun başına gürültü ölçeği
+
+        Args:
+            mechanism: "laplace" veya "gaussian"
+            epsilon: Sütun başına epsilon
+            sensitivity: Sütun başına Δf (upper - lower)
 
+        Returns:
+            Laplace için b, Gaussian için σ
+        """
         if mechanism == "laplace":
-            # Laplace Mechanism
-            mech = Laplace(epsilon=epsilon, sensitivity=sensitivity)
+            # Laplace Mechanism: b = Δf / ε
+            return sensitivity / epsilon
         elif mechanism == "gaussian":
-            # Gaussian Mechanism
-            mech = Gaussian(epsilon=epsilon, delta=self.delta, sensitivity=sensitivity)
+            # Gaussian Mechanism: σ = Δf * sqrt(2 ln(1.25/δ)) / ε (klasik analiz ε <= 1 ister)
+            if epsilon > 1:
+                raise ValueError("Gaussian mekanizmasında sütun başına epsilon 1'den büyük olamaz")
+            return sensitivity * np.sqrt(2 * np.log(1.25 / self.delta)) / epsilon
         else:
             raise ValueError(f"Bilinmeyen mechanism: {mechanism}")
 
-        # Her değere gürültü ekle
-        noisy_values = np.array([mech.randomise(float(val)) for val in values])
+    def _add_noise_to_columns(
+        self,
+        values: np.ndarray,
+        mechanism: str,
+        epsilon: float,
+        lower: np.ndarray,
+        upper: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Sütun matrisine gürültü ekle
+
+        Args:
+            values: (satır, sütun) float32 veya float64 matris (gürültü aynı tipte üretilir)
+            mechanism: "laplace" veya "gaussian"
+            epsilon: Sütun başına epsilon
+            lower: Sütun başına alt sınır
+            upper: Sütun başına üst sınır
+
+        Returns:
+            (Gürültülü ve bounds içine kırpılmış matris, orijinal sütun ortalamaları,
+            gürültülü sütun ortalamaları); ortalamalar NaN'ları yok sayar
+        """
+        dtype = values.dtype
+        scale = self._noise_scale(mechanism, epsilon, upper - lower).astype(dtype)
+        lower = lower.astype(dtype)
+        upper = upper.astype(dtype)
 
-        # Bounds içinde tut
-        noisy_values = np.clip(noisy_values, lower, upper)
+        # Birim gürültü, thread başına bir kez ayrılan tampona out= ile yazılır
+        if mechanism == "laplace":
+            # Laplace(0, 1) = iki bağımsız Exp(1) farkı (Generator.laplace dtype/out desteklemez)
+            def draw(rng: np.random.Generator, out: np.ndarray, tmp: np.ndarray) -> None:
+                rng.standard_exponential(out=out, dtype=dtype)
+                rng.standard_exponential(out=tmp, dtype=dtype)
+                np.subtract(out, tmp, out=out)
+        else:
+            def draw(rng: np.random.Generator, out: np.ndarray, tmp: np.ndarray) -> None:
+                rng.standard_normal(out=out, dtype=dtype)
+
+        n_rows, n_cols = values.shape
+
+        noisy = np.empty((n_rows, n_cols), dtype=dtype)
+        block_rows = max(1, NOISE_BLOCK_CELLS // max(n_cols, 1))
+
+        def noisy_rows(rng: np.random.Generator, start: int, stop: int) -> np.ndarray:
+            # Blok cache'teyken: birim gürültü skaler parametreyle üretilir (sütun başına
+            # parametre yayını yavaş), yerinde ölçekle + topla, çıktıya kırp, toplamları biriktir.
+            # Dönüş: (orijinal toplam, gürültülü toplam, NaN olmayan sayısı) x sütun
+            totals = np.zeros((3, n_cols), dtype=np.float64)
+            buffer = np.empty((min(block_rows, stop - start), n_cols), dtype=dtype)
+            scratch = np.empty_like(buffer) if mechanism == "laplace" else None
+            for block_start in range(start, stop, block_rows):
+                block_stop = min(block_start + block_rows, stop)
+                block = values[block_start:block_stop]
+                out = noisy[block_start:block_stop]
+
+                # Son blok kısa olabilir: tamponların baş dilimleri de C-contiguous
+                m = block_stop - block_start
+                chunk = buffer[:m]
+                draw(rng, chunk, scratch[:m] if scratch is not None else None)
+                np.multiply(chunk, scale, out=chunk)
+                np.add(chunk, block, out=chunk)
+                np.clip(chunk, lower, upper, out=out)
+
+                totals[0] += np.nansum(block, axis=0, dtype=np.float64)
+                totals[1] += np.nansum(out, axis=0, dtype=np.float64)
+                totals[2] += np.count_nonzero(~np.isnan(block), axis=0)
+            return totals
+
+        # numpy Generator tek thread'lidir; büyük matrislerde bağımsız alt üreteçler
+        # (spawn) satır parçalarını paralel üretir, örnekleme GIL'i bırakır.
+        # Parçalar ortak çıktı matrisinin kendi satır dilimlerine yazar (ek kopya yok)
+        n_chunks = min(os.cpu_count() or 1, max(1, values.size // PARALLEL_NOISE_MIN_CELLS), n_rows)
+        if n_chunks <= 1:
+            totals = noisy_rows(self.rng, 0, n_rows)
+        else:
+            edges = np.linspace(0, n_rows, n_chunks + 1, dtype=int)
+            with ThreadPoolExecutor(max_workers=n_chunks) as executor:
+                totals = sum(executor.map(noisy_rows, self.rng.spawn(n_chunks), edges[:-1], edges[1:]))
+
+        counts = totals[2]
+        means = np.divide(
+            totals[:2], counts,
+            out=np.full((2, n_cols), np.nan),
+            where=counts > 0
+        )
 
-        return noisy_values
+        return noisy, means[0], means[1]
 
     def compute_dp_statistics(
         self,
@@ -167,13 +312,13 @@ class DifferentialPrivacy:
         Args:
             df: DataFrame
             column: Sütun adı
-            epsilon_per_stat: Her istatistik için epsilon (None ise self.epsilon/4)
+            epsilon_per_stat: Her sorgu için epsilon (None ise self.epsilon/3)
 
         Returns:
             DP istatistikleri
         """
         if epsilon_per_stat is None:
-            epsilon_per_stat = self.epsilon / 4  # 4 istatistik için böl
+            epsilon_per_stat = self.epsilon / 3  # mean, variance ve median sorguları için böl
 
         values = df[column].values
         lower, upper = values.min(), values.max()
@@ -192,12 +337,8 @@ class DifferentialPrivacy:
             bounds=(lower, upper)
         )
 
-        # DP std
-        dp_std = std(
-            values,
-            epsilon=epsilon_per_stat,
-            bounds=(lower, upper)
-        )
+        # DP std: DP varyansın post-processing'i (veriye tekrar dokunmaz, ek bütçe harcamaz)
+        dp_std = np.sqrt(max(dp_variance, 0.0))
 
         # DP median (yaklaşık)
         dp_median = median(
@@ -206,14 +347,14 @@ class DifferentialPrivacy:
             bounds=(lower, upper)
         )
 
-        self.privacy_budget_spent += epsilon_per_stat * 4
+        self.privacy_budget_spent += epsilon_per_stat * 3
 
         return {
             "mean": float(dp_mean),
             "variance": float(dp_variance),
             "std": float(dp_std),
             "median": float(dp_median),
-            "epsilon_used": epsilon_per_stat * 4
+            "epsilon_used": epsilon_per_stat * 3
         }
 
     def k_anonymity_check(
@@ -233,15 +374,17 @@ class DifferentialPrivacy:
         Returns:
             K-anonymity raporu
         """
-        # Quasi-identifier'lara göre grupla
-        groups = df.groupby(quasi_identifiers).size()
+        # Eşdeğerlik sınıfları QI satır hash'leriyle sayılır (grup anahtarları oluşturulmaz);
+        # eksik QI değerleri de kendi sınıflarını oluşturur
+        row_hashes = pd.util.hash_pandas_object(df[quasi_identifiers], index=False).to_numpy()
+        _, group_sizes = np.unique(row_hashes, return_counts=True)
 
         # K'dan küçük grupları bul
-        vulnerable_groups = groups[groups < k]
+        vulnerable_groups = group_sizes[group_sizes < k]
 
         total_records = len(df)
         vulnerable_records = vulnerable_groups.sum()
-        vulnerable_percentage = (vulnerable_records / total_records) * 100
+        vulnerable_percentage = (vulnerable_records / total_records) * 100 if total_records else 0.0
 
         return {
             "k_value": k,
@@ -249,8 +392,10 @@ class DifferentialPrivacy:
             "vulnerable_records": int(vulnerable_records),
             "vulnerable_percentage": float(vulnerable_percentage),
             "is_k_anonymous": len(vulnerable_groups) == 0,
-            "smallest_group_size": int(groups.min()) if len(groups) > 0 else 0,
-            "average_group_size": float(groups.mean()) if len(groups) > 0 else 0,
+            "equivalence_classes": len(group_sizes),
+            "vulnerable_classes": len(vulnerable_groups),
+            "smallest_group_size": int(group_sizes.min()) if len(group_sizes) > 0 else 0,
+            "average_group_size": float(group_sizes.mean()) if len(group_sizes) > 0 else 0,
             "recommendation": self._get_k_anonymity_recommendation(vulnerable_percentage)
         }
 
@@ -279,12 +424,7 @@ class DifferentialPrivacy:
         total_epsilon = self.epsilon * num_queries
 
         # Advanced composition (daha iyi bound)
-        # ε' = √(2k ln(1/δ)) * ε + k * ε * (e^ε - 1)
-        k = num_queries
-        advanced_epsilon = (
-            np.sqrt(2 * k * np.log(1 / self.delta)) * self.epsilon +
-            k * self.epsilon * (np.exp(self.epsilon) - 1)
-        )
+        advanced_epsilon = _advanced_composition(self.epsilon, self.delta, num_queries)
 
         return {
             "num_queries": num_queries,
@@ -346,16 +486,7 @@ class DifferentialPrivacy:
 
     def _get_privacy_level_for_epsilon(self, epsilon: float) -> str:
         """Epsilon değerine göre gizlilik seviyesi"""
-        if epsilon < 0.5:
-            return "very_high"
-        elif epsilon < 1.0:
-            return "high"
-        elif epsilon < 2.0:
-            return "medium"
-        elif epsilon < 5.0:
-            return "low"
-        else:
-            return "very_low"
+        return PRIVACY_LEVEL_LABELS[int(np.searchsorted(PRIVACY_LEVEL_THRESHOLDS, epsilon, side="right"))]
 
     def _get_epsilon_explanation(self, epsilon: float, use_case: str, sensitivity: str) -> str:
         """Epsilon önerisinin açıklaması"""
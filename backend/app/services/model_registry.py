@@ -0,0 +1,167 @@
+"""Kaydedilmiş CTGAN Modelleri için SQLite Manifest Servisi"""
+
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+import orjson
+
+
+class ModelRegistry:
+    """Model dizinlerini indeksli bir SQLite tablosunda tutan servis"""
+
+    def __init__(self, model_dir: Path, db_path: Optional[Path] = None):
+        """
+        Yalnızca tabloyu oluşturur; disk taraması import sırasında değil, uygulama
+        başlangıcında sync_from_disk ile bir kez yapılır.
+
+        Args:
+            model_dir: Modellerin kaydedildiği dizin
+            db_path: Manifest veritabanı yolu (None ise model_dir/manifest.db)
+        """
+        self.model_dir = Path(model_dir)
+        self.db_path = Path(db_path) if db_path else self.model_dir / "manifest.db"
+
+        self._create_tables()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Her çağrı kendi bağlantısını açar; metotlar farklı thread'lerden çağrılabilir
+        return sqlite3.connect(self.db_path)
+
+    def _create_tables(self) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS models (
+                    model_id TEXT PRIMARY KEY,
+                    path TEXT NOT NULL,
+                    trained_at TEXT,
+                    stats BLOB
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_models_trained_at ON models (trained_at)"
+            )
+
+    def sync_from_disk(self) -> int:
+        """
+        Manifest'i model dizini ile eşitle
+
+        Manifest'te olmayan model dizinleri eklenir, diski silinmiş kayıtlar kaldırılır.
+        Manifest öncesi kaydedilmiş modeller bu sayede listede görünmeye devam eder.
+        Eşitleme tek bir yazma kilidi (BEGIN IMMEDIATE) altında yapılır; birden fazla
+        uvicorn worker'ı aynı anda başlarsa sonrakiler güncel manifest'i görüp bir şey yapmaz.
+
+        Returns:
+            Manifest'e eklenen model sayısı
+        """
+        with closing(self._connect()) as conn, conn:
+            conn.execute("BEGIN IMMEDIATE")
+
+            on_disk = {d.name: d for d in self.model_dir.iterdir() if d.is_dir()}
+            known = {row[0] for row in conn.execute("SELECT model_id FROM models")}
+
+            stale = known - on_disk.keys()
+            conn.executemany(
+                "DELETE FROM models WHERE model_id = ?",
+                [(model_id,) for model_id in stale]
+            )
+
+            rows = []
+            for model_id in on_disk.keys() - known:
+                stats_file = on_disk[model_id] / "training_stats.json"
+                stats = orjson.loads(stats_file.read_bytes()) if stats_file.exists() else None
+                rows.append(self._row(model_id, str(on_disk[model_id]), stats))
+
+            conn.executemany(
+                "INSERT OR REPLACE INTO models (model_id, path, trained_at, stats) VALUES (?, ?, ?, ?)",
+                rows
+            )
+
+        return len(rows)
+
+    def version(self) -> str:
+        """
+        Manifest'in değişim damgası
+
+        Her commit veritabanı dosyasının mtime/boyutunu değiştirir; ETag üretmek için yeterlidir.
+
+        Returns:
+            "<mtime_ns>-<boyut>" biçiminde damga
+        """
+        db_stat = self.db_path.stat()
+        return f"{db_stat.st_mtime_ns}-{db_stat.st_size}"
+
+    def upsert(self, model_id: str, path: str, training_stats: Optional[Dict[str, Any]]) -> None:
+        """
+        Modeli manifest'e ekle veya güncelle
+
+        Args:
+            model_id: Model ID
+            path: Model dizin yolu
+            training_stats: Eğitim istatistikleri
+        """
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO models (model_id, path, trained_at, stats) VALUES (?, ?, ?, ?)",
+                self._row(model_id, path, training_stats)
+            )
+
+    @staticmethod
+    def _row(model_id: str, path: str, training_stats: Optional[Dict[str, Any]]) -> tuple:
+        """models tablosu satırı (model_id, path, trained_at, stats)"""
+        trained_at = training_stats.get("trained_at") if training_stats else None
+        stats = orjson.dumps(training_stats) if training_stats is not None else None
+        return model_id, path, trained_at, stats
+
+    def delete(self, model_id: str) -> None:
+        """
+        Modeli manifest'ten kaldır
+
+        Args:
+            model_id: Model ID
+        """
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM models WHERE model_id = ?", (model_id,))
+
+    def get(self, model_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Tek bir modelin manifest kaydını getir
+
+        Args:
+            model_id: Model ID
+
+        Returns:
+            Model kaydı (yoksa None)
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT model_id, path, stats FROM models WHERE model_id = ?",
+                (model_id,)
+            ).fetchone()
+
+        return self._row_to_dict(row) if row else None
+
+    def list_models(self) -> List[Dict[str, Any]]:
+        """
+        Tüm modelleri eğitim zamanına göre (yeniden eskiye) listele
+
+        Returns:
+            Model kayıtları
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT model_id, path, stats FROM models ORDER BY COALESCE(trained_at, '') DESC"
+            ).fetchall()
+
+        return [self._row_to_dict(row) for row in rows]
+
+    @staticmethod
+    def _row_to_dict(row: tuple) -> Dict[str, Any]:
+        model_id, path, stats = row
+        entry = {"model_id": model_id, "model_path": path}
+        if stats is not None:
+            entry["training_stats"] = orjson.loads(stats)
+        return entry
@@ -6,14 +6,69 @@ Kişisel veriler (isim, email, telefon) tespit edilir ve Faker ile sentetik veri
 """
 
 import re
+from collections import Counter
+from functools import lru_cache
+
+import numpy as np
 import pandas as pd
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Callable, Dict, List, Any, Optional, Tuple
 from faker import Faker
-from presidio_analyzer import AnalyzerEngine, Pattern, PatternRecognizer
+from presidio_analyzer import AnalyzerEngine, BatchAnalyzerEngine, Pattern, PatternRecognizer, RecognizerResult
 from presidio_anonymizer import AnonymizerEngine
 from presidio_anonymizer.entities import OperatorConfig
 
 
+# Tespit edilen PII tipleri (sıra, eşit sayılarda dominant tipi belirler)
+PII_ENTITIES = ["PERSON", "EMAIL_ADDRESS", "PHONE_NUMBER", "TR_PHONE_NUMBER"]
+
+# Sütun başına analiz edilen dolu değer sayısı ve bu örnek için taranan ilk satır sayısı
+PII_SAMPLE_SIZE = 100
+PII_SAMPLE_SCAN_ROWS = 500
+
+# Türkçe telefon numarası pattern'i (05XX XXX XX XX)
+TR_PHONE_RECOGNIZER = PatternRecognizer(
+    supported_entity="TR_PHONE_NUMBER",
+    patterns=[
+        Pattern(
+            name="tr_phone_pattern",
+            regex=r"\b0?5\d{2}\s?\d{3}\s?\d{2}\s?\d{2}\b",
+            score=0.9
+        )
+    ]
+)
+
+
+@lru_cache(maxsize=1)
+def _get_analyzer() -> AnalyzerEngine:
+    """
+    Süreç genelinde tek AnalyzerEngine
+
+    spaCy modeli yalnızca ilk çağrıda yüklenir; sonraki PIIDetector örnekleri aynı
+    pipeline'ı paylaşır.
+    """
+    analyzer = AnalyzerEngine()
+    analyzer.registry.add_recognizer(TR_PHONE_RECOGNIZER)
+    return analyzer
+
+
+@lru_cache(maxsize=1)
+def _get_batch_analyzer() -> BatchAnalyzerEngine:
+    """Paylaşılan AnalyzerEngine üzerinde BatchAnalyzerEngine"""
+    return BatchAnalyzerEngine(analyzer_engine=_get_analyzer())
+
+
+@lru_cache(maxsize=1)
+def _get_anonymizer() -> AnonymizerEngine:
+    """Süreç genelinde tek AnonymizerEngine"""
+    return AnonymizerEngine()
+
+
+@lru_cache(maxsize=None)
+def _get_faker(locale: str) -> Faker:
+    """Locale başına tek Faker örneği"""
+    return Faker(locale)
+
+
 class PIIDetector:
     """PII (Personally Identifiable Information) tespiti ve anonimleştirme servisi"""
 
@@ -23,27 +78,21 @@ class PIIDetector:
             locale: Faker için locale (tr_TR, en_US, vb.)
         """
         self.locale = locale
-        self.faker = Faker(locale)
-        self.analyzer = AnalyzerEngine()
-        self.anonymizer = AnonymizerEngine()
+        # Motorlar modül düzeyinde önbelleklenir: her istekte spaCy modeli yeniden yüklenmez
+        self.faker = _get_faker(locale)
+        self.analyzer = _get_analyzer()
+        self.anonymizer = _get_anonymizer()
 
-        # Türkçe telefon numarası pattern'i ekle
-        tr_phone_pattern = Pattern(
-            name="tr_phone_pattern",
-            regex=r"\b0?5\d{2}\s?\d{3}\s?\d{2}\s?\d{2}\b",
-            score=0.9
-        )
-
-        tr_phone_recognizer = PatternRecognizer(
-            supported_entity="TR_PHONE_NUMBER",
-            patterns=[tr_phone_pattern]
-        )
-
-        self.analyzer.registry.add_recognizer(tr_phone_recognizer)
+        # Sütun örneklerini tek spaCy pipe çağrısında analiz eder
+        self.batch_analyzer = _get_batch_analyzer()
 
         # Cache: Her unique değer için üretilen sentetik veri
         self.replacement_cache: Dict[str, str] = {}
 
+        # Cache: (metin, dil) -> analiz sonuçları. Ham PII metinleri içerdiğinden süreç
+        # genelinde değil, detector örneği (istek/görev) ömrü boyunca tutulur
+        self.analysis_cache: Dict[Tuple[str, str], List[RecognizerResult]] = {}
+
     def detect_pii_in_text(self, text: str, language: str = "tr") -> List[Dict[str, Any]]:
         """
         Metinde PII tespit et
@@ -55,11 +104,7 @@ class PIIDetector:
         Returns:
             Tespit edilen PII listesi
         """
-        results = self.analyzer.analyze(
-            text=text,
-            language=language,
-            entities=["PERSON", "EMAIL_ADDRESS", "PHONE_NUMBER", "TR_PHONE_NUMBER"]
-        )
+        results = self._analyze_texts([text], language)[0]
 
         pii_list = []
         for result in results:
@@ -73,12 +118,17 @@ class PIIDetector:
 
         return pii_list
 
-    def detect_pii_in_dataframe(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def detect_pii_in_dataframe(
+        self,
+        df: pd.DataFrame,
+        columns: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
         """
-        DataFrame'deki tüm sütunlarda PII tespit et
+        DataFrame'deki sütunlarda PII tespit et
 
         Args:
             df: Analiz edilecek DataFrame
+            columns: Analiz edilecek sütunlar (None ise tüm sütunlar)
 
         Returns:
             Sütun bazında PII bilgileri
@@ -89,38 +139,117 @@ class PIIDetector:
             "pii_summary": {}
         }
 
-        for column in df.columns:
-            # String sütunları kontrol et
-            if df[column].dtype == 'object':
-                column_pii = self._analyze_column(df[column], column)
+        if columns is None:
+            columns = df.columns.tolist()
+
+        # String sütunların örnekleri toplanır; tüm sütunların benzersiz metinleri tek
+        # BatchAnalyzerEngine çağrısında analiz edilir (sütun başına ayrı çağrı yapılmaz)
+        samples = {
+            column: self._column_sample(df[column])
+            for column in columns
+            if column in df.columns and df[column].dtype == 'object'
+        }
+        texts = list(dict.fromkeys(
+            text for value_counts, _ in samples.values() for text in value_counts.index
+        ))
+        results_by_text = dict(zip(texts, self._analyze_texts(texts, "tr")))
+
+        for column, (value_counts, sample_size) in samples.items():
+            column_pii = self._summarize_column(
+                column,
+                [results_by_text[text] for text in value_counts.index],
+                value_counts.tolist(),
+                sample_size
+            )
 
-                if column_pii["pii_count"] > 0:
-                    pii_report["columns_with_pii"].append(column)
-                    pii_report["pii_summary"][column] = column_pii
+            if column_pii["pii_count"] > 0:
+                pii_report["columns_with_pii"].append(column)
+                pii_report["pii_summary"][column] = column_pii
 
         return pii_report
 
+    def _analyze_texts(self, texts: List[str], language: str) -> List[List[RecognizerResult]]:
+        """
+        Metinleri PII_ENTITIES için analiz et (sonuçlar detector örneğinde önbelleklenir)
+
+        Cache'te olmayan metinler tek BatchAnalyzerEngine çağrısında analiz edilir.
+
+        Args:
+            texts: Analiz edilecek metinler
+            language: Dil kodu (tr, en)
+
+        Returns:
+            Her metin için tespit sonuçları (aynı sırada)
+        """
+        keys = [(text, language) for text in texts]
+        cached = [self.analysis_cache.get(key) for key in keys]
+
+        missing = [i for i, results in enumerate(cached) if results is None]
+        if missing:
+            fresh = self.batch_analyzer.analyze_iterator(
+                texts=[texts[i] for i in missing],
+                language=language,
+                entities=PII_ENTITIES
+            )
+            for i, results in zip(missing, fresh):
+                cached[i] = results
+                self.analysis_cache[keys[i]] = results
+
+        return cached
+
     def _analyze_column(self, series: pd.Series, column_name: str) -> Dict[str, Any]:
         """Tek bir sütunu PII için analiz et"""
-        pii_entities = {
-            "PERSON": 0,
-            "EMAIL_ADDRESS": 0,
-            "PHONE_NUMBER": 0,
-            "TR_PHONE_NUMBER": 0
-        }
+        value_counts, sample_size = self._column_sample(series)
+        batch_results = self._analyze_texts(value_counts.index.tolist(), "tr")
+        return self._summarize_column(column_name, batch_results, value_counts.tolist(), sample_size)
 
-        sample_values = series.dropna().head(100).astype(str)
+    def _column_sample(self, series: pd.Series) -> Tuple[pd.Series, int]:
+        """
+        Sütundan PII analizi için örnek al
 
-        for value in sample_values:
-            results = self.analyzer.analyze(
-                text=value,
-                language="tr",
-                entities=list(pii_entities.keys())
-            )
+        Args:
+            series: Analiz edilecek sütun
+
+        Returns:
+            (örnek değer -> tekrar sayısı, örnek boyutu)
+        """
+        # Örnek önce sütunun başından alınır (tüm sütunda dropna taraması yapılmaz);
+        # baştaki boşluklar örneği doldurmazsa tüm sütuna bakılır
+        head = series.head(PII_SAMPLE_SCAN_ROWS)
+        sample_values = head[head.notna()].head(PII_SAMPLE_SIZE)
+        if len(sample_values) < PII_SAMPLE_SIZE and len(series) > len(head):
+            sample_values = series.dropna().head(PII_SAMPLE_SIZE)
+        if not isinstance(sample_values.dtype, pd.StringDtype):
+            sample_values = sample_values.astype(str)
+
+        # Tekrarlanan değerler bir kez analiz edilir, sonuçlar tekrar sayısıyla ağırlıklandırılır
+        return sample_values.value_counts(sort=False), len(sample_values)
+
+    def _summarize_column(
+        self,
+        column_name: str,
+        batch_results: List[List[RecognizerResult]],
+        counts: List[int],
+        sample_size: int
+    ) -> Dict[str, Any]:
+        """
+        Örnek değerlerin analiz sonuçlarından sütun PII özetini çıkar
 
+        Args:
+            column_name: Sütun adı
+            batch_results: Her benzersiz örnek değer için tespit sonuçları
+            counts: Her benzersiz örnek değerin tekrar sayısı
+            sample_size: Örnek boyutu
+
+        Returns:
+            Sütun PII bilgileri
+        """
+        entity_counts = Counter()
+        for results, count in zip(batch_results, counts):
             for result in results:
-                pii_entities[result.entity_type] += 1
+                entity_counts[result.entity_type] += count
 
+        pii_entities = {entity: entity_counts[entity] for entity in PII_ENTITIES}
         total_pii = sum(pii_entities.values())
 
         # Dominant PII tipini belirle
@@ -133,14 +262,15 @@ class PIIDetector:
             "pii_count": total_pii,
             "pii_entities": pii_entities,
             "dominant_type": dominant_type,
-            "sample_size": len(sample_values)
+            "sample_size": sample_size
         }
 
     def anonymize_dataframe(
         self,
         df: pd.DataFrame,
         columns: Optional[List[str]] = None,
-        consistent: bool = True
+        consistent: bool = True,
+        pii_report: Optional[Dict[str, Any]] = None
     ) -> Tuple[pd.DataFrame, Dict[str, Any]]:
         """
         DataFrame'deki PII'ları sentetik verilerle değiştir
@@ -149,15 +279,21 @@ class PIIDetector:
             df: Anonimleştirilecek DataFrame
             columns: Anonimleştirilecek sütunlar (None ise tüm sütunlar)
             consistent: Aynı değerler için aynı sentetik veriyi kullan
+            pii_report: detect_pii_in_dataframe çıktısı (None ise seçili sütunlar için hesaplanır)
 
         Returns:
             (Anonimleştirilmiş DataFrame, Anonimleştirme raporu)
         """
-        df_anonymized = df.copy()
+        # Sütunlar aşağıda kopyalanan dizilerle yeniden atanır; sığ kopya df'i değiştirmez
+        df_anonymized = df.copy(deep=False)
 
         if columns is None:
             columns = df.columns.tolist()
 
+        # Sütun tipleri tek tespit geçişinden okunur (sütun başına yeniden analiz yok)
+        if pii_report is None:
+            pii_report = self.detect_pii_in_dataframe(df, columns)
+
         anonymization_report = {
             "columns_processed": [],
             "total_replacements": 0,
@@ -171,35 +307,40 @@ class PIIDetector:
             if df[column].dtype != 'object':
                 continue
 
-            # Sütun tipini tespit et
-            column_analysis = self._analyze_column(df[column], column)
-            dominant_type = column_analysis.get("dominant_type")
+            dominant_type = pii_report["pii_summary"].get(column, {}).get("dominant_type")
 
             if dominant_type:
-                replacements = 0
-
-                for idx, value in df_anonymized[column].items():
-                    if pd.isna(value):
-                        continue
-
-                    value_str = str(value)
-
-                    # Consistent mode: cache kullan
-                    if consistent and value_str in self.replacement_cache:
-                        df_anonymized.at[idx, column] = self.replacement_cache[value_str]
-                        replacements += 1
-                        continue
-
-                    # PII tipine göre sentetik veri üret
-                    synthetic_value = self._generate_synthetic_data(dominant_type, value_str)
+                values = df_anonymized[column].to_numpy(dtype=object, copy=True)
+                present = pd.notna(values)
+                originals = pd.Series(values[present]).astype(str)
+
+                if consistent:
+                    # Değerler factorize ile koda çevrilir; cache'te olmayan benzersiz değerler
+                    # için sentetik veriler toplu üretilir, satırlara kod indeksiyle dağıtılır
+                    codes, uniques = pd.factorize(originals, sort=False)
+                    new_values = [v for v in uniques if v not in self.replacement_cache]
+                    for value_str, synthetic_value in zip(
+                        new_values, self._generate_synthetic_batch(dominant_type, new_values)
+                    ):
+                        if synthetic_value != value_str:
+                            self.replacement_cache[value_str] = synthetic_value
 
-                    if synthetic_value != value_str:
-                        df_anonymized.at[idx, column] = synthetic_value
+                    synthetic_by_code = np.array(
+                        [self.replacement_cache.get(v, v) for v in uniques], dtype=object
+                    )
+                    synthetic = synthetic_by_code[codes]
+                    changed = (synthetic_by_code != np.asarray(uniques, dtype=object))[codes]
+                else:
+                    synthetic = np.array(
+                        self._generate_synthetic_batch(dominant_type, originals.tolist()), dtype=object
+                    )
+                    changed = synthetic != originals.to_numpy(dtype=object)
 
-                        if consistent:
-                            self.replacement_cache[value_str] = synthetic_value
+                # Sadece değişen hücreleri yaz (sütun tek seferde atanır)
+                values[np.flatnonzero(present)[changed]] = synthetic[changed]
+                df_anonymized[column] = values
 
-                        replacements += 1
+                replacements = int(changed.sum())
 
                 anonymization_report["columns_processed"].append(column)
                 anonymization_report["total_replacements"] += replacements
@@ -210,29 +351,59 @@ class PIIDetector:
 
         return df_anonymized, anonymization_report
 
+    def _synthetic_provider(self, entity_type: str) -> Optional[Callable[[], str]]:
+        """PII tipine karşılık gelen Faker provider metodu (desteklenmeyen tipte None)"""
+        if entity_type == "PERSON":
+            return self.faker.name
+
+        elif entity_type == "EMAIL_ADDRESS":
+            return self.faker.email
+
+        elif entity_type in ["PHONE_NUMBER", "TR_PHONE_NUMBER"]:
+            # Türkçe telefon formatı: 05XX XXX XX XX
+            return self.faker.phone_number
+
+        return None
+
     def _generate_synthetic_data(self, entity_type: str, original_value: str) -> str:
         """PII tipine göre sentetik veri üret"""
-        try:
-            if entity_type == "PERSON":
-                return self.faker.name()
+        return self._generate_synthetic_batch(entity_type, [original_value])[0]
 
-            elif entity_type == "EMAIL_ADDRESS":
-                return self.faker.email()
+    def _generate_synthetic_batch(self, entity_type: str, original_values: List[str]) -> List[str]:
+        """
+        Değer listesi için sentetik veriler üret
 
-            elif entity_type in ["PHONE_NUMBER", "TR_PHONE_NUMBER"]:
-                # Türkçe telefon formatı: 05XX XXX XX XX
-                return self.faker.phone_number()
+        Provider metodu bir kez çözülür ve sıkı bir döngüde çağrılır (değer başına tip
+        dispatch'i yok).
 
-            else:
-                return original_value
+        Args:
+            entity_type: PII tipi
+            original_values: Orijinal değerler
 
+        Returns:
+            Aynı sırada sentetik değerler (üretilemeyenler orijinal haliyle)
+        """
+        provider = self._synthetic_provider(entity_type)
+        if provider is None:
+            return list(original_values)
+
+        try:
+            return [provider() for _ in range(len(original_values))]
         except Exception:
-            return original_value
+            # Toplu üretim hata verirse değer bazında üret, başarısız olanlar korunur
+            synthetic = []
+            for value in original_values:
+                try:
+                    synthetic.append(provider())
+                except Exception:
+                    synthetic.append(value)
+            return synthetic
 
     def get_anonymization_preview(
         self,
         df: pd.DataFrame,
-        num_samples: int = 5
+        num_samples: int = 5,
+        pii_report: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
         Anonimleştirme önizlemesi
@@ -240,12 +411,14 @@ class PIIDetector:
         Args:
             df: DataFrame
             num_samples: Önizleme için örnek sayısı
+            pii_report: detect_pii_in_dataframe çıktısı (None ise hesaplanır)
 
         Returns:
             Önizleme raporu
         """
         # PII tespit et
-        pii_report = self.detect_pii_in_dataframe(df)
+        if pii_report is None:
+            pii_report = self.detect_pii_in_dataframe(df)
 
         preview = {
             "pii_columns": pii_report["columns_with_pii"],
@@ -279,5 +452,6 @@ class PIIDetector:
         return preview
 
     def clear_cache(self):
-        """Replacement cache'i temizle"""
+        """Replacement ve analiz cache'lerini temizle"""
         self.replacement_cache.clear()
+        self.analysis_cache.clear()
@@ -5,15 +5,220 @@ Faz 3.2: Benzerlik Raporu
 Orijinal ve sentetik veri arasındaki istatistiksel benzerliği hesaplar ve raporlar.
 """
 
+import warnings
+
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Any, Tuple
-from scipy.stats import ks_2samp, wasserstein_distance
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+from scipy.stats import ks_2samp, kstwo
 from scipy.spatial.distance import jensenshannon
 from sklearn.preprocessing import LabelEncoder
 import json
 
 
+# include_matrices ile bu sayıdan fazla sütunlu korelasyon matrisleri düz liste olarak döner
+CORRELATION_MATRIX_DICT_LIMIT = 50
+
+# Kalite notu eşikleri (artan) ve not tablosu: skor >= eşik[i] ise QUALITY_GRADES[i + 1]
+QUALITY_GRADE_THRESHOLDS = np.array([0.4, 0.6, 0.75, 0.9])
+QUALITY_GRADES = (
+    {
+        "grade": "Yetersiz",
+        "emoji": "🔴",
+        "description": "Sentetik veri orijinalden çok farklı, kullanılmamalı"
+    },
+    {
+        "grade": "Zayıf",
+        "emoji": "🟠",
+        "description": "Sentetik veri düşük kalitede, yeniden üretim önerilir"
+    },
+    {
+        "grade": "Orta",
+        "emoji": "🟡",
+        "description": "Sentetik veri kabul edilebilir, bazı iyileştirmeler yapılabilir"
+    },
+    {
+        "grade": "İyi",
+        "emoji": "🔵",
+        "description": "Sentetik veri yeterli kalitede, çoğu kullanım için uygun"
+    },
+    {
+        "grade": "Mükemmel",
+        "emoji": "🟢",
+        "description": "Sentetik veri orijinale çok benzer, güvenle kullanılabilir"
+    },
+)
+
+# ks_2samp'ın (method="auto") kesin p-değeri hesapladığı en büyük örnek boyutu; daha büyük
+# örneklerde asimptotik Kolmogorov dağılımı toplu olarak kullanılır
+KS_EXACT_MAX_N = 10000
+
+
+def _column_kind(series: pd.Series) -> str:
+    """Sütunun karşılaştırma türü ("numeric", "categorical" veya "other")"""
+    if pd.api.types.is_numeric_dtype(series):
+        return "numeric"
+    if pd.api.types.is_object_dtype(series) or isinstance(series.dtype, pd.CategoricalDtype):
+        return "categorical"
+    return "other"
+
+
+def _column_kinds(df: pd.DataFrame, columns: List[str]) -> Dict[str, str]:
+    """Sütun adı -> karşılaştırma türü (dtype dispatch'i sütun başına bir kez)"""
+    return {column: _column_kind(df[column]) for column in columns}
+
+
+def _wasserstein_sorted(u_values: np.ndarray, v_values: np.ndarray) -> float:
+    """
+    Sıralı örnekler arasındaki 1-D Wasserstein mesafesi
+
+    scipy.stats.wasserstein_distance ile aynı CDF farkı integrali; girdiler zaten
+    sıralı olduğundan örnek başına argsort yapılmaz.
+
+    Args:
+        u_values: Artan sıralı, NaN içermeyen örnekler
+        v_values: Artan sıralı, NaN içermeyen örnekler
+
+    Returns:
+        Wasserstein mesafesi
+    """
+    if len(u_values) == 0 or len(v_values) == 0:
+        raise ValueError("Wasserstein mesafesi için boş olmayan örnekler gerekli")
+
+    # İki sıralı dizinin birleşimi: mergesort (timsort) sıralı parçaları doğrusal birleştirir
+    all_values = np.concatenate((u_values, v_values))
+    all_values.sort(kind="mergesort")
+    deltas = np.diff(all_values)
+
+    u_cdf = np.searchsorted(u_values, all_values[:-1], side="right") / len(u_values)
+    v_cdf = np.searchsorted(v_values, all_values[:-1], side="right") / len(v_values)
+
+    return float(np.sum(np.abs(u_cdf - v_cdf) * deltas))
+
+
+def _metric_records(metrics: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+    """
+    Sütun bazlı metrik dizilerini sütun başına sözlük listesine çevir
+
+    Her dizi tek tolist() çağrısıyla Python float/int'e dönüştürülür; rapor numpy
+    skaleri içermez (msgpack ile Celery sonucu olarak taşınabilir).
+
+    Args:
+        metrics: Metrik adı -> (sütun,) dizisi
+
+    Returns:
+        Sütun sırasıyla metrik sözlükleri
+    """
+    names = list(metrics)
+    columns = zip(*(np.asarray(metrics[name]).tolist() for name in names))
+    return [dict(zip(names, values)) for values in columns]
+
+
+def _sorted_column_stats(
+    sorted_values: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Sütun bazında sıralı matrisin ortalama, standart sapma (ddof=1), min ve max değerleri
+
+    NaN maskesi bir kez çıkarılır; ortalama ve sapma where= ile NaN'lar doldurulmuş
+    kopya oluşturulmadan indirgenir. Min/max sıralı dolu kısmın uç elemanlarıdır.
+
+    Args:
+        sorted_values: (satır, sütun) axis=0 boyunca sıralı matris (NaN'lar sonda)
+
+    Returns:
+        (mean, std, min, max); tamamen boş sütunlarda NaN
+    """
+    valid = ~np.isnan(sorted_values)
+    counts = np.count_nonzero(valid, axis=0)
+    columns = np.arange(sorted_values.shape[1])
+    non_empty = counts > 0
+
+    # Tamamen boş sütunlar pandas'taki gibi NaN verir (uyarı basılmaz)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        mean = np.mean(sorted_values, axis=0, where=valid)
+        std = np.std(sorted_values, axis=0, ddof=1, where=valid)
+
+    if sorted_values.shape[0] == 0:
+        empty = np.full(sorted_values.shape[1], np.nan)
+        return mean, std, empty, empty.copy()
+
+    min_value = np.where(non_empty, sorted_values[0], np.nan)
+    max_value = np.where(non_empty, sorted_values[np.maximum(counts - 1, 0), columns], np.nan)
+    return mean, std, min_value, max_value
+
+
+def _ks_statistic_sorted(u_values: np.ndarray, v_values: np.ndarray) -> float:
+    """
+    Sıralı örnekler arasındaki iki örneklem Kolmogorov-Smirnov istatistiği
+
+    ks_2samp ile aynı ampirik CDF farkı (searchsorted, side="right"); girdiler zaten
+    sıralı olduğundan yeniden sıralanmaz.
+
+    Args:
+        u_values: Artan sıralı, NaN içermeyen, boş olmayan örnekler
+        v_values: Artan sıralı, NaN içermeyen, boş olmayan örnekler
+
+    Returns:
+        max |F_u(x) - F_v(x)|
+    """
+    all_values = np.concatenate((u_values, v_values))
+    u_cdf = np.searchsorted(u_values, all_values, side="right") / len(u_values)
+    v_cdf = np.searchsorted(v_values, all_values, side="right") / len(v_values)
+    return float(np.max(np.abs(u_cdf - v_cdf)))
+
+
+def _histogram_sorted(sorted_values: np.ndarray, bins: np.ndarray, density: bool = False) -> np.ndarray:
+    """
+    Sıralı örneklerin histogramı (np.histogram ile aynı bin kuralları)
+
+    Veri zaten sıralı olduğundan her kenar için bir ikili arama yeterlidir; son bin
+    np.histogram'daki gibi sağdan kapalıdır.
+
+    Args:
+        sorted_values: Artan sıralı, NaN içermeyen örnekler
+        bins: Bin kenarları
+        density: True ise olasılık yoğunluğu döndür
+
+    Returns:
+        Bin başına sayı (veya yoğunluk)
+    """
+    positions = np.searchsorted(sorted_values, bins, side="left")
+    positions[-1] = np.searchsorted(sorted_values, bins[-1], side="right")
+    counts = np.diff(positions)
+
+    if not density:
+        return counts
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return counts / np.diff(bins) / counts.sum()
+
+
+def _sorted_samples(
+    orig_sorted: np.ndarray,
+    synth_sorted: np.ndarray,
+    columns: Sequence[Any]
+) -> Dict[Any, Tuple[np.ndarray, np.ndarray]]:
+    """
+    Sütun bazında sıralı matrislerden NaN içermeyen örnek görünümleri
+
+    Args:
+        orig_sorted: axis=0 boyunca sıralı orijinal matris (NaN'lar sonda)
+        synth_sorted: axis=0 boyunca sıralı sentetik matris (NaN'lar sonda)
+        columns: Matris sütunlarının adları (veya indeksleri)
+
+    Returns:
+        Sütun adı -> (orijinal örnekler, sentetik örnekler); kopya değil, görünüm
+    """
+    orig_counts = np.count_nonzero(~np.isnan(orig_sorted), axis=0)
+    synth_counts = np.count_nonzero(~np.isnan(synth_sorted), axis=0)
+    return {
+        column: (orig_sorted[:orig_counts[j], j], synth_sorted[:synth_counts[j], j])
+        for j, column in enumerate(columns)
+    }
+
+
 class SimilarityReport:
     """Similarity analysis between original and synthetic data"""
 
@@ -24,7 +229,8 @@ class SimilarityReport:
     def generate_full_report(
         self,
         df_original: pd.DataFrame,
-        df_synthetic: pd.DataFrame
+        df_synthetic: pd.DataFrame,
+        include_matrices: bool = False
     ) -> Dict[str, Any]:
         """
         Orijinal ve sentetik veri için tam benzerlik raporu oluştur
@@ -32,6 +238,7 @@ class SimilarityReport:
         Args:
             df_original: Orijinal DataFrame
             df_synthetic: Sentetik DataFrame
+            include_matrices: Korelasyon matrislerinin tamamını rapora ekle
 
         Returns:
             Tam benzerlik raporu
@@ -56,13 +263,52 @@ class SimilarityReport:
             report["error"] = "Ortak sütun bulunamadı"
             return report
 
+        # Numeric sütunlar bir kez sütun bazında sıralanır (NaN'lar sona düşer); metrikler,
+        # histogramlar ve testler aynı sıralı matrisleri kullanır
+        column_kinds = _column_kinds(df_original, common_columns)
+        numeric_cols = [col for col in common_columns if column_kinds[col] == "numeric"]
+        orig_sorted = np.sort(
+            df_original[numeric_cols].to_numpy(dtype=np.float64, na_value=np.nan), axis=0
+        )
+        synth_sorted = np.sort(
+            df_synthetic[numeric_cols].to_numpy(dtype=np.float64, na_value=np.nan), axis=0
+        )
+        sorted_samples = _sorted_samples(orig_sorted, synth_sorted, numeric_cols)
+
+        # Numeric sütunların metrikleri tek 2D geçişte hesaplanır
+        numeric_metrics = dict(zip(
+            numeric_cols,
+            self._numeric_metrics(orig_sorted, synth_sorted)
+        )) if numeric_cols else {}
+
+        # Categorical sütunların Jensen-Shannon mesafeleri tek toplu çağrıda hesaplanır
+        categorical_cols = [col for col in common_columns if column_kinds[col] == "categorical"]
+        batch_metrics = {
+            **numeric_metrics,
+            **dict(zip(
+                categorical_cols,
+                self._categorical_metrics([
+                    self._categorical_counts(df_original[col], df_synthetic[col])
+                    for col in categorical_cols
+                ])
+            ))
+        }
+
         # Her sütun için benzerlik skoru
         column_scores = []
         for column in common_columns:
-            similarity = self._column_similarity(
-                df_original[column],
-                df_synthetic[column]
-            )
+            if column in batch_metrics:
+                similarity = {
+                    "column_type": str(df_original[column].dtype),
+                    "similarity_score": batch_metrics[column]["overall_score"],
+                    "metrics": batch_metrics[column]
+                }
+            else:
+                similarity = self._column_similarity(
+                    df_original[column],
+                    df_synthetic[column],
+                    column_kinds[column]
+                )
             report["column_similarities"][column] = similarity
             column_scores.append(similarity["similarity_score"])
 
@@ -73,21 +319,27 @@ class SimilarityReport:
         report["correlation_comparison"] = self._compare_correlations(
             df_original,
             df_synthetic,
-            common_columns
+            common_columns,
+            include_matrices,
+            column_kinds
         )
 
         # Dağılım karşılaştırması
         report["distribution_comparison"] = self._compare_distributions(
             df_original,
             df_synthetic,
-            common_columns
+            common_columns,
+            sorted_samples,
+            column_kinds
         )
 
         # İstatistiksel testler
         report["statistical_tests"] = self._run_statistical_tests(
             df_original,
             df_synthetic,
-            common_columns
+            common_columns,
+            column_kinds,
+            sorted_samples
         )
 
         # Genel değerlendirme
@@ -100,17 +352,21 @@ class SimilarityReport:
     def _column_similarity(
         self,
         series_orig: pd.Series,
-        series_synth: pd.Series
+        series_synth: pd.Series,
+        kind: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Tek bir sütun için benzerlik analizi"""
+        """Tek bir sütun için benzerlik analizi (kind: önceden belirlenmiş _column_kind)"""
         similarity_info = {
             "column_type": str(series_orig.dtype),
             "similarity_score": 0.0,
             "metrics": {}
         }
 
+        if kind is None:
+            kind = _column_kind(series_orig)
+
         # Numeric sütunlar
-        if pd.api.types.is_numeric_dtype(series_orig):
+        if kind == "numeric":
             similarity_info["metrics"] = self._numeric_similarity(
                 series_orig,
                 series_synth
@@ -118,7 +374,7 @@ class SimilarityReport:
             similarity_info["similarity_score"] = similarity_info["metrics"]["overall_score"]
 
         # Categorical sütunlar
-        elif pd.api.types.is_object_dtype(series_orig) or pd.api.types.is_categorical_dtype(series_orig):
+        elif kind == "categorical":
             similarity_info["metrics"] = self._categorical_similarity(
                 series_orig,
                 series_synth
@@ -133,32 +389,53 @@ class SimilarityReport:
         series_synth: pd.Series
     ) -> Dict[str, Any]:
         """Numeric sütunlar için benzerlik metrikleri"""
-        # Temel istatistikler
-        orig_mean = series_orig.mean()
-        synth_mean = series_synth.mean()
-        orig_std = series_orig.std()
-        synth_std = series_synth.std()
+        return self._numeric_metrics(
+            np.sort(series_orig.to_numpy(dtype=np.float64, na_value=np.nan)).reshape(-1, 1),
+            np.sort(series_synth.to_numpy(dtype=np.float64, na_value=np.nan)).reshape(-1, 1)
+        )[0]
+
+    def _numeric_metrics(
+        self,
+        orig_values: np.ndarray,
+        synth_values: np.ndarray
+    ) -> List[Dict[str, Any]]:
+        """
+        Numeric sütun matrisleri için benzerlik metrikleri
 
-        # Mean similarity (0-1 arası normalize edilmiş)
-        mean_diff = abs(orig_mean - synth_mean)
-        mean_range = max(abs(orig_mean), abs(synth_mean), 1)
-        mean_similarity = max(0, 1 - (mean_diff / mean_range))
+        İstatistikler tüm sütunlar için axis=0 indirgemeleriyle (_sorted_column_stats)
+        hesaplanır; sütun başına yalnızca Wasserstein mesafesi kalır.
+
+        Args:
+            orig_values: (satır, sütun) orijinal değerler, sütun bazında sıralı (NaN'lar sonda)
+            synth_values: (satır, sütun) sentetik değerler, sütun bazında sıralı (NaN'lar sonda)
+
+        Returns:
+            Sütun sırasıyla metrik sözlükleri
+        """
+        # Temel istatistikler: her matris için tek NaN maskesi, min/max sıralı uçlardan
+        orig_mean, orig_std, orig_min, orig_max = _sorted_column_stats(orig_values)
+        synth_mean, synth_std, synth_min, synth_max = _sorted_column_stats(synth_values)
+        max_value = np.fmax(orig_max, synth_max)
+        min_value = np.fmin(orig_min, synth_min)
+
+        # Mean similarity (0-1 arası normalize edilmiş); NaN skorlar 0 olur
+        mean_diff = np.abs(orig_mean - synth_mean)
+        mean_range = np.maximum(np.maximum(np.abs(orig_mean), np.abs(synth_mean)), 1)
+        mean_similarity = np.fmax(0, 1 - mean_diff / mean_range)
 
         # Std similarity
-        std_diff = abs(orig_std - synth_std)
-        std_range = max(abs(orig_std), abs(synth_std), 1)
-        std_similarity = max(0, 1 - (std_diff / std_range))
-
-        # Wasserstein distance (Earth Mover's Distance)
-        wasserstein_dist = wasserstein_distance(
-            series_orig.dropna().values,
-            series_synth.dropna().values
-        )
+        std_diff = np.abs(orig_std - synth_std)
+        std_range = np.maximum(np.maximum(np.abs(orig_std), np.abs(synth_std)), 1)
+        std_similarity = np.fmax(0, 1 - std_diff / std_range)
+
+        # Wasserstein distance (Earth Mover's Distance): sıralı dolu kısımlardan hesaplanır
+        samples = _sorted_samples(orig_values, synth_values, range(orig_values.shape[1]))
+        wasserstein_dist = np.array([
+            _wasserstein_sorted(*samples[j]) for j in range(orig_values.shape[1])
+        ])
         # Normalize to 0-1 (smaller is better, convert to similarity)
-        max_value = max(series_orig.max(), series_synth.max())
-        min_value = min(series_orig.min(), series_synth.min())
-        value_range = max_value - min_value if max_value != min_value else 1
-        wasserstein_similarity = max(0, 1 - (wasserstein_dist / value_range))
+        value_range = np.where(max_value != min_value, max_value - min_value, 1)
+        wasserstein_similarity = np.fmax(0, 1 - wasserstein_dist / value_range)
 
         # Overall score (weighted average)
         overall_score = (
@@ -167,17 +444,18 @@ class SimilarityReport:
             wasserstein_similarity * 0.4
         )
 
-        return {
-            "mean_original": float(orig_mean),
-            "mean_synthetic": float(synth_mean),
-            "mean_similarity": float(mean_similarity),
-            "std_original": float(orig_std),
-            "std_synthetic": float(synth_std),
-            "std_similarity": float(std_similarity),
-            "wasserstein_distance": float(wasserstein_dist),
-            "wasserstein_similarity": float(wasserstein_similarity),
-            "overall_score": float(overall_score)
-        }
+        # Metrik dizileri tek tolist() ile Python float'larına çevrilir (msgpack/JSON uyumlu)
+        return _metric_records({
+            "mean_original": orig_mean,
+            "mean_synthetic": synth_mean,
+            "mean_similarity": mean_similarity,
+            "std_original": orig_std,
+            "std_synthetic": synth_std,
+            "std_similarity": std_similarity,
+            "wasserstein_distance": wasserstein_dist,
+            "wasserstein_similarity": wasserstein_similarity,
+            "overall_score": overall_score
+        })
 
     def _categorical_similarity(
         self,
@@ -185,50 +463,123 @@ class SimilarityReport:
         series_synth: pd.Series
     ) -> Dict[str, Any]:
         """Categorical sütunlar için benzerlik metrikleri"""
-        # Value counts
-        orig_counts = series_orig.value_counts(normalize=True)
-        synth_counts = series_synth.value_counts(normalize=True)
+        return self._categorical_metrics([
+            self._categorical_counts(series_orig, series_synth)
+        ])[0]
+
+    def _categorical_counts(
+        self,
+        series_orig: pd.Series,
+        series_synth: pd.Series
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Orijinal ve sentetik serinin ortak kategori sırasıyla hizalı frekansları
+
+        Args:
+            series_orig: Orijinal sütun
+            series_synth: Sentetik sütun
 
-        # Ortak kategoriler
-        all_categories = set(orig_counts.index) | set(synth_counts.index)
+        Returns:
+            (orijinal sayılar, sentetik sayılar); eksik değerler sayılmaz
+        """
+        # Birleşik seri tek factorize ile ortak kategori kodlarına çevrilir (NaN -> -1)
+        codes, uniques = pd.factorize(pd.concat([series_orig, series_synth], ignore_index=True))
+        num_categories = len(uniques)
+        split = len(series_orig)
+        orig_codes = codes[:split]
+        synth_codes = codes[split:]
+        return (
+            np.bincount(orig_codes[orig_codes >= 0], minlength=num_categories),
+            np.bincount(synth_codes[synth_codes >= 0], minlength=num_categories)
+        )
+
+    def _categorical_metrics(
+        self,
+        counts: List[Tuple[np.ndarray, np.ndarray]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Categorical sütunlar için benzerlik metrikleri
 
-        # Distribution vectors oluştur
-        orig_dist = np.array([orig_counts.get(cat, 0) for cat in all_categories])
-        synth_dist = np.array([synth_counts.get(cat, 0) for cat in all_categories])
+        Frekans vektörleri en uzun kategori sayısına sıfırla doldurulup (kategori, sütun)
+        matrislerine dizilir; Jensen-Shannon tüm sütunlar için tek çağrıda hesaplanır.
 
-        # Jensen-Shannon divergence (0-1 arası, 0=identical)
-        js_divergence = jensenshannon(orig_dist, synth_dist)
-        js_similarity = max(0, 1 - js_divergence)
+        Args:
+            counts: Sütun başına _categorical_counts çıktısı
+
+        Returns:
+            Sütun sırasıyla metrik sözlükleri
+        """
+        if not counts:
+            return []
+
+        max_categories = max(len(orig_counts) for orig_counts, _ in counts)
+        orig_matrix = np.zeros((max_categories, len(counts)), dtype=np.float64)
+        synth_matrix = np.zeros((max_categories, len(counts)), dtype=np.float64)
+        for j, (orig_counts, synth_counts) in enumerate(counts):
+            orig_matrix[:len(orig_counts), j] = orig_counts
+            synth_matrix[:len(synth_counts), j] = synth_counts
+
+        # Distribution vectors oluştur (hizalı kategori sırasıyla)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            orig_dist = orig_matrix / orig_matrix.sum(axis=0)
+            synth_dist = synth_matrix / synth_matrix.sum(axis=0)
+
+            # Jensen-Shannon divergence (0-1 arası, 0=identical)
+            js_divergences = np.atleast_1d(jensenshannon(orig_dist, synth_dist, axis=0))
 
         # Category coverage (kaç kategori korunmuş)
-        orig_categories = set(orig_counts.index)
-        synth_categories = set(synth_counts.index)
-        category_overlap = len(orig_categories & synth_categories) / len(orig_categories) if len(orig_categories) > 0 else 0
+        orig_present = orig_matrix > 0
+        synth_present = synth_matrix > 0
+        orig_category_counts = orig_present.sum(axis=0)
+        synth_category_counts = synth_present.sum(axis=0)
+        shared_category_counts = (orig_present & synth_present).sum(axis=0)
+
+        js_similarity = np.fmax(0, 1 - js_divergences)
+        category_overlap = np.divide(
+            shared_category_counts,
+            orig_category_counts,
+            out=np.zeros(len(counts)),
+            where=orig_category_counts > 0
+        )
 
         # Overall score
         overall_score = (js_similarity * 0.6 + category_overlap * 0.4)
 
-        return {
-            "original_categories": len(orig_categories),
-            "synthetic_categories": len(synth_categories),
-            "category_overlap": float(category_overlap),
-            "js_divergence": float(js_divergence),
-            "js_similarity": float(js_similarity),
-            "overall_score": float(overall_score)
-        }
+        return _metric_records({
+            "original_categories": orig_category_counts,
+            "synthetic_categories": synth_category_counts,
+            "category_overlap": category_overlap,
+            "js_divergence": js_divergences,
+            "js_similarity": js_similarity,
+            "overall_score": overall_score
+        })
 
     def _compare_correlations(
         self,
         df_original: pd.DataFrame,
         df_synthetic: pd.DataFrame,
-        common_columns: List[str]
+        common_columns: List[str],
+        include_matrices: bool = False,
+        column_kinds: Optional[Dict[str, str]] = None
     ) -> Dict[str, Any]:
-        """Korelasyon matrislerini karşılaştır"""
+        """
+        Korelasyon matrislerini karşılaştır
+
+        Args:
+            df_original: Orijinal DataFrame
+            df_synthetic: Sentetik DataFrame
+            common_columns: Ortak sütunlar
+            include_matrices: Matrisleri de döndür; CORRELATION_MATRIX_DICT_LIMIT'ten fazla
+                sütunda iç içe sözlük yerine {"columns", "values"} biçiminde
+            column_kinds: Sütun türleri (None ise burada belirlenir)
+
+        Returns:
+            Korelasyon benzerliği, RMSE ve (istenirse) matrisler
+        """
         # Sadece numeric sütunlar
-        numeric_cols = [
-            col for col in common_columns
-            if pd.api.types.is_numeric_dtype(df_original[col])
-        ]
+        if column_kinds is None:
+            column_kinds = _column_kinds(df_original, common_columns)
+        numeric_cols = [col for col in common_columns if column_kinds[col] == "numeric"]
 
         if len(numeric_cols) < 2:
             return {
@@ -240,10 +591,14 @@ class SimilarityReport:
         corr_orig = df_original[numeric_cols].corr()
         corr_synth = df_synthetic[numeric_cols].corr()
 
-        # Flatten ve karşılaştır (üst üçgen, diagonal hariç)
-        mask = np.triu(np.ones_like(corr_orig, dtype=bool), k=1)
-        orig_values = corr_orig.where(mask).stack().values
-        synth_values = corr_synth.where(mask).stack().values
+        # Flatten ve karşılaştır (üst üçgen, diagonal hariç); iki matriste de tanımlı
+        # (NaN olmayan) çiftler hizalı tutulur
+        rows, cols = np.triu_indices(len(numeric_cols), k=1)
+        orig_values = corr_orig.to_numpy()[rows, cols]
+        synth_values = corr_synth.to_numpy()[rows, cols]
+        defined = ~(np.isnan(orig_values) | np.isnan(synth_values))
+        orig_values = orig_values[defined]
+        synth_values = synth_values[defined]
 
         # Correlation of correlations
         correlation_similarity = np.corrcoef(orig_values, synth_values)[0, 1]
@@ -252,43 +607,75 @@ class SimilarityReport:
         # RMSE
         rmse = np.sqrt(np.mean((orig_values - synth_values) ** 2))
 
-        return {
+        comparison = {
             "correlation_similarity": float(correlation_similarity),
             "rmse": float(rmse),
-            "numeric_columns": numeric_cols,
-            "correlation_matrix_original": corr_orig.to_dict(),
-            "correlation_matrix_synthetic": corr_synth.to_dict()
+            "numeric_columns": numeric_cols
         }
 
+        # Matrisler O(N²) Python nesnesi üretir; yalnızca istenirse serileştirilir
+        if include_matrices:
+            for key, corr in (("correlation_matrix_original", corr_orig),
+                              ("correlation_matrix_synthetic", corr_synth)):
+                if len(numeric_cols) > CORRELATION_MATRIX_DICT_LIMIT:
+                    comparison[key] = {"columns": numeric_cols, "values": corr.to_numpy().tolist()}
+                else:
+                    comparison[key] = corr.to_dict()
+
+        return comparison
+
     def _compare_distributions(
         self,
         df_original: pd.DataFrame,
         df_synthetic: pd.DataFrame,
-        common_columns: List[str]
+        common_columns: List[str],
+        sorted_samples: Optional[Dict[str, Tuple[np.ndarray, np.ndarray]]] = None,
+        column_kinds: Optional[Dict[str, str]] = None
     ) -> Dict[str, Any]:
-        """Dağılımları karşılaştır"""
+        """
+        Dağılımları karşılaştır
+
+        Args:
+            df_original: Orijinal DataFrame
+            df_synthetic: Sentetik DataFrame
+            common_columns: Ortak sütunlar
+            sorted_samples: Numeric sütunların sıralı örnekleri (None ise burada sıralanır)
+            column_kinds: Sütun türleri (None ise burada belirlenir)
+
+        Returns:
+            Numeric sütun başına ortak bin'li yoğunluk histogramları
+        """
+        if sorted_samples is None:
+            if column_kinds is None:
+                column_kinds = _column_kinds(df_original, common_columns)
+            numeric_cols = [col for col in common_columns if column_kinds[col] == "numeric"]
+            sorted_samples = _sorted_samples(
+                np.sort(df_original[numeric_cols].to_numpy(dtype=np.float64, na_value=np.nan), axis=0),
+                np.sort(df_synthetic[numeric_cols].to_numpy(dtype=np.float64, na_value=np.nan), axis=0),
+                numeric_cols
+            )
+
         distribution_info = {}
 
         for column in common_columns:
-            if pd.api.types.is_numeric_dtype(df_original[column]):
-                # Histogram data
-                orig_values = df_original[column].dropna()
-                synth_values = df_synthetic[column].dropna()
-
-                # Bins oluştur (ortak)
-                min_val = min(orig_values.min(), synth_values.min())
-                max_val = max(orig_values.max(), synth_values.max())
-                bins = np.linspace(min_val, max_val, 30)
-
-                orig_hist, _ = np.histogram(orig_values, bins=bins, density=True)
-                synth_hist, _ = np.histogram(synth_values, bins=bins, density=True)
-
-                distribution_info[column] = {
-                    "type": "numeric",
-                    "bins": bins.tolist(),
-                    "original_histogram": orig_hist.tolist(),
-                    "synthetic_histogram": synth_hist.tolist()
-                }
+            if column not in sorted_samples:
+                continue
+
+            orig_values, synth_values = sorted_samples[column]
+            if len(orig_values) == 0 and len(synth_values) == 0:
+                continue
+
+            # Bins oluştur (ortak); sıralı dizide min/max uç elemanlardır
+            ends = np.concatenate((orig_values[[0, -1]] if len(orig_values) else [],
+                                   synth_values[[0, -1]] if len(synth_values) else []))
+            bins = np.linspace(ends.min(), ends.max(), 30)
+
+            distribution_info[column] = {
+                "type": "numeric",
+                "bins": bins.tolist(),
+                "original_histogram": _histogram_sorted(orig_values, bins, density=True).tolist(),
+                "synthetic_histogram": _histogram_sorted(synth_values, bins, density=True).tolist()
+            }
 
         return distribution_info
 
@@ -296,62 +683,81 @@ class SimilarityReport:
         self,
         df_original: pd.DataFrame,
         df_synthetic: pd.DataFrame,
-        common_columns: List[str]
+        common_columns: List[str],
+        column_kinds: Optional[Dict[str, str]] = None,
+        sorted_samples: Optional[Dict[str, Tuple[np.ndarray, np.ndarray]]] = None
     ) -> Dict[str, Any]:
-        """İstatistiksel testler çalıştır"""
-        tests = {}
+        """
+        İstatistiksel testler çalıştır
 
-        for column in common_columns:
-            if pd.api.types.is_numeric_dtype(df_original[column]):
-                # Kolmogorov-Smirnov test
-                ks_statistic, ks_pvalue = ks_2samp(
-                    df_original[column].dropna(),
-                    df_synthetic[column].dropna()
-                )
+        Küçük örneklerde ks_2samp'ın kesin p-değeri kullanılır; KS_EXACT_MAX_N'den büyük
+        örneklerde istatistik sıralı örneklerden hesaplanır ve p-değerleri tek bir
+        kstwo.sf çağrısıyla bulunur (ks_2samp'ın asimptotik yolu ile aynı).
 
-                # p-value > 0.05 ise dağılımlar benzer
-                tests[column] = {
-                    "test": "Kolmogorov-Smirnov",
-                    "statistic": float(ks_statistic),
-                    "p_value": float(ks_pvalue),
-                    "distributions_similar": bool(ks_pvalue > 0.05),
-                    "interpretation": "Dağılımlar benzer" if ks_pvalue > 0.05 else "Dağılımlar farklı"
-                }
+        Args:
+            df_original: Orijinal veri
+            df_synthetic: Sentetik veri
+            common_columns: Ortak sütunlar
+            column_kinds: Sütun türleri (None ise burada belirlenir)
+            sorted_samples: Numeric sütunların sıralı örnekleri (None ise burada sıralanır)
+
+        Returns:
+            Sütun bazında test sonuçları
+        """
+        if column_kinds is None:
+            column_kinds = _column_kinds(df_original, common_columns)
+        numeric_cols = [col for col in common_columns if column_kinds[col] == "numeric"]
+
+        if sorted_samples is None:
+            orig_sorted = np.sort(
+                df_original[numeric_cols].to_numpy(dtype=np.float64, na_value=np.nan), axis=0
+            )
+            synth_sorted = np.sort(
+                df_synthetic[numeric_cols].to_numpy(dtype=np.float64, na_value=np.nan), axis=0
+            )
+            sorted_samples = _sorted_samples(orig_sorted, synth_sorted, numeric_cols)
+
+        # Kolmogorov-Smirnov test
+        results = {}
+        asymp_cols, asymp_stats, asymp_sizes = [], [], []
+        for column in numeric_cols:
+            orig_values, synth_values = sorted_samples[column]
+            n_orig, n_synth = len(orig_values), len(synth_values)
+            if min(n_orig, n_synth) == 0 or max(n_orig, n_synth) <= KS_EXACT_MAX_N:
+                ks_statistic, ks_pvalue = ks_2samp(orig_values, synth_values)
+                results[column] = (float(ks_statistic), float(ks_pvalue))
+            else:
+                asymp_cols.append(column)
+                asymp_stats.append(_ks_statistic_sorted(orig_values, synth_values))
+                asymp_sizes.append(np.round(n_orig * n_synth / (n_orig + n_synth)))
+
+        if asymp_cols:
+            pvalues = np.clip(kstwo.sf(asymp_stats, asymp_sizes), 0, 1)
+            for column, ks_statistic, ks_pvalue in zip(asymp_cols, asymp_stats, pvalues):
+                results[column] = (ks_statistic, float(ks_pvalue))
+
+        tests = {}
+        for column in numeric_cols:
+            ks_statistic, ks_pvalue = results[column]
+
+            # p-value > 0.05 ise dağılımlar benzer
+            tests[column] = {
+                "test": "Kolmogorov-Smirnov",
+                "statistic": ks_statistic,
+                "p_value": ks_pvalue,
+                "distributions_similar": bool(ks_pvalue > 0.05),
+                "interpretation": "Dağılımlar benzer" if ks_pvalue > 0.05 else "Dağılımlar farklı"
+            }
 
         return tests
 
     def _get_quality_assessment(self, overall_similarity: float) -> Dict[str, str]:
         """Similarity score'a göre kalite değerlendirmesi"""
-        if overall_similarity >= 0.9:
-            return {
-                "grade": "Mükemmel",
-                "emoji": "🟢",
-                "description": "Sentetik veri orijinale çok benzer, güvenle kullanılabilir"
-            }
-        elif overall_similarity >= 0.75:
-            return {
-                "grade": "İyi",
-                "emoji": "🔵",
-                "description": "Sentetik veri yeterli kalitede, çoğu kullanım için uygun"
-            }
-        elif overall_similarity >= 0.6:
-            return {
-                "grade": "Orta",
-                "emoji": "🟡",
-                "description": "Sentetik veri kabul edilebilir, bazı iyileştirmeler yapılabilir"
-            }
-        elif overall_similarity >= 0.4:
-            return {
-                "grade": "Zayıf",
-                "emoji": "🟠",
-                "description": "Sentetik veri düşük kalitede, yeniden üretim önerilir"
-            }
-        else:
-            return {
-                "grade": "Yetersiz",
-                "emoji": "🔴",
-                "description": "Sentetik veri orijinalden çok farklı, kullanılmamalı"
-            }
+        # NaN skor hiçbir eşiği geçmez (en düşük not)
+        grade = 0 if np.isnan(overall_similarity) else int(
+            np.searchsorted(QUALITY_GRADE_THRESHOLDS, overall_similarity, side="right")
+        )
+        return dict(QUALITY_GRADES[grade])
 
     def generate_column_comparison(
         self,
@@ -363,26 +769,35 @@ class SimilarityReport:
         if column not in df_original.columns or column not in df_synthetic.columns:
             return {"error": f"Sütun bulunamadı: {column}"}
 
+        kind = _column_kind(df_original[column])
         comparison = {
             "column": column,
-            "type": str(df_original[column].dtype),
-            "similarity": self._column_similarity(
-                df_original[column],
-                df_synthetic[column]
-            )
+            "type": str(df_original[column].dtype)
         }
 
         # Numeric için histogram data
-        if pd.api.types.is_numeric_dtype(df_original[column]):
-            orig_values = df_original[column].dropna()
-            synth_values = df_synthetic[column].dropna()
+        if kind == "numeric":
+            # Sütun bir kez sıralanır; metrikler ve histogram aynı NaN'sız görünümleri kullanır
+            orig_sorted = np.sort(
+                df_original[column].to_numpy(dtype=np.float64, na_value=np.nan)
+            ).reshape(-1, 1)
+            synth_sorted = np.sort(
+                df_synthetic[column].to_numpy(dtype=np.float64, na_value=np.nan)
+            ).reshape(-1, 1)
+            metrics = self._numeric_metrics(orig_sorted, synth_sorted)[0]
+            comparison["similarity"] = {
+                "column_type": comparison["type"],
+                "similarity_score": metrics["overall_score"],
+                "metrics": metrics
+            }
+            orig_values, synth_values = _sorted_samples(orig_sorted, synth_sorted, [column])[column]
 
-            min_val = min(orig_values.min(), synth_values.min())
-            max_val = max(orig_values.max(), synth_values.max())
+            min_val = min(orig_values[0], synth_values[0])
+            max_val = max(orig_values[-1], synth_values[-1])
             bins = np.linspace(min_val, max_val, 30)
 
-            orig_hist, _ = np.histogram(orig_values, bins=bins)
-            synth_hist, _ = np.histogram(synth_values, bins=bins)
+            orig_hist = _histogram_sorted(orig_values, bins)
+            synth_hist = _histogram_sorted(synth_values, bins)
 
             comparison["histogram"] = {
                 "bins": bins.tolist(),
@@ -390,8 +805,16 @@ class SimilarityReport:
                 "synthetic": synth_hist.tolist()
             }
 
+            return comparison
+
+        comparison["similarity"] = self._column_similarity(
+            df_original[column],
+            df_synthetic[column],
+            kind
+        )
+
         # Categorical için value counts
-        elif pd.api.types.is_object_dtype(df_original[column]):
+        if pd.api.types.is_object_dtype(df_original[column]):
             orig_counts = df_original[column].value_counts().head(10)
             synth_counts = df_synthetic[column].value_counts().head(10)
 
@@ -5,17 +5,61 @@ Faz 4.1: Data Processing Asenkron İşlemleri
 
 from celery import Task
 from app.celery_config import celery_app
+from app.api.dependencies import upload_real_path
 from app.services.data_profiler import DataProfiler
 from app.services.data_cleaner import DataCleaner
 from app.services.pii_detector import PIIDetector
 from app.services.differential_privacy import DifferentialPrivacy
-import pandas as pd
+from app.services.similarity_report import SimilarityReport
+from app.services.utility_score import UtilityScore
+from app.services.data_io import (
+    load_csv, load_table, write_csv, write_parquet, downcast_floats, write_sidecar,
+    read_cached_report, write_cached_report
+)
+import orjson
 import os
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Callable, Tuple, TypeVar
 
 UPLOAD_DIR = "uploads"
 OUTPUT_DIR = os.path.join(UPLOAD_DIR, "outputs")
+DP_DIR = os.path.join(UPLOAD_DIR, "differential_privacy")
+ANONYMIZED_DIR = os.path.join(UPLOAD_DIR, "anonymized")
+
+T = TypeVar("T")
+
+
+def _to_builtin(report: Any) -> Any:
+    """Servis raporlarındaki numpy tiplerini msgpack'in serileştirebileceği tiplere çevir"""
+    return orjson.loads(
+        orjson.dumps(report, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    )
+
+
+def _open_upload(filename: str, loader: Callable[[str], T]) -> Tuple[str, T]:
+    """
+    Yüklenen dosyayı oku; varlık kontrolü yükleyicinin kendi stat/open çağrısıyla yapılır
+
+    Dosya adı API'deki gibi yükleme dizini dışına çıkamaz (path traversal). Ayrı bir
+    os.path.exists çağrısı yapılmaz (fazladan syscall ve kontrol ile okuma arasında
+    dosyanın silinmesi yarışı olmaz).
+
+    Args:
+        filename: uploads altındaki dosya adı
+        loader: Dosya yolunu alan yükleyici (load_csv, DataProfiler, DataCleaner, ...)
+
+    Returns:
+        (dosya yolu, yükleyicinin sonucu)
+
+    Raises:
+        ValueError: Dosya adı yükleme dizini dışını gösteriyorsa
+        FileNotFoundError: Dosya yoksa
+    """
+    file_path = upload_real_path(filename)
+    try:
+        return file_path, loader(file_path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Dosya bulunamadı: {filename}") from None
 
 
 class ProcessingTask(Task):
@@ -58,11 +102,8 @@ def profile_data_async(
         )
 
         # Load data
-        file_path = os.path.join(UPLOAD_DIR, filename)
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"Dosya bulunamadı: {filename}")
-
-        df = pd.read_csv(file_path)
+        # DataProfiler dosyayı pyarrow ile okur (CSV veya Parquet)
+        _, profiler = _open_upload(filename, DataProfiler)
 
         self.update_state(
             state='PROGRESS',
@@ -70,14 +111,13 @@ def profile_data_async(
         )
 
         # Profile data
-        profiler = DataProfiler(df)
         profile = profiler.get_full_profile()
 
         return {
             "status": "completed",
             "task_id": self.request.id,
             "filename": filename,
-            "profile": profile
+            "profile": _to_builtin(profile)
         }
 
     except Exception as e:
@@ -99,7 +139,8 @@ def clean_data_async(
     filename: str,
     handle_missing: str = "drop",
     remove_duplicates: bool = True,
-    handle_outliers: bool = False
+    handle_outliers: bool = False,
+    output_format: str = "csv"
 ) -> Dict[str, Any]:
     """
     Asenkron veri temizleme
@@ -109,6 +150,7 @@ def clean_data_async(
         handle_missing: Missing value stratejisi
         remove_duplicates: Duplicate'leri kaldır
         handle_outliers: Outlier'ları işle
+        output_format: Çıktı formatı (csv/parquet)
 
     Returns:
         Cleaning result dictionary
@@ -121,12 +163,9 @@ def clean_data_async(
         )
 
         # Load data
-        file_path = os.path.join(UPLOAD_DIR, filename)
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"Dosya bulunamadı: {filename}")
-
-        df = pd.read_csv(file_path)
-        original_shape = df.shape
+        # DataCleaner dosyayı pyarrow ile okur (load_df)
+        _, cleaner = _open_upload(filename, DataCleaner)
+        original_shape = cleaner.original_shape
 
         self.update_state(
             state='PROGRESS',
@@ -134,21 +173,22 @@ def clean_data_async(
         )
 
         # Clean data
-        cleaner = DataCleaner(df)
-        cleaned_df = cleaner.clean_data(
-            handle_missing=handle_missing,
-            remove_duplicates=remove_duplicates,
-            handle_outliers=handle_outliers
-        )
-        report = cleaner.get_cleaning_report()
+        if remove_duplicates:
+            cleaner.df = cleaner.df.drop_duplicates(ignore_index=True)
+        if handle_missing:
+            cleaner.handle_missing_values(strategy=handle_missing)
+        if handle_outliers:
+            cleaner.remove_outliers()
+        cleaned_df = cleaner.df
+        report = cleaner.get_cleaning_summary()
 
         # Save cleaned data
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_filename = f"cleaned_{filename.rsplit('.', 1)[0]}_{timestamp}.csv"
+        output_filename = f"cleaned_{filename.rsplit('.', 1)[0]}_{timestamp}.{output_format}"
         output_path = os.path.join(OUTPUT_DIR, output_filename)
 
         os.makedirs(OUTPUT_DIR, exist_ok=True)
-        cleaned_df.to_csv(output_path, index=False)
+        cleaner.save_cleaned_data(output_path, format=output_format)
 
         return {
             "status": "completed",
@@ -158,7 +198,7 @@ def clean_data_async(
             "output_path": f"outputs/{output_filename}",
             "original_shape": original_shape,
             "cleaned_shape": cleaned_df.shape,
-            "report": report
+            "report": _to_builtin(report)
         }
 
     except Exception as e:
@@ -200,11 +240,7 @@ def detect_pii_async(
         )
 
         # Load data
-        file_path = os.path.join(UPLOAD_DIR, filename)
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"Dosya bulunamadı: {filename}")
-
-        df = pd.read_csv(file_path)
+        file_path, df = _open_upload(filename, load_csv)
 
         self.update_state(
             state='PROGRESS',
@@ -215,11 +251,15 @@ def detect_pii_async(
         detector = PIIDetector()
         results = detector.detect_pii_in_dataframe(df, columns)
 
+        # Tüm sütunların raporu anonimleştirmede yeniden tespit yapılmasın diye cache'lenir
+        if columns is None:
+            write_cached_report(file_path, "pii", results)
+
         return {
             "status": "completed",
             "task_id": self.request.id,
             "filename": filename,
-            "pii_results": results
+            "pii_results": _to_builtin(results)
         }
 
     except Exception as e:
@@ -240,15 +280,21 @@ def anonymize_data_async(
     self,
     filename: str,
     columns: Optional[List[str]] = None,
-    consistent: bool = True
+    consistent: bool = True,
+    locale: str = "tr_TR",
+    output_format: str = "csv",
+    return_file: bool = True
 ) -> Dict[str, Any]:
     """
-    Asenkron data anonymization
+    Asenkron data anonymization (/anonymize ile aynı çıktı)
 
     Args:
         filename: CSV dosya adı
         columns: Anonymize edilecek kolonlar
         consistent: Tutarlı anonymization
+        locale: Faker locale
+        output_format: Çıktı formatı (csv/parquet)
+        return_file: Anonimleştirilmiş dosya yazılsın mı (False: yalnızca rapor)
 
     Returns:
         Anonymization result dictionary
@@ -261,11 +307,7 @@ def anonymize_data_async(
         )
 
         # Load data
-        file_path = os.path.join(UPLOAD_DIR, filename)
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"Dosya bulunamadı: {filename}")
-
-        df = pd.read_csv(file_path)
+        file_path, df = _open_upload(filename, load_csv)
 
         self.update_state(
             state='PROGRESS',
@@ -273,26 +315,50 @@ def anonymize_data_async(
         )
 
         # Anonymize data
-        detector = PIIDetector()
-        anonymized_df, stats = detector.anonymize_dataframe(df, columns, consistent)
-
-        # Save anonymized data
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_filename = f"anonymized_{filename.rsplit('.', 1)[0]}_{timestamp}.csv"
-        output_path = os.path.join(OUTPUT_DIR, output_filename)
-
-        os.makedirs(OUTPUT_DIR, exist_ok=True)
-        anonymized_df.to_csv(output_path, index=False)
+        # Aynı dosya için daha önce tespit yapıldıysa rapor cache'ten gelir (None ise hesaplanır)
+        detector = PIIDetector(locale=locale)
+        anonymized_df, report = detector.anonymize_dataframe(
+            df,
+            columns=columns,
+            consistent=consistent,
+            pii_report=read_cached_report(file_path, "pii")
+        )
 
-        return {
+        result = {
             "status": "completed",
             "task_id": self.request.id,
-            "original_filename": filename,
-            "output_filename": output_filename,
-            "output_path": f"outputs/{output_filename}",
-            "anonymization_stats": stats
+            "original_file": filename,
+            "anonymization_report": _to_builtin(report),
+            "data_info": {
+                "total_rows": len(anonymized_df),
+                "total_columns": len(anonymized_df.columns),
+                "columns": anonymized_df.columns.tolist()
+            }
         }
 
+        # Yalnızca rapor istendiyse dosya serileştirilip yazılmaz
+        if not return_file:
+            return result
+
+        # Save anonymized data
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        base_filename = os.path.splitext(filename)[0]
+        anonymized_filename = f"{base_filename}_anonymized_{timestamp}.{output_format}"
+        anonymized_path = os.path.join(ANONYMIZED_DIR, anonymized_filename)
+
+        os.makedirs(ANONYMIZED_DIR, exist_ok=True)
+        if output_format == "parquet":
+            file_size = write_parquet(anonymized_df, anonymized_path)
+        else:
+            file_size = write_csv(anonymized_df, anonymized_path)
+
+        result.update({
+            "anonymized_file": anonymized_filename,
+            "anonymized_path": f"anonymized/{anonymized_filename}",
+            "file_size_mb": round(file_size / (1024 * 1024), 2)
+        })
+        return result
+
     except Exception as e:
         self.update_state(
             state='FAILURE',
@@ -311,17 +377,23 @@ def apply_dp_async(
     self,
     filename: str,
     epsilon: float = 1.0,
+    delta: float = 1e-5,
     mechanism: str = "laplace",
-    columns: Optional[List[str]] = None
+    columns: Optional[List[str]] = None,
+    bounds: Optional[Dict[str, List[float]]] = None,
+    output_format: str = "csv"
 ) -> Dict[str, Any]:
     """
-    Asenkron differential privacy application
+    Asenkron differential privacy application (/apply-dp ile aynı çıktı)
 
     Args:
         filename: CSV dosya adı
         epsilon: Privacy budget
+        delta: Failure probability
         mechanism: Noise mechanism (laplace/gaussian)
         columns: İşlenecek kolonlar
+        bounds: Sütun bounds ({sütun: [alt, üst]})
+        output_format: Çıktı formatı (csv/parquet)
 
     Returns:
         DP application result dictionary
@@ -334,38 +406,181 @@ def apply_dp_async(
         )
 
         # Load data
-        file_path = os.path.join(UPLOAD_DIR, filename)
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"Dosya bulunamadı: {filename}")
-
-        df = pd.read_csv(file_path)
+        file_path, df = _open_upload(filename, load_csv)
 
         self.update_state(
             state='PROGRESS',
             meta={'status': 'Differential privacy uygulanıyor...'}
         )
 
-        # Apply DP
-        dp = DifferentialPrivacy(epsilon)
-        dp_df, stats = dp.apply_noise_to_dataframe(df, mechanism, columns)
+        # Apply DP (msgpack tuple'ları liste olarak taşır)
+        dp = DifferentialPrivacy(epsilon=epsilon, delta=delta)
+        dp_df, dp_report = dp.apply_noise_to_dataframe(
+            df,
+            mechanism=mechanism,
+            columns=columns,
+            bounds={col: tuple(b) for col, b in bounds.items()} if bounds else None
+        )
 
         # Save DP data
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_filename = f"dp_{filename.rsplit('.', 1)[0]}_{timestamp}.csv"
-        output_path = os.path.join(OUTPUT_DIR, output_filename)
+        base_filename = os.path.splitext(filename)[0]
+        dp_filename = f"{base_filename}_dp_eps{epsilon}_{timestamp}.{output_format}"
+        dp_path = os.path.join(DP_DIR, dp_filename)
+
+        # Gürültülü sütunlarda float64 hassasiyeti anlamsız
+        downcast_floats(dp_df, dp_report["columns_processed"])
+
+        os.makedirs(DP_DIR, exist_ok=True)
+        if output_format == "parquet":
+            file_size = write_parquet(dp_df, dp_path)
+        else:
+            file_size = write_csv(dp_df, dp_path)
+
+        # DP parametrelerini dosyanın yanına kaydet
+        write_sidecar(dp_path, {
+            "original_file": filename,
+            "epsilon": epsilon,
+            "delta": delta,
+            "mechanism": mechanism,
+            "columns": dp_report["columns_processed"],
+            "format": output_format,
+            "created_at": datetime.now().isoformat()
+        })
 
-        os.makedirs(OUTPUT_DIR, exist_ok=True)
-        dp_df.to_csv(output_path, index=False)
+        return {
+            "status": "completed",
+            "task_id": self.request.id,
+            "original_file": filename,
+            "dp_file": dp_filename,
+            "dp_path": f"differential_privacy/{dp_filename}",
+            "file_size_mb": round(file_size / (1024 * 1024), 2),
+            "dp_report": _to_builtin(dp_report),
+            "data_info": {
+                "total_rows": len(dp_df),
+                "total_columns": len(dp_df.columns),
+                "columns": dp_df.columns.tolist()
+            }
+        }
+
+    except Exception as e:
+        self.update_state(
+            state='FAILURE',
+            meta={'status': f'Hata: {str(e)}'}
+        )
+        raise
+
+
+@celery_app.task(
+    bind=True,
+    base=ProcessingTask,
+    name='app.tasks.processing_tasks.similarity_report_async',
+    track_started=True
+)
+def similarity_report_async(
+    self,
+    orig_path: str,
+    synth_path: str,
+    include_matrices: bool = False
+) -> Dict[str, Any]:
+    """
+    Asenkron similarity raporu
+
+    Args:
+        orig_path: Orijinal CSV dosya yolu
+        synth_path: Sentetik CSV dosya yolu
+        include_matrices: Korelasyon matrislerini rapora ekle
+
+    Returns:
+        Similarity report dictionary
+    """
+    try:
+        self.update_state(
+            state='PROGRESS',
+            meta={'status': 'Veri yükleniyor...'}
+        )
+
+        df_original = load_table(orig_path)
+        df_synthetic = load_table(synth_path)
+
+        self.update_state(
+            state='PROGRESS',
+            meta={'status': 'Similarity raporu oluşturuluyor...'}
+        )
+
+        report = SimilarityReport().generate_full_report(
+            df_original, df_synthetic, include_matrices=include_matrices
+        )
 
         return {
             "status": "completed",
             "task_id": self.request.id,
-            "original_filename": filename,
-            "output_filename": output_filename,
-            "output_path": f"outputs/{output_filename}",
-            "epsilon": epsilon,
-            "mechanism": mechanism,
-            "dp_stats": stats
+            "original_file": os.path.basename(orig_path),
+            "synthetic_file": os.path.basename(synth_path),
+            "report": _to_builtin(report)
+        }
+
+    except Exception as e:
+        self.update_state(
+            state='FAILURE',
+            meta={'status': f'Hata: {str(e)}'}
+        )
+        raise
+
+
+@celery_app.task(
+    bind=True,
+    base=ProcessingTask,
+    name='app.tasks.processing_tasks.utility_score_async',
+    track_started=True
+)
+def utility_score_async(
+    self,
+    orig_path: str,
+    synth_path: str,
+    target_column: str,
+    task_type: str = "auto"
+) -> Dict[str, Any]:
+    """
+    Asenkron utility score hesaplama
+
+    Args:
+        orig_path: Orijinal CSV dosya yolu
+        synth_path: Sentetik CSV dosya yolu
+        target_column: Hedef sütun
+        task_type: auto/classification/regression
+
+    Returns:
+        Utility assessment dictionary
+    """
+    try:
+        self.update_state(
+            state='PROGRESS',
+            meta={'status': 'Veri yükleniyor...'}
+        )
+
+        df_original = load_table(orig_path)
+        df_synthetic = load_table(synth_path)
+
+        self.update_state(
+            state='PROGRESS',
+            meta={'status': 'Modeller eğitiliyor...'}
+        )
+
+        report = UtilityScore().assess_utility(
+            df_original,
+            df_synthetic,
+            target_column=target_column,
+            task_type=task_type
+        )
+
+        return {
+            "status": "completed",
+            "task_id": self.request.id,
+            "original_file": os.path.basename(orig_path),
+            "synthetic_file": os.path.basename(synth_path),
+            "target_column": target_column,
+            "report": _to_builtin(report)
         }
 
     except Exception as e:
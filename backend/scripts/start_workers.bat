@@ -7,7 +7,9 @@ if not exist logs mkdir logs
 if not exist run mkdir run
 
 echo Starting CTGAN worker...
-start "CTGAN Worker" celery -A app.celery_config:celery_app worker --queue=ctgan --concurrency=1 --loglevel=info --hostname=ctgan_worker@%%h --logfile=logs/celery_ctgan.log
+REM solo pool: tek süreç, tek CUDA context; CTGAN_CUDA_DEVICE ile GPU seçilir
+if not defined CTGAN_CUDA_DEVICE set CTGAN_CUDA_DEVICE=0
+start "CTGAN Worker" cmd /c "set CUDA_VISIBLE_DEVICES=%CTGAN_CUDA_DEVICE%&& celery -A app.celery_config:celery_app worker --queue=ctgan --pool=solo --loglevel=info --hostname=ctgan_worker@%%h --logfile=logs/celery_ctgan.log"
 
 echo Starting Processing worker...
 start "Processing Worker" celery -A app.celery_config:celery_app worker --queue=processing --concurrency=4 --loglevel=info --hostname=processing_worker@%%h --logfile=logs/celery_processing.log
@@ -3,10 +3,11 @@
 # Faz 4.1: Asenkron İşleme
 
 # CTGAN worker'ını başlat (GPU kullanımı için ayrı worker)
+# solo pool: tek süreç, tek CUDA context; CTGAN_CUDA_DEVICE ile GPU seçilir
 echo "Starting CTGAN worker..."
-celery -A app.celery_config:celery_app worker \
+CUDA_VISIBLE_DEVICES=${CTGAN_CUDA_DEVICE:-0} celery -A app.celery_config:celery_app worker \
     --queue=ctgan \
-    --concurrency=1 \
+    --pool=solo \
     --loglevel=info \
     --hostname=ctgan_worker@%h \
     --logfile=logs/celery_ctgan.log \
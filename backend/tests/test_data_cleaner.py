@@ -0,0 +1,114 @@
+"""DataCleaner testleri: toplu işlemler eski sütun bazlı sonuçlarla aynı olmalı"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services import data_io
+from app.services.data_cleaner import DataCleaner
+
+
+@pytest.fixture(autouse=True)
+def disk_cache_dir(tmp_path, monkeypatch):
+    """Disk cache'i testin geçici dizinine yönlendir"""
+    monkeypatch.setattr(data_io, "DF_DISK_CACHE_DIR", tmp_path / "cache")
+
+
+def _make_frame(n_rows: int, seed: int) -> pd.DataFrame:
+    """Eksik değerli ve aykırı değerli sayısal/kategorik sütunlar"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "a": rng.normal(size=n_rows),
+        "b": rng.normal(loc=10, scale=2, size=n_rows),
+        "c": rng.integers(0, 100, size=n_rows).astype(float),
+        "city": rng.choice(["Ankara", "İzmir", "Bursa"], size=n_rows).astype(object),
+    })
+    df.loc[rng.random(n_rows) < 0.1, "a"] = np.nan
+    df.loc[rng.random(n_rows) < 0.05, "b"] = np.nan
+    df.loc[rng.random(n_rows) < 0.1, "city"] = np.nan
+    # Farklı satırlarda belirgin aykırı değerler
+    df.loc[3, "a"] = 50.0
+    df.loc[7, "b"] = -100.0
+    df.loc[11, "c"] = 10_000.0
+    return df
+
+
+def _cleaner(tmp_path, df: pd.DataFrame) -> DataCleaner:
+    path = tmp_path / "data.csv"
+    df.to_csv(path, index=False)
+    return DataCleaner(str(path))
+
+
+def _read_input(tmp_path) -> pd.DataFrame:
+    """DataCleaner'ın okuduğu DataFrame (CSV tipleriyle)"""
+    return pd.read_csv(tmp_path / "data.csv")
+
+
+def _reference_missing(df: pd.DataFrame, strategy: str) -> pd.DataFrame:
+    """Eski sütun bazlı eksik değer işleme"""
+    df = df.copy()
+    for col in df.columns:
+        if df[col].isnull().sum() == 0:
+            continue
+        if strategy == "drop":
+            df = df.dropna(subset=[col])
+        elif strategy == "mean" or (strategy == "auto" and pd.api.types.is_numeric_dtype(df[col])):
+            df[col] = df[col].fillna(df[col].mean())
+        elif strategy == "median":
+            df[col] = df[col].fillna(df[col].median())
+        elif strategy in ("mode", "auto"):
+            df[col] = df[col].fillna(df[col].mode()[0])
+        elif strategy == "ffill":
+            df[col] = df[col].ffill()
+        elif strategy == "bfill":
+            df[col] = df[col].bfill()
+    return df
+
+
+def _reference_outliers(df: pd.DataFrame, columns, method: str, threshold: float) -> pd.DataFrame:
+    """Eski sütun bazlı aykırı değer silme (her sütundan sonra satırlar silinir)"""
+    for col in columns:
+        if method == "iqr":
+            q1 = df[col].quantile(0.25)
+            q3 = df[col].quantile(0.75)
+            iqr = q3 - q1
+            mask = (df[col] < q1 - threshold * iqr) | (df[col] > q3 + threshold * iqr)
+        else:
+            mask = np.abs((df[col] - df[col].mean()) / df[col].std()) > threshold
+        df = df[~mask]
+    return df
+
+
+@pytest.mark.parametrize("strategy", ["auto", "drop", "mean", "median", "mode", "ffill", "bfill"])
+def test_missing_value_strategies_match_per_column(tmp_path, strategy):
+    """Toplu eksik değer stratejileri sütun bazlı uygulamayla aynı sonucu vermeli"""
+    # mean/median yalnızca sayısal sütunlarda tanımlı
+    columns = ["a", "b"] if strategy in ("mean", "median") else ["a", "b", "city"]
+    df = _make_frame(200, seed=0)[columns]
+    cleaner = _cleaner(tmp_path, df)
+
+    result = cleaner.handle_missing_values(strategy=strategy)
+
+    expected = _reference_missing(_read_input(tmp_path), strategy)
+    # Arrow string sütunlarında eksik değer None; pandas'ta NaN
+    pd.testing.assert_frame_equal(result.where(result.notna(), np.nan), expected)
+    assert [entry["column"] for entry in cleaner.cleaning_log] == [
+        col for col in columns if df[col].isnull().any()
+    ]
+
+
+@pytest.mark.parametrize("method,threshold", [("iqr", 1.5), ("zscore", 3.0)])
+def test_single_mask_outlier_removal_matches_per_column(tmp_path, method, threshold):
+    """Tek maskeli aykırı değer silme, aykırı değerler belirginken eski sonuçla aynı olmalı"""
+    df = _make_frame(500, seed=1)[["a", "b", "c"]].dropna()
+    cleaner = _cleaner(tmp_path, df)
+
+    result = cleaner.remove_outliers(method=method, threshold=threshold)
+
+    expected = _reference_outliers(_read_input(tmp_path), ["a", "b", "c"], method, threshold)
+    pd.testing.assert_frame_equal(result, expected)
+    assert len(result) < len(df)
+    assert cleaner.cleaning_log[-1] == {
+        "action": "total_outliers_removed",
+        "rows_removed": len(df) - len(expected)
+    }
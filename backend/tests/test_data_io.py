@@ -0,0 +1,93 @@
+"""data_io CSV okuma testleri"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services import data_io
+
+
+@pytest.fixture(autouse=True)
+def disk_cache_dir(tmp_path, monkeypatch):
+    """Disk cache'i testin geçici dizinine yönlendir"""
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setattr(data_io, "DF_DISK_CACHE_DIR", cache_dir)
+    return cache_dir
+
+
+def _write(tmp_path, name: str, text: str):
+    path = tmp_path / name
+    path.write_text(text)
+    return path
+
+
+def _assert_matches_pandas(path):
+    """read_csv ve load_df (ilk okuma ve cache'ten) pd.read_csv ile aynı sonucu vermeli"""
+    expected = pd.read_csv(path)
+    for df in (data_io.read_csv(path), data_io.load_df(path), data_io.load_df(path)):
+        # Arrow string sütunlarında eksik değer None; pandas'ta NaN
+        pd.testing.assert_frame_equal(df.where(df.notna(), np.nan), expected)
+
+
+def test_dates_and_times_round_trip(tmp_path):
+    """Tarih, tarih-saat ve saat hücreleri metin olarak aynen korunmalı"""
+    path = _write(
+        tmp_path,
+        "dates.csv",
+        "id,date,timestamp,time\n"
+        "1,2024-01-01,2024-01-01T10:00:00,10:30\n"
+        "2,2024-02-15,2024-02-15 08:15:30,23:59:59\n"
+        "3,,,\n"
+    )
+
+    _assert_matches_pandas(path)
+
+    df = data_io.load_df(path)
+    assert df["timestamp"].iloc[0] == "2024-01-01T10:00:00"
+    assert df["time"].iloc[0] == "10:30"
+
+
+def test_bools_round_trip(tmp_path):
+    """True/False sütunları bool, eksik değerli olanlar object olmalı"""
+    path = _write(
+        tmp_path,
+        "bools.csv",
+        "flag,maybe,value\n"
+        "True,True,1.5\n"
+        "False,,2.5\n"
+        "True,False,3.5\n"
+    )
+
+    _assert_matches_pandas(path)
+    assert data_io.load_df(path)["flag"].dtype == bool
+
+
+def test_ragged_rows_filled_with_nan(tmp_path):
+    """Eksik alanlı satırlar pd.read_csv gibi NaN ile doldurulmalı"""
+    path = _write(
+        tmp_path,
+        "ragged.csv",
+        "a,b,c\n"
+        "1,2,3\n"
+        "4,5\n"
+        "7,8,9\n"
+    )
+
+    _assert_matches_pandas(path)
+    assert data_io.read_csv(path)["c"].isna().tolist() == [False, True, False]
+
+
+def test_long_rows_raise_parser_error(tmp_path):
+    """Fazla alanlı satırlar ParserError yükseltmeli"""
+    path = _write(tmp_path, "long.csv", "a,b\n1,2\n3,4,5\n")
+
+    with pytest.raises(pd.errors.ParserError):
+        data_io.read_csv(path)
+
+
+def test_empty_file_raises_empty_data_error(tmp_path):
+    """Boş dosya EmptyDataError yükseltmeli"""
+    path = _write(tmp_path, "empty.csv", "")
+
+    with pytest.raises(pd.errors.EmptyDataError):
+        data_io.read_csv(path)
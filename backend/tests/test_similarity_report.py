@@ -0,0 +1,80 @@
+"""SimilarityReport metriklerinin scipy.stats ile karşılaştırma testleri"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.spatial.distance import jensenshannon
+from scipy.stats import ks_2samp, wasserstein_distance
+
+from app.services import similarity_report
+from app.services.similarity_report import SimilarityReport
+
+
+def _make_frames(n_rows: int, seed: int):
+    """Eksik değerli sayısal ve kategorik sütunlar içeren orijinal/sentetik çifti"""
+    rng = np.random.default_rng(seed)
+
+    def frame(shift: float) -> pd.DataFrame:
+        x = rng.normal(loc=shift, size=n_rows)
+        x[rng.random(n_rows) < 0.1] = np.nan
+        return pd.DataFrame({
+            "x": x,
+            "y": rng.integers(0, 50, size=n_rows),
+            "color": rng.choice(["red", "green", "blue", None], size=n_rows, p=[0.4, 0.3, 0.2, 0.1]),
+            "size": rng.choice(["S", "M", "L"], size=n_rows),
+        })
+
+    return frame(0.0), frame(0.3)
+
+
+def _category_distributions(series_orig: pd.Series, series_synth: pd.Series):
+    """Ortak kategori sırasıyla normalize frekanslar (eksik değerler hariç)"""
+    categories = sorted(set(series_orig.dropna()) | set(series_synth.dropna()))
+    orig = series_orig.value_counts().reindex(categories, fill_value=0).to_numpy(dtype=float)
+    synth = series_synth.value_counts().reindex(categories, fill_value=0).to_numpy(dtype=float)
+    return orig / orig.sum(), synth / synth.sum()
+
+
+@pytest.mark.parametrize("n_rows", [200, 12000])
+def test_metrics_match_scipy(n_rows):
+    """Toplu Wasserstein, KS ve JS değerleri sütun bazında scipy sonuçlarıyla aynı olmalı"""
+    df_original, df_synthetic = _make_frames(n_rows, seed=n_rows)
+    report = SimilarityReport().generate_full_report(df_original, df_synthetic)
+
+    for column in ("x", "y"):
+        orig_values = df_original[column].dropna().to_numpy(dtype=float)
+        synth_values = df_synthetic[column].dropna().to_numpy(dtype=float)
+
+        metrics = report["column_similarities"][column]["metrics"]
+        assert metrics["wasserstein_distance"] == pytest.approx(
+            wasserstein_distance(orig_values, synth_values), rel=1e-9
+        )
+
+        expected = ks_2samp(orig_values, synth_values)
+        test = report["statistical_tests"][column]
+        assert test["statistic"] == pytest.approx(expected.statistic, rel=1e-9)
+        assert test["p_value"] == pytest.approx(expected.pvalue, rel=1e-6, abs=1e-300)
+
+    for column in ("color", "size"):
+        orig_dist, synth_dist = _category_distributions(df_original[column], df_synthetic[column])
+        metrics = report["column_similarities"][column]["metrics"]
+        assert metrics["js_divergence"] == pytest.approx(
+            jensenshannon(orig_dist, synth_dist), rel=1e-9
+        )
+
+
+def test_asymptotic_path_used_for_large_samples(monkeypatch):
+    """KS_EXACT_MAX_N üzerindeki örneklerde de p-değeri ks_2samp ile aynı olmalı"""
+    monkeypatch.setattr(similarity_report, "KS_EXACT_MAX_N", 50)
+    df_original, df_synthetic = _make_frames(500, seed=7)
+
+    tests = SimilarityReport()._run_statistical_tests(df_original, df_synthetic, ["x", "y"])
+
+    for column in ("x", "y"):
+        expected = ks_2samp(
+            df_original[column].dropna().to_numpy(dtype=float),
+            df_synthetic[column].dropna().to_numpy(dtype=float),
+            method="asymp"
+        )
+        assert tests[column]["statistic"] == pytest.approx(expected.statistic, rel=1e-9)
+        assert tests[column]["p_value"] == pytest.approx(expected.pvalue, rel=1e-6)
@@ -0,0 +1,30 @@
+"""UtilityScore testleri"""
+
+import numpy as np
+import pandas as pd
+
+from app.services.utility_score import UtilityScore
+
+
+def _make_frame(n_rows: int, seed: int) -> pd.DataFrame:
+    """İki sayısal özellik ve tek örnekli nadir bir sınıf içeren veri seti"""
+    rng = np.random.default_rng(seed)
+    x1 = rng.normal(size=n_rows)
+    x2 = rng.normal(size=n_rows)
+    label = np.where(x1 + x2 > 0, "yes", "no").astype(object)
+    label[0] = "rare"
+    return pd.DataFrame({"x1": x1, "x2": x2, "label": label})
+
+
+def test_classification_with_singleton_class():
+    """Eğitim bölmesinde tek örnekli sınıf varken early stopping hata vermemeli"""
+    df_original = _make_frame(300, seed=0)
+    df_synthetic = _make_frame(300, seed=1)
+
+    report = UtilityScore().assess_utility(
+        df_original, df_synthetic, target_column="label", task_type="classification"
+    )
+
+    assert report["task_type"] == "classification"
+    assert 0.0 <= report["utility_score"] <= 1.0
+    assert report["models"]["trained_on_original"]["accuracy"] > 0.9